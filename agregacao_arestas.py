@@ -0,0 +1,133 @@
+"""
+Exportação agregada das arestas para os visualizadores HTML
+
+Em vez de um objeto por via com os nomes de origem, destino e via repetidos
+(904 objetos no grafo do Recife), o modo agregado gera um registro por par de
+bairros (~257, ver ARESTAS_PARALELAS.md), em colunas:
+
+    {
+        "vias": ["Rua A", "Av. B", ...],          # tabela de nomes de via
+        "pares": {
+            "a": [...], "b": [...],                # índices dos bairros
+            "n": [...],                            # número de vias paralelas
+            "min": [...], "media": [...]           # distâncias em metros (só
+                                                   # sem "detalhes")
+        },
+        "detalhes": {                              # opcional
+            "inicio": [...],                       # vias do par k: inicio[k]:inicio[k+1]
+            "via": [...], "peso": [...]            # índice em "vias" e distância
+        }
+    }
+
+As páginas montam o texto de cada via só quando o usuário passa o mouse ou
+clica (ver montarTituloPar em TITULO_PAR_JS), então o HTML fica menor e o
+navegador faz o parse de poucos arrays em vez de milhares de objetos. Com
+"detalhes", mínima e média saem das próprias vias do par (resumoPar), em vez
+de repetidas em colunas.
+"""
+from typing import Dict, List
+
+# Função JavaScript que monta o tooltip de um par a partir do modo agregado
+TITULO_PAR_JS = """
+        // Distância mínima e média do par k (das colunas ou das vias do par)
+        function resumoPar(dados, k) {
+            const p = dados.pares, d = dados.detalhes;
+            if (!d) return { min: p.min[k], media: p.media[k] };
+            let min = Infinity, soma = 0;
+            for (let j = d.inicio[k]; j < d.inicio[k + 1]; j++) {
+                min = Math.min(min, d.peso[j]);
+                soma += d.peso[j];
+            }
+            return { min: min, media: soma / p.n[k] };
+        }
+
+        function montarTituloPar(dados, k, nomeA, nomeB) {
+            const p = dados.pares, d = dados.detalhes, r = resumoPar(dados, k);
+            let texto = `<b>${nomeA} ↔ ${nomeB}</b><br>${p.n[k]} via(s)` +
+                `<br>Mínima: ${r.min.toFixed(2)}m<br>Média: ${r.media.toFixed(2)}m`;
+            if (d) {
+                for (let j = d.inicio[k]; j < d.inicio[k + 1]; j++) {
+                    texto += `<br>• ${dados.vias[d.via[j]]}: ${d.peso[j].toFixed(2)}m`;
+                }
+            }
+            return texto;
+        }
+"""
+
+
+def vias_unicas(grafo) -> List:
+    """
+    Registros das vias a desenhar, sem repetições
+
+    Vias idênticas (mesmo par, em qualquer direção, mesmo nome e peso) contam
+    uma vez. A lista só referencia os RegistroVia do grafo.
+    """
+    vias = []
+    vistas = set()
+    for registro in grafo.registros:
+        aresta_id = (registro.origem, registro.destino, registro.nome_via, registro.peso)
+        aresta_reversa_id = (registro.destino, registro.origem, registro.nome_via, registro.peso)
+        if aresta_id in vistas or aresta_reversa_id in vistas:
+            continue
+        vistas.add(aresta_id)
+        vias.append(registro)
+    return vias
+
+
+def agregar_arestas(grafo, indices: Dict[str, int], detalhes: bool = True, casas: int = 2) -> dict:
+    """
+    Agrupa as vias do grafo por par de bairros, no formato em colunas acima
+
+    Vias idênticas contam uma vez, como no modo com uma aresta por via (ver
+    vias_unicas).
+
+    Args:
+        grafo: Instância do grafo
+        indices: Posição de cada bairro no array de nós da página
+        detalhes: Inclui a lista de vias de cada par (para tooltips)
+        casas: Casas decimais das distâncias
+
+    Returns:
+        Dicionário pronto para json.dumps
+    """
+    nomes_vias = []
+    indices_vias: Dict[str, int] = {}
+    vias_por_par: Dict[tuple, list] = {}
+
+    for registro in vias_unicas(grafo):
+        if registro.origem not in indices or registro.destino not in indices:
+            continue
+
+        a, b = indices[registro.origem], indices[registro.destino]
+        par = (a, b) if a <= b else (b, a)
+        if registro.nome_via not in indices_vias:
+            indices_vias[registro.nome_via] = len(nomes_vias)
+            nomes_vias.append(registro.nome_via)
+        vias_por_par.setdefault(par, []).append((indices_vias[registro.nome_via], registro.peso))
+
+    pares = {'a': [], 'b': [], 'n': []}
+    if not detalhes:
+        pares['min'], pares['media'] = [], []
+    inicio, via, peso = [0], [], []
+    for (a, b), vias in vias_por_par.items():
+        pesos = [p for _, p in vias]
+        pares['a'].append(a)
+        pares['b'].append(b)
+        pares['n'].append(len(vias))
+        if not detalhes:
+            pares['min'].append(round(min(pesos), casas))
+            pares['media'].append(round(sum(pesos) / len(pesos), casas))
+        else:
+            via.extend(v for v, _ in vias)
+            peso.extend(round(p, casas) for p in pesos)
+            inicio.append(len(via))
+
+    dados = {'vias': nomes_vias if detalhes else [], 'pares': pares}
+    if detalhes:
+        dados['detalhes'] = {'inicio': inicio, 'via': via, 'peso': peso}
+    return dados
+
+
+def total_vias(dados: dict) -> int:
+    """Número de vias representadas no modo agregado"""
+    return sum(dados['pares']['n'])
@@ -0,0 +1,119 @@
+"""
+Árvore (ou floresta) geradora mínima: o conjunto de vias mais barato que
+mantém conectados todos os bairros que já estão conectados
+
+Algoritmo de Kruskal com conjuntos disjuntos (união por posto e compressão
+de caminho). As vias paralelas de cada par são reduzidas à mais curta antes
+da ordenação, e tanto essa redução quanto a ordenação por peso são feitas
+com NumPy; o único laço em Python é o das uniões, quase linear.
+
+Assim como em conectividade.py, as vias são identificadas pelo índice em
+Grafo.registros, então cada aresta da árvore informa a via (nome_via) mantida.
+"""
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+
+@dataclass
+class ArvoreGeradora:
+    """
+    Resultado da árvore geradora mínima (ver Grafo.arvore_geradora_minima)
+
+    Se o grafo for desconexo, é uma floresta: uma árvore por componente.
+    """
+    nomes: List[str]
+    registros: list
+    # Índices (em `registros`) das vias mantidas, em ordem crescente de peso
+    vias: np.ndarray
+    peso_total: float
+    num_componentes: int
+
+    @property
+    def num_arestas(self) -> int:
+        return len(self.vias)
+
+    def listar_vias(self) -> list:
+        """Vias (RegistroVia) mantidas, em ordem crescente de peso"""
+        return [self.registros[i] for i in self.vias.tolist()]
+
+
+class ConjuntosDisjuntos:
+    """Union-find com união por posto e compressão de caminho"""
+
+    def __init__(self, tamanho: int):
+        self.pai = list(range(tamanho))
+        self.posto = [0] * tamanho
+        self.num_conjuntos = tamanho
+
+    def encontrar(self, x: int) -> int:
+        pai = self.pai
+        raiz = x
+        while pai[raiz] != raiz:
+            raiz = pai[raiz]
+        # Compressão de caminho: todos passam a apontar para a raiz
+        while pai[x] != raiz:
+            pai[x], x = raiz, pai[x]
+        return raiz
+
+    def unir(self, a: int, b: int) -> bool:
+        """Une os conjuntos de a e b; devolve False se já eram o mesmo"""
+        raiz_a, raiz_b = self.encontrar(a), self.encontrar(b)
+        if raiz_a == raiz_b:
+            return False
+        posto = self.posto
+        if posto[raiz_a] < posto[raiz_b]:
+            raiz_a, raiz_b = raiz_b, raiz_a
+        self.pai[raiz_b] = raiz_a
+        if posto[raiz_a] == posto[raiz_b]:
+            posto[raiz_a] += 1
+        self.num_conjuntos -= 1
+        return True
+
+
+def kruskal(num_vertices: int, origens: Sequence[int], destinos: Sequence[int], pesos: Sequence[float]):
+    """
+    Floresta geradora mínima de um multigrafo não direcionado
+
+    Args:
+        num_vertices: Número de vértices (ids de 0 a num_vertices - 1)
+        origens: Vértice de origem de cada aresta
+        destinos: Vértice de destino de cada aresta
+        pesos: Peso de cada aresta
+
+    Returns:
+        Tupla (arestas, num_componentes): ids das arestas escolhidas, em ordem
+        crescente de peso (empates pelo id), e número de árvores da floresta
+    """
+    origens = np.asarray(origens, dtype=np.int64)
+    destinos = np.asarray(destinos, dtype=np.int64)
+    pesos = np.asarray(pesos, dtype=np.float64)
+    ids = np.arange(len(origens), dtype=np.int64)
+
+    # Laços nunca entram na árvore
+    validas = origens != destinos
+    origens, destinos, pesos, ids = origens[validas], destinos[validas], pesos[validas], ids[validas]
+
+    # Reduz as paralelas: por par (sem direção), fica a de menor peso (e menor id)
+    chaves = np.minimum(origens, destinos) * num_vertices + np.maximum(origens, destinos)
+    ordem = np.lexsort((ids, pesos, chaves))
+    chaves = chaves[ordem]
+    primeiras = np.ones(len(chaves), dtype=bool)
+    primeiras[1:] = chaves[1:] != chaves[:-1]
+    candidatas = ordem[primeiras]
+
+    # Ordena as candidatas por peso (empates pelo id, para resultado determinístico)
+    candidatas = candidatas[np.lexsort((ids[candidatas], pesos[candidatas]))]
+
+    conjuntos = ConjuntosDisjuntos(num_vertices)
+    escolhidas = []
+    limite = num_vertices - 1
+    for origem, destino, aresta in zip(origens[candidatas].tolist(), destinos[candidatas].tolist(),
+                                       ids[candidatas].tolist()):
+        if conjuntos.unir(origem, destino):
+            escolhidas.append(aresta)
+            if len(escolhidas) == limite:
+                break
+
+    return np.array(escolhidas, dtype=np.int64), conjuntos.num_conjuntos
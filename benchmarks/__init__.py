@@ -0,0 +1,10 @@
+"""
+Benchmarks de desempenho do grafo de bairros
+
+Execute a partir da raiz do projeto, por exemplo:
+    python -m benchmarks.escala
+    python -m benchmarks.memoria_arestas
+    python -m benchmarks.caminho_minimo
+    python -m benchmarks.plotly_arestas
+    python -m benchmarks.carregar_vias
+"""
@@ -0,0 +1,93 @@
+"""
+Benchmark de caminho mínimo ponto a ponto: Dijkstra unidirecional x bidirecional
+x hierarquia de contração
+
+Sorteia pares de bairros em um grafo sintético (ver gerador.py) e compara, para
+cada algoritmo de Grafo.caminho_minimo e para a HierarquiaContracao, o tempo
+médio por consulta e o número médio de bairros fixados (expandidos). As
+distâncias de todos os algoritmos são conferidas par a par.
+
+Uso:
+    python -m benchmarks.caminho_minimo --vertices 1000 10000 100000
+"""
+import argparse
+import random
+import time
+
+from benchmarks.gerador import construir_grafo_sintetico, gerar_grafo_sintetico
+from hierarquia_contracao import HierarquiaContracao
+
+ALGORITMOS = ('dijkstra', 'bidirecional')
+
+
+def medir_algoritmo(calcular, pares):
+    """Retorna (segundos por consulta, média de expandidos, distâncias) para os pares"""
+    distancias = []
+    expandidos = 0
+    inicio = time.perf_counter()
+    for origem, destino in pares:
+        caminho = calcular(origem, destino)
+        distancias.append(caminho.distancia if caminho else None)
+        expandidos += caminho.vertices_expandidos if caminho else 0
+    decorrido = time.perf_counter() - inicio
+    return decorrido / len(pares), expandidos / len(pares), distancias
+
+
+def executar(num_vertices: int, num_consultas: int, semente: int):
+    """Compara os algoritmos em um grafo sintético de num_vertices bairros"""
+    bairros_por_subregiao, linhas = gerar_grafo_sintetico(num_vertices, semente=semente)
+    grafo = construir_grafo_sintetico(bairros_por_subregiao, linhas)
+    # O colapso das arestas paralelas é feito uma vez e não entra na medição
+    grafo.adjacencias_colapsadas()
+
+    aleatorio = random.Random(semente)
+    bairros = grafo.listar_vertices()
+    pares = [(aleatorio.choice(bairros), aleatorio.choice(bairros)) for _ in range(num_consultas)]
+
+    print(f"\n{num_vertices} bairros, {grafo.num_arestas} vias, {num_consultas} consultas")
+    inicio = time.perf_counter()
+    hierarquia = HierarquiaContracao.construir(grafo)
+    print(f"  Hierarquia: {hierarquia.num_atalhos} atalhos em {time.perf_counter() - inicio:.2f}s")
+
+    calculos = {
+        algoritmo: (lambda a, b, algoritmo=algoritmo: grafo.caminho_minimo(a, b, algoritmo=algoritmo))
+        for algoritmo in ALGORITMOS
+    }
+    calculos['hierarquia'] = hierarquia.caminho_minimo
+
+    referencia = None
+    resultados = {}
+    for algoritmo, calcular in calculos.items():
+        segundos, expandidos, distancias = medir_algoritmo(calcular, pares)
+        if referencia is None:
+            referencia = distancias
+        elif any((a is None) != (b is None) or (a is not None and abs(a - b) > 1e-6)
+                 for a, b in zip(referencia, distancias)):
+            raise AssertionError(f"{algoritmo} divergiu de {ALGORITMOS[0]}")
+        resultados[algoritmo] = (segundos, expandidos)
+        print(f"  {algoritmo:14s} {segundos * 1000:9.3f} ms/consulta  {expandidos:10.1f} expandidos")
+
+    base_segundos, base_expandidos = resultados[ALGORITMOS[0]]
+    for algoritmo in list(calculos)[1:]:
+        segundos, expandidos = resultados[algoritmo]
+        print(f"  {algoritmo}: {base_segundos / segundos:.2f}x mais rápido, "
+              f"{base_expandidos / max(expandidos, 1):.2f}x menos expandidos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de caminho mínimo ponto a ponto')
+    parser.add_argument('--vertices', type=int, nargs='+', default=[1000, 10000],
+                        help='Tamanhos (número de bairros) a medir')
+    parser.add_argument('--consultas', type=int, default=200, help='Número de pares sorteados')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador aleatório')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("CAMINHO MÍNIMO: DIJKSTRA x BIDIRECIONAL x HIERARQUIA")
+    print("="*60)
+    for num_vertices in args.vertices:
+        executar(num_vertices, args.consultas, args.semente)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark do carregamento das vias: linha a linha (iterrows) x vetorizado
+
+Monta a tabela de vias de um grafo sintético (ver gerador.py), com uma
+fração de células vazias nas colunas de texto e espaços sobrando nos nomes,
+e carrega o mesmo conteúdo de três formas:
+- linha_a_linha: o carregador anterior, com iterrows e str() em cada célula
+  (reproduzido aqui)
+- vetorizado: normalizar_vias + adicionar_arestas_em_lote, como em
+  carregar_arestas_vias depois do read_excel
+- streaming: carregar_arestas_vias_streaming lendo um CSV em blocos
+
+Os grafos resultantes são conferidos via a via (inclusive o bairro e a via
+'nan' das células vazias, como no carregador anterior).
+
+Uso:
+    python -m benchmarks.carregar_vias --vertices 1000 10000
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.gerador import gerar_grafo_sintetico
+from carregar_dados import COLUNAS_VIAS, carregar_arestas_vias_streaming, normalizar_vias
+from grafo import Grafo
+
+
+def carregar_linha_a_linha(grafo: Grafo, df: pd.DataFrame):
+    """Carregador anterior: uma chamada a adicionar_aresta por linha"""
+    for _, row in df.iterrows():
+        origem = str(row['bairro_origem']).strip()
+        destino = str(row['bairro_destino']).strip()
+        nome_via = str(row['nome_logradouro']).strip()
+        peso = float(row['distancia_metros'])
+        grafo.adicionar_aresta(origem, destino, nome_via, peso)
+
+
+def carregar_vetorizado(grafo: Grafo, df: pd.DataFrame):
+    """Caminho de carregar_arestas_vias depois da leitura da planilha"""
+    origens, destinos, vias, pesos = normalizar_vias(df)
+    grafo.adicionar_arestas_em_lote(origens.tolist(), destinos.tolist(), vias.tolist(), pesos.tolist())
+
+
+def montar_tabela(num_vertices: int, fracao_vazias: float, semente: int) -> pd.DataFrame:
+    """Tabela de vias sintética com células vazias e espaços nos nomes"""
+    _, linhas = gerar_grafo_sintetico(num_vertices, semente=semente)
+    df = pd.DataFrame(linhas, columns=COLUNAS_VIAS)
+
+    aleatorio = np.random.default_rng(semente)
+    for coluna in COLUNAS_VIAS[:3]:
+        valores = df[coluna].astype(object)
+        espacos = aleatorio.random(len(df)) < 0.05
+        valores[espacos] = ' ' + valores[espacos] + ' '
+        valores[aleatorio.random(len(df)) < fracao_vazias] = np.nan
+        df[coluna] = valores
+    return df
+
+
+def vias_do_grafo(grafo: Grafo) -> list:
+    """(origem, destino, via, peso) de cada via, na ordem de inserção"""
+    return [(r.origem, r.destino, r.nome_via, r.peso) for r in grafo.registros]
+
+
+def executar(num_vertices: int, fracao_vazias: float, tamanho_bloco: int, semente: int):
+    """Compara os carregadores em um grafo sintético de num_vertices bairros"""
+    df = montar_tabela(num_vertices, fracao_vazias, semente)
+    vazias = int(df[COLUNAS_VIAS[:3]].isna().sum().sum())
+    print(f"\n{num_vertices} bairros, {len(df)} vias, {vazias} células vazias")
+
+    with tempfile.TemporaryDirectory(prefix='bench_vias_') as diretorio:
+        caminho_csv = os.path.join(diretorio, 'vias.csv')
+        df.to_csv(caminho_csv, index=False)
+
+        carregadores = {
+            'linha_a_linha': lambda grafo: carregar_linha_a_linha(grafo, df),
+            'vetorizado': lambda grafo: carregar_vetorizado(grafo, df),
+            'streaming': lambda grafo: carregar_arestas_vias_streaming(grafo, caminho_csv, tamanho_bloco),
+        }
+
+        referencia = None
+        resultados = {}
+        for nome, carregar in carregadores.items():
+            grafo = Grafo()
+            inicio = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                carregar(grafo)
+            resultados[nome] = time.perf_counter() - inicio
+
+            vias = vias_do_grafo(grafo)
+            if referencia is None:
+                referencia = (vias, set(grafo.vertices))
+            elif (vias, set(grafo.vertices)) != referencia:
+                raise AssertionError(f"{nome} divergiu de linha_a_linha")
+            print(f"  {nome:14s} {resultados[nome]:8.3f}s  {len(grafo.vertices)} bairros")
+
+    for nome in list(carregadores)[1:]:
+        print(f"  {nome}: {resultados['linha_a_linha'] / resultados[nome]:.1f}x mais rápido, mesmo grafo")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark do carregamento das vias')
+    parser.add_argument('--vertices', type=int, nargs='+', default=[1000, 10000],
+                        help='Tamanhos (número de bairros) a medir')
+    parser.add_argument('--vazias', type=float, default=0.01,
+                        help='Fração de células vazias em cada coluna de texto')
+    parser.add_argument('--tamanho-bloco', type=int, default=5000,
+                        help='Linhas por bloco no carregamento em streaming')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador aleatório')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("CARREGAMENTO DAS VIAS: LINHA A LINHA x VETORIZADO")
+    print("="*60)
+    for num_vertices in args.vertices:
+        executar(num_vertices, args.vazias, args.tamanho_bloco, args.semente)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Benchmark de escala: carga, consultas, estatísticas e visualizações
+
+Para cada tamanho pedido, gera um grafo sintético (ver gerador.py), salva as
+planilhas em um diretório temporário e mede:
+- construir_grafo_completo a partir das planilhas e a partir do snapshot
+- consultas de vizinhos e de pares (obter_vizinhos, obter_arestas_entre, existe_aresta)
+- caminho_minimo (Dijkstra e bidirecional) e k_caminhos_minimos (k=10)
+- metricas() e estatisticas()
+- cada gerador visualizar_* (apenas até --limite-visualizacao vértices)
+
+Os resultados são gravados em JSON (com o commit atual) para comparar
+execuções entre commits.
+
+Uso:
+    python -m benchmarks.escala --vertices 100 1000 10000
+    python -m benchmarks.escala --vertices 100 1000 --comparar bench_anterior.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+from benchmarks.gerador import gerar_grafo_sintetico, salvar_planilhas
+from carregar_dados import construir_grafo_completo
+import visualizar_grafo
+import visualizar_interativo
+import visualizar_organico
+import visualizar_plotly
+import visualizar_simples
+
+
+def commit_atual() -> str:
+    """Retorna o hash do commit atual (ou 'desconhecido' fora de um repositório git)"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def cronometrar(funcao, *args, **kwargs):
+    """Executa a função sem saída no terminal e retorna (resultado, segundos)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        decorrido = time.perf_counter() - inicio
+    return resultado, decorrido
+
+
+def medir_consultas(grafo, num_consultas: int, aleatorio: random.Random):
+    """Mede consultas de vizinhos, pares e caminhos mínimos sobre bairros sorteados"""
+    bairros = grafo.listar_vertices()
+    sorteados = [aleatorio.choice(bairros) for _ in range(num_consultas)]
+
+    # Metade dos pares com aresta (vizinho real), metade sorteados ao acaso
+    pares = []
+    for i, bairro in enumerate(sorteados):
+        vizinhos = grafo.obter_vizinhos(bairro)
+        if i % 2 == 0 and vizinhos:
+            pares.append((bairro, aleatorio.choice(vizinhos).destino))
+        else:
+            pares.append((bairro, aleatorio.choice(bairros)))
+
+    medicoes = {}
+
+    _, segundos = cronometrar(lambda: [grafo.obter_vizinhos(b) for b in sorteados])
+    medicoes['obter_vizinhos'] = {'segundos': segundos, 'operacoes': num_consultas}
+
+    _, segundos = cronometrar(lambda: [grafo.obter_arestas_entre(a, b) for a, b in pares])
+    medicoes['obter_arestas_entre'] = {'segundos': segundos, 'operacoes': num_consultas}
+
+    _, segundos = cronometrar(lambda: [grafo.existe_aresta(a, b) for a, b in pares])
+    medicoes['existe_aresta'] = {'segundos': segundos, 'operacoes': num_consultas}
+
+    # O primeiro caminho inclui o pré-processamento (colapso das arestas paralelas)
+    _, segundos = cronometrar(grafo.adjacencias_colapsadas)
+    medicoes['adjacencias_colapsadas'] = {'segundos': segundos, 'operacoes': 1}
+
+    rotas = pares[:max(1, num_consultas // 100)]
+    _, segundos = cronometrar(lambda: [grafo.caminho_minimo(a, b) for a, b in rotas])
+    medicoes['caminho_minimo'] = {'segundos': segundos, 'operacoes': len(rotas)}
+
+    _, segundos = cronometrar(lambda: [grafo.caminho_minimo(a, b, algoritmo='bidirecional') for a, b in rotas])
+    medicoes['caminho_minimo_bidirecional'] = {'segundos': segundos, 'operacoes': len(rotas)}
+
+    _, segundos = cronometrar(lambda: [grafo.k_caminhos_minimos(a, b, k=10) for a, b in rotas])
+    medicoes['k_caminhos_minimos'] = {'segundos': segundos, 'operacoes': len(rotas)}
+
+    return medicoes
+
+
+def medir_visualizacoes(grafo, diretorio: str):
+    """Mede cada gerador de visualização, gravando as saídas no diretório temporário"""
+    medicoes = {}
+    geradores = {
+        'visualizar_interativo': lambda: visualizar_interativo.gerar_html_interativo(
+            grafo, os.path.join(diretorio, 'grafo_interativo.html')),
+        'visualizar_organico': lambda: visualizar_organico.visualizar_layout_organico(
+            grafo, os.path.join(diretorio, 'grafo_organico.html')),
+        'visualizar_plotly': lambda: visualizar_plotly.visualizar_grafo_plotly(
+            grafo, os.path.join(diretorio, 'grafo_plotly.html')),
+        'visualizar_simples': lambda: visualizar_simples.visualizar_grafo_canvas(
+            grafo, os.path.join(diretorio, 'grafo_canvas.html')),
+        'visualizar_grafo': lambda: visualizar_grafo.visualizar_grafo_simples(grafo),
+    }
+
+    diretorio_original = os.getcwd()
+    # visualizar_grafo grava o PNG no diretório atual
+    os.chdir(diretorio)
+    try:
+        for nome, gerador in geradores.items():
+            _, segundos = cronometrar(gerador)
+            plt.close('all')
+            medicoes[nome] = {'segundos': segundos, 'operacoes': 1}
+    finally:
+        os.chdir(diretorio_original)
+
+    return medicoes
+
+
+def executar_escala(num_vertices: int, args) -> dict:
+    """Gera o grafo de um tamanho e executa todas as medições"""
+    print(f"\n--- {num_vertices} vértices ---")
+    aleatorio = random.Random(args.semente)
+
+    with tempfile.TemporaryDirectory(prefix='bench_grafo_') as diretorio:
+        (bairros_por_subregiao, linhas), segundos_geracao = cronometrar(
+            gerar_grafo_sintetico, num_vertices, semente=args.semente)
+        caminho_subregioes, caminho_vias = salvar_planilhas(
+            bairros_por_subregiao, linhas, diretorio, args.formato_vias)
+        print(f"Gerado: {len(linhas)} vias ({os.path.basename(caminho_vias)}) em {segundos_geracao:.2f}s")
+
+        medicoes = {}
+
+        grafo, segundos = cronometrar(
+            construir_grafo_completo, caminho_subregioes, caminho_vias, usar_snapshot=False)
+        medicoes['construir_grafo_completo'] = {'segundos': segundos, 'operacoes': 1}
+
+        _, segundos = cronometrar(
+            grafo.salvar_snapshot, os.path.join(diretorio, 'vias.grafo.bin'), (caminho_subregioes, caminho_vias))
+        medicoes['salvar_snapshot'] = {'segundos': segundos, 'operacoes': 1}
+
+        # Com o snapshot atualizado, construir_grafo_completo não lê as planilhas
+        _, segundos = cronometrar(construir_grafo_completo, caminho_subregioes, caminho_vias)
+        medicoes['construir_grafo_completo_snapshot'] = {'segundos': segundos, 'operacoes': 1}
+
+        medicoes.update(medir_consultas(grafo, args.consultas, aleatorio))
+
+        _, segundos = cronometrar(grafo.metricas)
+        medicoes['metricas'] = {'segundos': segundos, 'operacoes': 1}
+
+        _, segundos = cronometrar(grafo.estatisticas)
+        medicoes['estatisticas'] = {'segundos': segundos, 'operacoes': 1}
+
+        if num_vertices <= args.limite_visualizacao:
+            medicoes.update(medir_visualizacoes(grafo, diretorio))
+        else:
+            print(f"Visualizações ignoradas (acima de {args.limite_visualizacao} vértices)")
+
+    for nome, medicao in medicoes.items():
+        print(f"  {nome:36s} {medicao['segundos']:10.4f}s  ({medicao['operacoes']} op.)")
+
+    return {
+        'vertices': grafo.num_vertices(),
+        'arestas': grafo.num_arestas,
+        'vertices_pedidos': num_vertices,
+        'medicoes': medicoes,
+    }
+
+
+def comparar(resultados: list, caminho_anterior: str):
+    """Exibe a razão entre os tempos atuais e os de um JSON anterior"""
+    with open(caminho_anterior, 'r', encoding='utf-8') as f:
+        anterior = json.load(f)
+
+    por_tamanho = {r['vertices_pedidos']: r['medicoes'] for r in anterior['resultados']}
+
+    print(f"\n{'='*60}")
+    print(f"COMPARAÇÃO COM {anterior.get('commit', '?')} (atual / anterior)")
+    print(f"{'='*60}")
+    for resultado in resultados:
+        medicoes_anteriores = por_tamanho.get(resultado['vertices_pedidos'])
+        if not medicoes_anteriores:
+            continue
+        print(f"{resultado['vertices_pedidos']} vértices:")
+        for nome, medicao in resultado['medicoes'].items():
+            if nome in medicoes_anteriores and medicoes_anteriores[nome]['segundos'] > 0:
+                razao = medicao['segundos'] / medicoes_anteriores[nome]['segundos']
+                alerta = '  <-- regressão' if razao > 1.2 else ''
+                print(f"  {nome:36s} {razao:6.2f}x{alerta}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de escala do grafo de bairros')
+    parser.add_argument('--vertices', type=int, nargs='+', default=[100, 1000, 10000],
+                        help='Tamanhos (número de bairros) a medir, de 10^2 a 10^6')
+    parser.add_argument('--consultas', type=int, default=10000, help='Número de consultas de vizinhos/pares')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador aleatório')
+    parser.add_argument('--formato-vias', choices=['auto', 'xlsx', 'csv', 'parquet'], default='auto',
+                        help='Formato do arquivo de vias gerado')
+    parser.add_argument('--limite-visualizacao', type=int, default=10000,
+                        help='Maior número de vértices em que as visualizações são medidas')
+    parser.add_argument('--saida', type=str, default=None,
+                        help='Arquivo JSON de saída (padrão: bench_<commit>.json)')
+    parser.add_argument('--comparar', type=str, default=None,
+                        help='JSON de uma execução anterior para comparar')
+    args = parser.parse_args()
+
+    commit = commit_atual()
+    resultados = [executar_escala(n, args) for n in args.vertices]
+
+    relatorio = {
+        'commit': commit,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semente': args.semente,
+        'resultados': resultados,
+    }
+
+    saida = args.saida or f"bench_{commit}.json"
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2, ensure_ascii=False)
+    print(f"\n✓ Resultados salvos em: {saida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == '__main__':
+    main()
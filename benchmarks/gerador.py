@@ -0,0 +1,173 @@
+"""
+Gerador de grafos sintéticos parecidos com o grafo de bairros do Recife
+
+Características reproduzidas (ver ARESTAS_PARALELAS.md):
+- Bairros agrupados em subregiões (~5 bairros por subregião, como 94/18)
+- ~9.6 vias por bairro (904 vias / 94 bairros)
+- Vias concentradas em poucos pares: em média ~3.5 vias paralelas por par
+  de bairros vizinhos, chegando a 13 (Água Fria <-> Fundão)
+- Vizinhos preferencialmente na mesma subregião ou em subregiões próximas
+- Distâncias em metros proporcionais à distância entre os bairros
+
+O gerador é determinístico para uma mesma semente.
+"""
+import math
+import os
+import random
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+from grafo import Grafo
+
+BAIRROS_POR_SUBREGIAO = 94 / 18
+VIAS_POR_BAIRRO = 904 / 94
+MEDIA_VIAS_PARALELAS = 3.5
+MAXIMO_VIAS_PARALELAS = 13
+
+# Limite de colunas de uma planilha .xlsx (cada subregião é uma coluna)
+MAXIMO_COLUNAS_XLSX = 16384
+
+# Acima deste número de linhas a planilha .xlsx fica inviável; usa-se CSV
+MAXIMO_LINHAS_XLSX = 200_000
+
+LinhaVia = Tuple[str, str, str, float]
+
+
+def _nome_subregiao(i: int) -> str:
+    # Mesmo formato das subregiões reais: 1.1, 1.2, 1.3, 2.1, ...
+    return f"{i // 3 + 1}.{i % 3 + 1}"
+
+
+def _sortear_multiplicidade(aleatorio: random.Random) -> int:
+    """Número de vias paralelas de um par: 1 + geométrica, truncada no máximo observado"""
+    p = 1 / MEDIA_VIAS_PARALELAS
+    multiplicidade = 1
+    while aleatorio.random() > p and multiplicidade < MAXIMO_VIAS_PARALELAS:
+        multiplicidade += 1
+    return multiplicidade
+
+
+def gerar_grafo_sintetico(num_vertices: int, vias_por_bairro: float = VIAS_POR_BAIRRO,
+                          semente: int = 42) -> Tuple[Dict[str, List[str]], List[LinhaVia]]:
+    """
+    Gera bairros, subregiões e vias de um grafo sintético
+
+    Args:
+        num_vertices: Número de bairros
+        vias_por_bairro: Média de vias (arestas) por bairro
+        semente: Semente do gerador aleatório
+
+    Returns:
+        Tupla (bairros_por_subregiao, linhas), onde cada linha é
+        (bairro_origem, bairro_destino, nome_logradouro, distancia_metros)
+    """
+    aleatorio = random.Random(semente)
+
+    num_subregioes = max(1, min(round(num_vertices / BAIRROS_POR_SUBREGIAO), MAXIMO_COLUNAS_XLSX))
+    lado = math.ceil(math.sqrt(num_subregioes))
+
+    # Subregiões em uma grade; bairros espalhados em torno do centro da sua subregião
+    largura = 4000.0
+    bairros_por_subregiao: Dict[str, List[str]] = {_nome_subregiao(i): [] for i in range(num_subregioes)}
+    membros: List[List[int]] = [[] for _ in range(num_subregioes)]
+    posicoes = []
+    subregiao_de = []
+
+    for v in range(num_vertices):
+        s = v % num_subregioes
+        cx, cy = (s % lado) * largura, (s // lado) * largura
+        posicoes.append((aleatorio.gauss(cx, largura / 4), aleatorio.gauss(cy, largura / 4)))
+        subregiao_de.append(s)
+        membros[s].append(v)
+        bairros_por_subregiao[_nome_subregiao(s)].append(f"Bairro {v}")
+
+    num_vias = round(num_vertices * vias_por_bairro)
+    num_nomes_vias = max(10, num_vias // 4)
+
+    linhas: List[LinhaVia] = []
+    while len(linhas) < num_vias and num_vertices > 1:
+        origem = aleatorio.randrange(num_vertices)
+        s = subregiao_de[origem]
+
+        # 70% dos pares na mesma subregião, o resto em uma subregião vizinha na grade
+        if aleatorio.random() < 0.3 and num_subregioes > 1:
+            dx, dy = aleatorio.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))
+            vizinha = (s % lado + dx) % lado + ((s // lado + dy) % lado) * lado
+            s = vizinha if vizinha < num_subregioes else s
+
+        candidatos = membros[s]
+        destino = candidatos[aleatorio.randrange(len(candidatos))]
+        if destino == origem:
+            continue
+
+        (x1, y1), (x2, y2) = posicoes[origem], posicoes[destino]
+        distancia_base = max(50.0, math.hypot(x2 - x1, y2 - y1))
+
+        for _ in range(min(_sortear_multiplicidade(aleatorio), num_vias - len(linhas))):
+            linhas.append((
+                f"Bairro {origem}",
+                f"Bairro {destino}",
+                f"Rua {aleatorio.randrange(num_nomes_vias)}",
+                round(distancia_base * aleatorio.uniform(0.8, 1.5), 2),
+            ))
+
+    return bairros_por_subregiao, linhas
+
+
+def construir_grafo_sintetico(bairros_por_subregiao: Dict[str, List[str]], linhas: List[LinhaVia]) -> Grafo:
+    """
+    Monta o Grafo diretamente em memória, sem passar pelas planilhas
+
+    Útil para benchmarks de algoritmos, em que o tempo de carga não interessa.
+    """
+    grafo = Grafo()
+    for subregiao, bairros in bairros_por_subregiao.items():
+        for bairro in bairros:
+            grafo.adicionar_vertice(bairro, subregiao)
+
+    if linhas:
+        origens, destinos, vias, pesos = zip(*linhas)
+        grafo.adicionar_arestas_em_lote(origens, destinos, vias, pesos)
+    return grafo
+
+
+def salvar_planilhas(bairros_por_subregiao: Dict[str, List[str]], linhas: List[LinhaVia],
+                     diretorio: str, formato_vias: str = 'auto') -> Tuple[str, str]:
+    """
+    Salva o grafo sintético no formato esperado por construir_grafo_completo
+
+    Args:
+        bairros_por_subregiao: Subregião -> lista de bairros
+        linhas: Linhas de vias geradas por gerar_grafo_sintetico
+        diretorio: Diretório de saída
+        formato_vias: 'xlsx', 'csv', 'parquet' ou 'auto' (xlsx se couber, senão csv)
+
+    Returns:
+        Tupla (caminho_subregioes, caminho_vias)
+    """
+    os.makedirs(diretorio, exist_ok=True)
+
+    altura = max((len(b) for b in bairros_por_subregiao.values()), default=0)
+    df_subregioes = pd.DataFrame({
+        subregiao: bairros + [None] * (altura - len(bairros))
+        for subregiao, bairros in bairros_por_subregiao.items()
+    })
+    caminho_subregioes = os.path.join(diretorio, 'bairros_por_subregiao.xlsx')
+    df_subregioes.to_excel(caminho_subregioes, index=False)
+
+    if formato_vias == 'auto':
+        formato_vias = 'xlsx' if len(linhas) <= MAXIMO_LINHAS_XLSX else 'csv'
+
+    df_vias = pd.DataFrame(linhas, columns=['bairro_origem', 'bairro_destino', 'nome_logradouro', 'distancia_metros'])
+    caminho_vias = os.path.join(diretorio, f'vias.{formato_vias}')
+    if formato_vias == 'xlsx':
+        df_vias.to_excel(caminho_vias, index=False)
+    elif formato_vias == 'csv':
+        df_vias.to_csv(caminho_vias, index=False)
+    elif formato_vias == 'parquet':
+        df_vias.to_parquet(caminho_vias, index=False)
+    else:
+        raise ValueError(f"Formato de vias desconhecido: '{formato_vias}'")
+
+    return caminho_subregioes, caminho_vias
@@ -0,0 +1,110 @@
+"""
+Benchmark de memória por aresta em um grafo sintético
+
+Compara o layout antigo (dois dataclasses Aresta por via, cada um com seu
+__dict__ e suas próprias strings) com o layout atual (um RegistroVia com
+__slots__ compartilhado pelas duas direções e nomes internados).
+
+Uso:
+    python -m benchmarks.memoria_arestas --arestas 1000000
+"""
+import argparse
+import gc
+import random
+import tracemalloc
+from collections import defaultdict
+from dataclasses import dataclass
+
+from grafo import Grafo
+
+
+@dataclass
+class ArestaLegada:
+    """Aresta no formato anterior (dataclass comum, sem __slots__)"""
+    origem: str
+    destino: str
+    nome_via: str
+    peso: float
+
+
+def gerar_linhas(num_arestas: int, num_bairros: int, num_vias: int, semente: int):
+    """
+    Gera as linhas (origem, destino, via, peso) do grafo sintético.
+    Cada linha recebe strings novas, como acontece ao ler uma planilha.
+    """
+    aleatorio = random.Random(semente)
+    for _ in range(num_arestas):
+        # Bairros só se conectam a vizinhos próximos, gerando vias paralelas
+        origem = aleatorio.randrange(num_bairros)
+        destino = (origem + aleatorio.randint(1, 8)) % num_bairros
+        via = aleatorio.randrange(num_vias)
+        yield (f"Bairro {origem} ", f"Bairro {destino}", f"Rua {via} ", aleatorio.uniform(50, 3000))
+
+
+def construir_legado(linhas):
+    """
+    Reproduz o layout antigo: duas instâncias de dataclass por via, guardadas
+    nas adjacências e no índice por par (como em Grafo.adicionar_aresta)
+    """
+    adjacencias = defaultdict(list)
+    arestas_por_par = defaultdict(dict)
+    for origem, destino, via, peso in linhas:
+        origem = origem.strip()
+        destino = destino.strip()
+        aresta = ArestaLegada(origem, destino, via.strip(), peso)
+        aresta_reversa = ArestaLegada(destino, origem, via.strip(), peso)
+        adjacencias[origem].append(aresta)
+        arestas_por_par[origem].setdefault(destino, []).append(aresta)
+        adjacencias[destino].append(aresta_reversa)
+        arestas_por_par[destino].setdefault(origem, []).append(aresta_reversa)
+    return adjacencias, arestas_por_par
+
+
+def construir_atual(linhas):
+    """Constrói um Grafo com o layout atual"""
+    grafo = Grafo()
+    for origem, destino, via, peso in linhas:
+        grafo.adicionar_aresta(origem, destino, via, peso)
+    return grafo
+
+
+def medir(construtor, linhas) -> int:
+    """Retorna os bytes alocados (e ainda vivos) pela estrutura construída"""
+    gc.collect()
+    tracemalloc.start()
+    estrutura = construtor(linhas)
+    atual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estrutura
+    gc.collect()
+    return atual
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de memória por aresta')
+    parser.add_argument('--arestas', type=int, default=1_000_000, help='Número de vias no grafo sintético')
+    parser.add_argument('--bairros', type=int, default=10_000, help='Número de bairros')
+    parser.add_argument('--vias', type=int, default=50_000, help='Número de nomes de via distintos')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador aleatório')
+    args = parser.parse_args()
+
+    print(f"Gerando grafo sintético com {args.arestas} vias...")
+    linhas = list(gerar_linhas(args.arestas, args.bairros, args.vias, args.semente))
+
+    print("Medindo layout antigo (dataclass)...")
+    bytes_antes = medir(construir_legado, linhas)
+
+    print("Medindo layout atual (__slots__ + registro compartilhado)...")
+    bytes_depois = medir(construir_atual, linhas)
+
+    print(f"\n{'='*60}")
+    print("MEMÓRIA POR ARESTA")
+    print(f"{'='*60}")
+    print(f"Antes:  {bytes_antes / args.arestas:8.1f} bytes/via ({bytes_antes / 2**20:.1f} MiB)")
+    print(f"Depois: {bytes_depois / args.arestas:8.1f} bytes/via ({bytes_depois / 2**20:.1f} MiB)")
+    print(f"Redução: {bytes_antes / bytes_depois:.2f}x")
+    print(f"{'='*60}\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+Benchmark do visualizar_plotly: um go.Scatter por via x traço único em lote
+
+Para cada tamanho, mede em um grafo sintético (ver gerador.py) a montagem da
+figura, a serialização para JSON e o tamanho do HTML gerado nas duas formas:
+- por_via: a construção anterior, com um traço por via (reproduzida aqui)
+- em_lote: construir_figura_plotly, com todas as vias em um único traço
+
+A forma por via cresce muito rápido; acima de --limite-por-via vias ela
+não é medida.
+
+Uso:
+    python -m benchmarks.plotly_arestas --vertices 100 1000 10000
+"""
+import argparse
+import time
+from math import cos, pi, sin
+
+import plotly.graph_objects as go
+
+from benchmarks.gerador import construir_grafo_sintetico, gerar_grafo_sintetico
+from visualizar_plotly import construir_figura_plotly
+
+
+def figura_por_via(grafo):
+    """Figura como era montada antes: um go.Scatter por via, mais o traço dos nós"""
+    vertices = list(grafo.vertices.keys())
+    n = len(vertices)
+    posicoes = {
+        vertice: (10 * cos(2 * pi * i / n), 10 * sin(2 * pi * i / n))
+        for i, vertice in enumerate(vertices)
+    }
+
+    edge_traces = []
+    arestas_processadas = set()
+    for origem in grafo.adjacencias:
+        for aresta in grafo.adjacencias[origem]:
+            aresta_id = (origem, aresta.destino, aresta.nome_via, aresta.peso)
+            aresta_reversa_id = (aresta.destino, origem, aresta.nome_via, aresta.peso)
+            if aresta_id not in arestas_processadas and aresta_reversa_id not in arestas_processadas:
+                x0, y0 = posicoes[origem]
+                x1, y1 = posicoes[aresta.destino]
+                edge_traces.append(go.Scatter(
+                    x=[x0, x1, None], y=[y0, y1, None], mode='lines',
+                    line=dict(width=0.5, color='#888'), hoverinfo='text',
+                    text=f"{aresta.nome_via}<br>{aresta.peso:.2f}m", showlegend=False
+                ))
+                arestas_processadas.add(aresta_id)
+
+    node_trace = go.Scatter(
+        x=[posicoes[v][0] for v in vertices], y=[posicoes[v][1] for v in vertices],
+        mode='markers+text', text=vertices, hoverinfo='text', showlegend=False,
+        marker=dict(size=[10 + grafo.grau(v) * 0.5 for v in vertices])
+    )
+    return go.Figure(data=edge_traces + [node_trace])
+
+
+def medir(montar):
+    """Retorna (segundos para montar, segundos para serializar, bytes do HTML, número de traços)"""
+    inicio = time.perf_counter()
+    figura = montar()
+    montagem = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    figura.to_json()
+    serializacao = time.perf_counter() - inicio
+
+    tamanho = len(figura.to_html(include_plotlyjs=False).encode('utf-8'))
+    return montagem, serializacao, tamanho, len(figura.data)
+
+
+def executar(num_vertices: int, limite_por_via: int, semente: int):
+    """Compara as duas formas em um grafo sintético de num_vertices bairros"""
+    bairros_por_subregiao, linhas = gerar_grafo_sintetico(num_vertices, semente=semente)
+    grafo = construir_grafo_sintetico(bairros_por_subregiao, linhas)
+    print(f"\n{num_vertices} bairros, {grafo.num_arestas} vias")
+
+    formas = {'em_lote': lambda: construir_figura_plotly(grafo)[0]}
+    if grafo.num_arestas <= limite_por_via:
+        formas['por_via'] = lambda: figura_por_via(grafo)
+    else:
+        print(f"  por_via ignorado (acima de {limite_por_via} vias)")
+
+    resultados = {}
+    for forma, montar in formas.items():
+        montagem, serializacao, tamanho, tracos = medir(montar)
+        resultados[forma] = montagem + serializacao
+        print(f"  {forma:8s} montagem {montagem:8.3f}s  json {serializacao:8.3f}s  "
+              f"html {tamanho / 1024:10.1f} KiB  {tracos} traços")
+
+    if 'por_via' in resultados:
+        print(f"  em_lote: {resultados['por_via'] / resultados['em_lote']:.1f}x mais rápido")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark das arestas do visualizar_plotly')
+    parser.add_argument('--vertices', type=int, nargs='+', default=[100, 1000],
+                        help='Tamanhos (número de bairros) a medir')
+    parser.add_argument('--limite-por-via', type=int, default=20000,
+                        help='Maior número de vias em que a forma antiga (um traço por via) é medida')
+    parser.add_argument('--semente', type=int, default=42, help='Semente do gerador aleatório')
+    args = parser.parse_args()
+
+    print("="*60)
+    print("VISUALIZAR_PLOTLY: UM TRAÇO POR VIA x TRAÇO ÚNICO")
+    print("="*60)
+    for num_vertices in args.vertices:
+        executar(num_vertices, args.limite_por_via, args.semente)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,457 @@
+"""
+Algoritmos de caminho mínimo sobre o grafo de bairros
+
+Os algoritmos trabalham sobre uma lista de adjacências "colapsada": para cada
+par de bairros vizinhos, apenas a via de menor peso é mantida. Arestas
+paralelas mais longas nunca fazem parte de um caminho mínimo, então
+descartá-las no pré-processamento evita que entrem na fila de prioridade.
+"""
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+RAIO_TERRA_METROS = 6_371_008.8
+
+
+# Para cada bairro: lista de (vizinho, peso, nome_via) com a melhor via até o vizinho
+AdjacenciasColapsadas = Dict[str, List[Tuple[str, float, str]]]
+
+
+@dataclass
+class Caminho:
+    """Representa um caminho entre dois bairros"""
+    origem: str
+    destino: str
+    distancia: float
+    bairros: List[str] = field(default_factory=list)
+    vias: List[str] = field(default_factory=list)
+    # Número de bairros fixados (retirados da fila) durante a busca
+    vertices_expandidos: int = 0
+
+    def __repr__(self):
+        return f"Caminho({self.origem} -> {self.destino}, distancia: {self.distancia:.2f}m, trechos: {len(self.vias)})"
+
+
+def colapsar_arestas_paralelas(adjacencias) -> AdjacenciasColapsadas:
+    """
+    Reduz as arestas paralelas à via de menor peso para cada par de vizinhos
+
+    Args:
+        adjacencias: Mapeamento bairro -> lista de Aresta (como Grafo.adjacencias)
+
+    Returns:
+        Mapeamento bairro -> lista de (vizinho, peso, nome_via)
+    """
+    colapsado = {}
+    for origem, arestas in adjacencias.items():
+        melhores = {}
+        for aresta in arestas:
+            # Laços não contribuem para caminhos mínimos
+            if aresta.destino == origem:
+                continue
+            atual = melhores.get(aresta.destino)
+            if atual is None or aresta.peso < atual[0]:
+                melhores[aresta.destino] = (aresta.peso, aresta.nome_via)
+        colapsado[origem] = [(destino, peso, via) for destino, (peso, via) in melhores.items()]
+    return colapsado
+
+
+def colapsar_por_via(adjacencias) -> AdjacenciasColapsadas:
+    """
+    Como colapsar_arestas_paralelas, mas mantém uma entrada por (vizinho, nome_via)
+
+    Vias paralelas com nomes diferentes continuam sendo alternativas distintas;
+    apenas linhas repetidas da mesma via entre o mesmo par são reduzidas à de
+    menor peso.
+    """
+    colapsado = {}
+    for origem, arestas in adjacencias.items():
+        melhores = {}
+        for aresta in arestas:
+            if aresta.destino == origem:
+                continue
+            chave = (aresta.destino, aresta.nome_via)
+            atual = melhores.get(chave)
+            if atual is None or aresta.peso < atual:
+                melhores[chave] = aresta.peso
+        colapsado[origem] = [(destino, peso, via) for (destino, via), peso in melhores.items()]
+    return colapsado
+
+
+def dijkstra(adjacencias: AdjacenciasColapsadas, origem: str, destino: Optional[str] = None):
+    """
+    Algoritmo de Dijkstra com heap binário (heapq)
+
+    Args:
+        adjacencias: Adjacências colapsadas (ver colapsar_arestas_paralelas)
+        origem: Bairro de partida
+        destino: Se informado, a busca para assim que ele é fixado
+
+    Returns:
+        Tupla (distancias, anteriores, expandidos), onde anteriores mapeia cada
+        bairro alcançado para (bairro anterior, nome da via usada) e expandidos
+        é o número de bairros fixados
+    """
+    distancias = {origem: 0.0}
+    anteriores = {}
+    fixados = set()
+    heap = [(0.0, origem)]
+
+    while heap:
+        distancia, vertice = heapq.heappop(heap)
+        if vertice in fixados:
+            continue
+        fixados.add(vertice)
+
+        if vertice == destino:
+            break
+
+        for vizinho, peso, via in adjacencias.get(vertice, ()):
+            nova_distancia = distancia + peso
+            if nova_distancia < distancias.get(vizinho, float('inf')):
+                distancias[vizinho] = nova_distancia
+                anteriores[vizinho] = (vertice, via)
+                heapq.heappush(heap, (nova_distancia, vizinho))
+
+    return distancias, anteriores, len(fixados)
+
+
+def reconstruir_caminho(anteriores, origem: str, destino: str, distancia: float,
+                        vertices_expandidos: int = 0) -> Caminho:
+    """Monta o Caminho seguindo os anteriores a partir do destino"""
+    bairros = [destino]
+    vias = []
+    vertice = destino
+    while vertice != origem:
+        vertice, via = anteriores[vertice]
+        bairros.append(vertice)
+        vias.append(via)
+
+    bairros.reverse()
+    vias.reverse()
+    return Caminho(origem, destino, distancia, bairros, vias, vertices_expandidos)
+
+
+def caminho_minimo(adjacencias: AdjacenciasColapsadas, origem: str, destino: str) -> Optional[Caminho]:
+    """
+    Calcula o caminho mínimo entre dois bairros
+
+    Returns:
+        Caminho encontrado, ou None se o destino não for alcançável
+    """
+    if origem not in adjacencias or destino not in adjacencias:
+        return None
+
+    distancias, anteriores, expandidos = dijkstra(adjacencias, origem, destino)
+    if destino not in distancias:
+        return None
+
+    return reconstruir_caminho(anteriores, origem, destino, distancias[destino], expandidos)
+
+
+def dijkstra_bidirecional(adjacencias: AdjacenciasColapsadas, origem: str, destino: str) -> Optional[Caminho]:
+    """
+    Dijkstra bidirecional: buscas a partir da origem e do destino que se encontram no meio
+
+    Como o grafo é não direcionado, a busca reversa usa as mesmas adjacências.
+    A cada passo avança o lado cujo topo da fila é menor. Sempre que um bairro
+    já alcançado pelo outro lado é relaxado, o melhor encontro (mu) é atualizado;
+    a busca para quando topo_ida + topo_volta >= mu, pois nenhum caminho ainda
+    não examinado pode ser mais curto.
+
+    Returns:
+        Caminho encontrado, ou None se o destino não for alcançável
+    """
+    if origem not in adjacencias or destino not in adjacencias:
+        return None
+    if origem == destino:
+        return Caminho(origem, destino, 0.0, [origem], [], 1)
+
+    infinito = float('inf')
+    distancias = ({origem: 0.0}, {destino: 0.0})
+    anteriores = ({}, {})
+    fixados = (set(), set())
+    heaps = ([(0.0, origem)], [(0.0, destino)])
+    melhor = infinito
+    encontro = None
+
+    while heaps[0] and heaps[1]:
+        if heaps[0][0][0] + heaps[1][0][0] >= melhor:
+            break
+
+        lado = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        distancia, vertice = heapq.heappop(heaps[lado])
+        if vertice in fixados[lado]:
+            continue
+        fixados[lado].add(vertice)
+
+        distancias_lado, distancias_outro = distancias[lado], distancias[1 - lado]
+        for vizinho, peso, via in adjacencias[vertice]:
+            nova_distancia = distancia + peso
+            if nova_distancia < distancias_lado.get(vizinho, infinito):
+                distancias_lado[vizinho] = nova_distancia
+                anteriores[lado][vizinho] = (vertice, via)
+                heapq.heappush(heaps[lado], (nova_distancia, vizinho))
+
+                if vizinho in distancias_outro:
+                    total = nova_distancia + distancias_outro[vizinho]
+                    if total < melhor:
+                        melhor, encontro = total, vizinho
+
+    if encontro is None:
+        return None
+
+    expandidos = len(fixados[0]) + len(fixados[1])
+    caminho = reconstruir_caminho(anteriores[0], origem, encontro, melhor, expandidos)
+    caminho.destino = destino
+
+    # Segunda metade: do encontro até o destino seguindo os anteriores da busca reversa
+    vertice = encontro
+    while vertice != destino:
+        vertice, via = anteriores[1][vertice]
+        caminho.bairros.append(vertice)
+        caminho.vias.append(via)
+
+    return caminho
+
+
+def distancia_haversine(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Distância em metros sobre a superfície da Terra entre dois pontos (graus)"""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    delta_phi = phi2 - phi1
+    delta_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(delta_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(delta_lambda / 2) ** 2
+    return 2 * RAIO_TERRA_METROS * math.asin(min(1.0, math.sqrt(a)))
+
+
+def fator_heuristica(adjacencias: AdjacenciasColapsadas, coordenadas: Dict[str, Tuple[float, float]]) -> float:
+    """
+    Calcula o fator que torna a heurística de haversine admissível
+
+    O peso de uma via é a distância percorrida entre dois bairros, que pode ser
+    menor que a distância entre os seus centróides. Multiplicando a distância
+    em linha reta pelo menor valor de peso / haversine entre vizinhos (limitado
+    a 1), a heurística nunca superestima o custo restante e é consistente
+    (pela desigualdade triangular).
+
+    Returns:
+        Fator em [0, 1]; 0 se algum bairro não tiver coordenadas (A* vira Dijkstra)
+    """
+    if any(vertice not in coordenadas for vertice in adjacencias):
+        return 0.0
+
+    fator = 1.0
+    for origem, vizinhos in adjacencias.items():
+        latitude1, longitude1 = coordenadas[origem]
+        for destino, peso, _ in vizinhos:
+            linha_reta = distancia_haversine(latitude1, longitude1, *coordenadas[destino])
+            if linha_reta > 0:
+                fator = min(fator, peso / linha_reta)
+    return max(0.0, fator)
+
+
+def a_estrela(adjacencias: AdjacenciasColapsadas, origem: str, destino: str,
+              heuristica: Callable[[str], float]) -> Optional[Caminho]:
+    """
+    Busca A* com heap binário
+
+    Args:
+        adjacencias: Adjacências colapsadas (ver colapsar_arestas_paralelas)
+        origem: Bairro de partida
+        destino: Bairro de chegada
+        heuristica: Limite inferior (admissível e consistente) da distância até o destino
+
+    Returns:
+        Caminho encontrado, ou None se o destino não for alcançável
+    """
+    if origem not in adjacencias or destino not in adjacencias:
+        return None
+
+    distancias = {origem: 0.0}
+    anteriores = {}
+    fixados = set()
+    heap = [(heuristica(origem), 0.0, origem)]
+
+    while heap:
+        _, distancia, vertice = heapq.heappop(heap)
+        if vertice in fixados:
+            continue
+        fixados.add(vertice)
+
+        if vertice == destino:
+            return reconstruir_caminho(anteriores, origem, destino, distancia, len(fixados))
+
+        for vizinho, peso, via in adjacencias[vertice]:
+            nova_distancia = distancia + peso
+            if nova_distancia < distancias.get(vizinho, float('inf')):
+                distancias[vizinho] = nova_distancia
+                anteriores[vizinho] = (vertice, via)
+                heapq.heappush(heap, (nova_distancia + heuristica(vizinho), nova_distancia, vizinho))
+
+    return None
+
+
+def _peso_via(adjacencias: AdjacenciasColapsadas, origem: str, destino: str, via: str) -> float:
+    for vizinho, peso, nome_via in adjacencias[origem]:
+        if vizinho == destino and nome_via == via:
+            return peso
+    raise KeyError((origem, destino, via))
+
+
+def _desvio(adjacencias: AdjacenciasColapsadas, desvio: str, destino: str, bloqueados: set, removidas: set,
+            ate_destino: Dict[str, float], proximos: dict):
+    """
+    Caminho mínimo de desvio até destino sem passar pelos bairros bloqueados
+    nem pelas arestas (vizinho, via) removidas na saída do bairro de desvio
+
+    É uma busca A* cuja heurística é a distância exata até o destino no grafo
+    sem restrições (árvore reversa calculada uma única vez por consulta). Assim
+    que um bairro fixado tem o seu ramo da árvore livre de restrições, o
+    restante do caminho é o próprio ramo e a busca termina.
+
+    Returns:
+        Tupla (bairros, vias) a partir do bairro de desvio, ou None
+    """
+    infinito = float('inf')
+    distancias = {desvio: 0.0}
+    anteriores = {}
+    fixados = set()
+    heap = [(ate_destino[desvio], 0.0, desvio)]
+
+    while heap:
+        _, distancia, vertice = heapq.heappop(heap)
+        if vertice in fixados:
+            continue
+        fixados.add(vertice)
+
+        # O ramo da árvore a partir deste bairro é utilizável?
+        ramo_livre = True
+        atual = vertice
+        while atual != destino:
+            proximo, via = proximos[atual]
+            if (atual == desvio and (proximo, via) in removidas) or proximo in bloqueados or proximo == desvio:
+                ramo_livre = False
+                break
+            atual = proximo
+
+        if ramo_livre:
+            bairros = [vertice]
+            vias = []
+            atual = vertice
+            while atual != desvio:
+                atual, via = anteriores[atual]
+                bairros.append(atual)
+                vias.append(via)
+            bairros.reverse()
+            vias.reverse()
+
+            atual = vertice
+            while atual != destino:
+                atual, via = proximos[atual]
+                bairros.append(atual)
+                vias.append(via)
+            return bairros, vias
+
+        for vizinho, peso, via in adjacencias[vertice]:
+            if vizinho in bloqueados or vizinho == desvio or vizinho not in ate_destino:
+                continue
+            if vertice == desvio and (vizinho, via) in removidas:
+                continue
+            nova_distancia = distancia + peso
+            if nova_distancia < distancias.get(vizinho, infinito):
+                distancias[vizinho] = nova_distancia
+                anteriores[vizinho] = (vertice, via)
+                heapq.heappush(heap, (nova_distancia + ate_destino[vizinho], nova_distancia, vizinho))
+
+    return None
+
+
+def k_caminhos_minimos(adjacencias: AdjacenciasColapsadas, origem: str, destino: str, k: int) -> List[Caminho]:
+    """
+    Os k caminhos mais curtos sem repetição de bairros (algoritmo de Yen)
+
+    Dois caminhos são distintos se diferem na sequência de bairros ou na via
+    usada em algum trecho; com as adjacências de colapsar_por_via, vias
+    paralelas entre os mesmos bairros geram alternativas diferentes.
+
+    A árvore de caminhos mínimos até o destino é calculada uma única vez e
+    reaproveitada em todas as buscas de desvio (ver _desvio).
+
+    Args:
+        adjacencias: Adjacências colapsadas (por par ou por via)
+        origem: Bairro de partida
+        destino: Bairro de chegada
+        k: Número máximo de caminhos
+
+    Returns:
+        Até k caminhos em ordem crescente de distância
+    """
+    if k <= 0 or origem not in adjacencias or destino not in adjacencias:
+        return []
+
+    # Árvore reversa: proximos[v] = (próximo bairro rumo ao destino, via)
+    ate_destino, proximos, _ = dijkstra(adjacencias, destino)
+    if origem not in ate_destino:
+        return []
+    if origem == destino:
+        return [Caminho(origem, destino, 0.0, [origem], [])]
+
+    def acumular(bairros, vias):
+        acumulados = [0.0]
+        for u, v, via in zip(bairros, bairros[1:], vias):
+            acumulados.append(acumulados[-1] + _peso_via(adjacencias, u, v, via))
+        return acumulados
+
+    bairros = [origem]
+    vias = []
+    while bairros[-1] != destino:
+        proximo, via = proximos[bairros[-1]]
+        bairros.append(proximo)
+        vias.append(via)
+
+    # Caminhos aceitos: (bairros, vias, distâncias acumuladas)
+    aceitos = [(bairros, vias, acumular(bairros, vias))]
+    vistos = {(tuple(bairros), tuple(vias))}
+    candidatos = []
+    contador = 0
+
+    while len(aceitos) < k:
+        ultimo_bairros, ultimo_vias, ultimo_acumulados = aceitos[-1]
+
+        for i in range(len(ultimo_bairros) - 1):
+            desvio = ultimo_bairros[i]
+            raiz_bairros = ultimo_bairros[:i + 1]
+            raiz_vias = ultimo_vias[:i]
+
+            # Saídas do bairro de desvio já usadas por caminhos com a mesma raiz
+            removidas = {
+                (bairros[i + 1], vias[i])
+                for bairros, vias, _ in aceitos
+                if bairros[:i + 1] == raiz_bairros and vias[:i] == raiz_vias
+            }
+            bloqueados = set(raiz_bairros[:-1])
+
+            resultado = _desvio(adjacencias, desvio, destino, bloqueados, removidas, ate_destino, proximos)
+            if resultado is None:
+                continue
+
+            desvio_bairros, desvio_vias = resultado
+            bairros = raiz_bairros + desvio_bairros[1:]
+            vias = raiz_vias + desvio_vias
+            chave = (tuple(bairros), tuple(vias))
+            if chave in vistos:
+                continue
+            vistos.add(chave)
+
+            base = ultimo_acumulados[i]
+            acumulados = ultimo_acumulados[:i + 1] + [base + d for d in acumular(desvio_bairros, desvio_vias)[1:]]
+            contador += 1
+            heapq.heappush(candidatos, (acumulados[-1], contador, bairros, vias, acumulados))
+
+        if not candidatos:
+            break
+        _, _, bairros, vias, acumulados = heapq.heappop(candidatos)
+        aceitos.append((bairros, vias, acumulados))
+
+    return [Caminho(origem, destino, acumulados[-1], bairros, vias) for bairros, vias, acumulados in aceitos]
@@ -1,8 +1,18 @@
 """
 Funções para carregar dados das planilhas Excel e construir o grafo
 """
+import json
+import os
+import sys
+import time
+import unicodedata
+from typing import Optional
+
+import numpy as np
 import pandas as pd
 from grafo import Grafo
+from grafo_csr import GrafoCSR
+from snapshot import caminho_snapshot, snapshot_atualizado
 
 
 def carregar_vertices_subregioes(grafo: Grafo, caminho_planilha: str):
@@ -35,6 +45,50 @@ def carregar_vertices_subregioes(grafo: Grafo, caminho_planilha: str):
     return vertices_adicionados
 
 
+COLUNAS_VIAS = ['bairro_origem', 'bairro_destino', 'nome_logradouro', 'distancia_metros']
+
+
+def normalizar_vias(df: pd.DataFrame):
+    """
+    Normaliza as colunas da tabela de vias de forma vetorizada
+
+    Os nomes de bairros e vias são fatorados uma única vez, então valores
+    repetidos passam a ser o mesmo objeto string (já internado).
+
+    Args:
+        df: DataFrame com as colunas de COLUNAS_VIAS
+
+    Returns:
+        Tupla (origens, destinos, vias, pesos) como arrays NumPy
+    """
+    for coluna in COLUNAS_VIAS:
+        if coluna not in df.columns:
+            raise ValueError(f"Coluna '{coluna}' não encontrada na planilha")
+
+    m = len(df)
+
+    # Uma única fatoração para os bairros de origem e de destino. Células
+    # vazias viram 'nan', como str() no carregamento linha a linha (o dtype
+    # de texto do pandas mantém NaN após astype(str), e factorize daria -1)
+    bairros = pd.concat(
+        [df['bairro_origem'], df['bairro_destino']], ignore_index=True
+    ).astype(str).fillna('nan').str.strip()
+    codigos_bairros, nomes_bairros = pd.factorize(bairros)
+    nomes_bairros = np.array([sys.intern(nome) for nome in nomes_bairros], dtype=object)
+
+    codigos_vias, nomes_vias = pd.factorize(df['nome_logradouro'].astype(str).fillna('nan').str.strip())
+    nomes_vias = np.array([sys.intern(nome) for nome in nomes_vias], dtype=object)
+    if (codigos_bairros < 0).any() or (codigos_vias < 0).any():
+        raise ValueError("Valor ausente não convertido na tabela de vias")
+
+    origens = nomes_bairros[codigos_bairros[:m]]
+    destinos = nomes_bairros[codigos_bairros[m:]]
+    vias = nomes_vias[codigos_vias]
+    pesos = df['distancia_metros'].astype(float).to_numpy()
+
+    return origens, destinos, vias, pesos
+
+
 def carregar_arestas_vias(grafo: Grafo, caminho_planilha: str):
     """
     Carrega as arestas (vias) da planilha principal
@@ -47,36 +101,222 @@ def carregar_arestas_vias(grafo: Grafo, caminho_planilha: str):
 
     df = pd.read_excel(caminho_planilha)
 
-    # Verifica se as colunas necessárias existem
-    colunas_necessarias = ['bairro_origem', 'bairro_destino', 'nome_logradouro', 'distancia_metros']
-    for coluna in colunas_necessarias:
-        if coluna not in df.columns:
-            raise ValueError(f"Coluna '{coluna}' não encontrada na planilha")
+    origens, destinos, vias, pesos = normalizar_vias(df)
+
+    # Adiciona todas as arestas em uma única passagem
+    arestas_adicionadas = grafo.adicionar_arestas_em_lote(
+        origens.tolist(), destinos.tolist(), vias.tolist(), pesos.tolist()
+    )
+
+    print(f"✓ {arestas_adicionadas} arestas adicionadas")
+    return arestas_adicionadas
+
+
+TAMANHO_BLOCO_PADRAO = 100_000
+
+EXTENSOES_CSV = ('.csv',)
+EXTENSOES_PARQUET = ('.parquet', '.pq')
+
+
+def _ler_blocos_csv(caminho: str, tamanho_bloco: int):
+    """Lê a tabela de vias em blocos de linhas (pd.read_csv com chunksize)"""
+    return pd.read_csv(caminho, chunksize=tamanho_bloco, usecols=lambda c: c in COLUNAS_VIAS)
+
+
+def _ler_blocos_parquet(caminho: str, tamanho_bloco: int):
+    """Lê a tabela de vias em lotes, um grupo de linhas (row group) por vez"""
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Leitura de Parquet requer o pacote 'pyarrow' (pip install pyarrow)")
+
+    arquivo = pq.ParquetFile(caminho)
+    colunas = [c for c in COLUNAS_VIAS if c in arquivo.schema_arrow.names]
+    for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=colunas):
+        yield lote.to_pandas()
+
+
+def carregar_arestas_vias_streaming(grafo: Grafo, caminho_arquivo: str,
+                                    tamanho_bloco: int = TAMANHO_BLOCO_PADRAO):
+    """
+    Carrega as arestas (vias) de um arquivo CSV ou Parquet em blocos
+
+    Apenas um bloco fica em memória por vez, então o pico de memória é o
+    grafo mais um bloco, e não o grafo mais a tabela inteira.
+
+    Args:
+        grafo: Instância do grafo onde as arestas serão adicionadas
+        caminho_arquivo: Caminho para o arquivo .csv ou .parquet de vias
+        tamanho_bloco: Número máximo de linhas lidas por bloco
+    """
+    print(f"Carregando arestas de: {caminho_arquivo} (blocos de {tamanho_bloco} linhas)")
+
+    extensao = os.path.splitext(caminho_arquivo)[1].lower()
+    if extensao in EXTENSOES_PARQUET:
+        blocos = _ler_blocos_parquet(caminho_arquivo, tamanho_bloco)
+    elif extensao in EXTENSOES_CSV:
+        blocos = _ler_blocos_csv(caminho_arquivo, tamanho_bloco)
+    else:
+        raise ValueError(f"Formato não suportado para leitura em blocos: '{extensao}'")
 
     arestas_adicionadas = 0
+    inicio = time.perf_counter()
 
-    # Itera por cada linha da planilha
-    for _, row in df.iterrows():
-        origem = str(row['bairro_origem']).strip()
-        destino = str(row['bairro_destino']).strip()
-        nome_via = str(row['nome_logradouro']).strip()
-        peso = float(row['distancia_metros'])
+    for df in blocos:
+        origens, destinos, vias, pesos = normalizar_vias(df)
+        arestas_adicionadas += grafo.adicionar_arestas_em_lote(
+            origens.tolist(), destinos.tolist(), vias.tolist(), pesos.tolist()
+        )
 
-        # Adiciona a aresta
-        grafo.adicionar_aresta(origem, destino, nome_via, peso)
-        arestas_adicionadas += 1
+        decorrido = time.perf_counter() - inicio
+        taxa = arestas_adicionadas / decorrido if decorrido > 0 else 0.0
+        print(f"  {arestas_adicionadas} linhas processadas ({taxa:,.0f} linhas/s)")
 
-    print(f"✓ {arestas_adicionadas} arestas adicionadas")
+    decorrido = time.perf_counter() - inicio
+    taxa = arestas_adicionadas / decorrido if decorrido > 0 else 0.0
+    print(f"✓ {arestas_adicionadas} arestas adicionadas em {decorrido:.2f}s ({taxa:,.0f} linhas/s)")
     return arestas_adicionadas
 
 
-def construir_grafo_completo(caminho_subregioes: str, caminho_vias: str) -> Grafo:
+def carregar_arestas(grafo: Grafo, caminho_vias: str, tamanho_bloco: int = TAMANHO_BLOCO_PADRAO):
+    """
+    Carrega as arestas escolhendo o leitor pela extensão do arquivo:
+    .csv e .parquet são lidos em blocos; os demais (.xlsx) de uma vez
+    """
+    extensao = os.path.splitext(caminho_vias)[1].lower()
+    if extensao in EXTENSOES_CSV + EXTENSOES_PARQUET:
+        return carregar_arestas_vias_streaming(grafo, caminho_vias, tamanho_bloco)
+    return carregar_arestas_vias(grafo, caminho_vias)
+
+
+COLUNAS_LATITUDE = ('latitude', 'lat')
+COLUNAS_LONGITUDE = ('longitude', 'lon', 'lng')
+CHAVES_NOME_BAIRRO = ('bairro', 'nome', 'name', 'EBAIRRNOMEOF')
+
+
+def _chave_bairro(nome: str) -> str:
+    """Chave de comparação sem acentos e sem diferença de maiúsculas"""
+    sem_acentos = unicodedata.normalize('NFKD', str(nome)).encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sem_acentos.lower().split())
+
+
+def _centroide_anel(anel) -> tuple:
+    """Centróide (lon, lat) de um anel de polígono pela fórmula do laço (shoelace)"""
+    area = cx = cy = 0.0
+    for (x1, y1), (x2, y2) in zip(anel, anel[1:] + anel[:1]):
+        cruzado = x1 * y2 - x2 * y1
+        area += cruzado
+        cx += (x1 + x2) * cruzado
+        cy += (y1 + y2) * cruzado
+
+    if area == 0:
+        # Anel degenerado: média simples dos pontos
+        return (sum(p[0] for p in anel) / len(anel), sum(p[1] for p in anel) / len(anel))
+    return (cx / (3 * area), cy / (3 * area))
+
+
+def _ler_coordenadas_geojson(caminho: str):
+    """Lê (bairro, latitude, longitude) de pontos ou polígonos (centróide do maior anel externo)"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+
+    for feature in dados.get('features', []):
+        propriedades = feature.get('properties') or {}
+        geometria = feature.get('geometry') or {}
+        nome = next((propriedades[c] for c in CHAVES_NOME_BAIRRO if propriedades.get(c)), None)
+        if nome is None:
+            continue
+
+        tipo = geometria.get('type')
+        coordenadas = geometria.get('coordinates')
+        if tipo == 'Point':
+            longitude, latitude = coordenadas[:2]
+        elif tipo in ('Polygon', 'MultiPolygon'):
+            poligonos = coordenadas if tipo == 'MultiPolygon' else [coordenadas]
+            aneis = [[tuple(p[:2]) for p in poligono[0]] for poligono in poligonos]
+            longitude, latitude = _centroide_anel(max(aneis, key=len))
+        else:
+            continue
+
+        yield str(nome), float(latitude), float(longitude)
+
+
+def _ler_coordenadas_csv(caminho: str):
+    """Lê (bairro, latitude, longitude) de um CSV com colunas bairro e latitude/longitude"""
+    df = pd.read_csv(caminho)
+    colunas = {c.strip().lower(): c for c in df.columns}
+
+    coluna_bairro = next((colunas[c.lower()] for c in CHAVES_NOME_BAIRRO if c.lower() in colunas), None)
+    coluna_latitude = next((colunas[c] for c in COLUNAS_LATITUDE if c in colunas), None)
+    coluna_longitude = next((colunas[c] for c in COLUNAS_LONGITUDE if c in colunas), None)
+    if coluna_bairro is None or coluna_latitude is None or coluna_longitude is None:
+        raise ValueError(f"{caminho}: esperadas as colunas bairro, latitude e longitude")
+
+    df = df[[coluna_bairro, coluna_latitude, coluna_longitude]].dropna()
+    for nome, latitude, longitude in df.itertuples(index=False):
+        yield str(nome), float(latitude), float(longitude)
+
+
+def carregar_coordenadas(grafo: Grafo, caminho: str) -> int:
+    """
+    Carrega os centróides dos bairros (usados pela heurística do A*)
+
+    Aceita CSV (colunas bairro, latitude, longitude) ou GeoJSON (pontos ou
+    polígonos dos bairros). Os nomes são comparados primeiro exatamente e
+    depois sem acentos e sem diferença de maiúsculas.
+
+    Args:
+        grafo: Grafo onde as coordenadas serão definidas
+        caminho: Caminho para o arquivo .csv, .geojson ou .json
+
+    Returns:
+        Número de bairros do grafo que receberam coordenadas
+    """
+    print(f"Carregando coordenadas de: {caminho}")
+
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao in ('.geojson', '.json'):
+        registros = _ler_coordenadas_geojson(caminho)
+    else:
+        registros = _ler_coordenadas_csv(caminho)
+
+    por_chave = {_chave_bairro(nome): nome for nome in grafo.vertices}
+    definidos = set()
+    nao_encontrados = []
+
+    for nome, latitude, longitude in registros:
+        nome = nome.strip()
+        bairro = nome if nome in grafo.vertices else por_chave.get(_chave_bairro(nome))
+        if bairro is None:
+            nao_encontrados.append(nome)
+            continue
+        grafo.definir_coordenadas(bairro, latitude, longitude)
+        definidos.add(bairro)
+
+    print(f"✓ Coordenadas definidas para {len(definidos)} de {grafo.num_vertices()} bairros")
+    if nao_encontrados:
+        print(f"  {len(nao_encontrados)} registros sem bairro correspondente: {', '.join(nao_encontrados[:5])}"
+              + ('...' if len(nao_encontrados) > 5 else ''))
+
+    return len(definidos)
+
+
+def construir_grafo_completo(caminho_subregioes: str, caminho_vias: str, usar_snapshot: bool = True,
+                             tamanho_bloco: int = TAMANHO_BLOCO_PADRAO,
+                             caminho_coordenadas: Optional[str] = None) -> Grafo:
     """
     Constrói o grafo completo a partir das duas planilhas
 
+    Se existir um snapshot binário atualizado ao lado da planilha de vias, o
+    grafo é carregado dele sem ler as planilhas. Caso contrário, o grafo é
+    construído normalmente e o snapshot é (re)gerado.
+
     Args:
         caminho_subregioes: Caminho para a planilha de bairros por subregião
-        caminho_vias: Caminho para a planilha de vias
+        caminho_vias: Caminho para a planilha de vias (.xlsx, .csv ou .parquet)
+        usar_snapshot: Se False, sempre lê as planilhas e não grava snapshot
+        tamanho_bloco: Linhas por bloco ao ler vias em CSV/Parquet
+        caminho_coordenadas: CSV ou GeoJSON opcional com os centróides dos bairros
 
     Returns:
         Grafo construído
@@ -85,6 +325,24 @@ def construir_grafo_completo(caminho_subregioes: str, caminho_vias: str) -> Graf
     print("CONSTRUINDO GRAFO DE BAIRROS")
     print("="*60 + "\n")
 
+    fontes = (caminho_subregioes, caminho_vias)
+    arquivo_snapshot = caminho_snapshot(caminho_vias)
+
+    if usar_snapshot and snapshot_atualizado(arquivo_snapshot, fontes):
+        print(f"Carregando grafo do snapshot: {arquivo_snapshot}")
+        try:
+            grafo = Grafo.carregar_snapshot(arquivo_snapshot)
+        except (OSError, ValueError) as e:
+            print(f"Snapshot inválido ({e}), lendo as planilhas...")
+        else:
+            print(f"✓ {grafo.num_vertices()} vértices e {grafo.num_arestas} arestas carregados")
+            if caminho_coordenadas:
+                carregar_coordenadas(grafo, caminho_coordenadas)
+            print("\n" + "="*60)
+            print("GRAFO CONSTRUÍDO COM SUCESSO!")
+            print("="*60)
+            return grafo
+
     grafo = Grafo()
 
     # Passo 1: Carregar vértices (bairros com suas subregiões)
@@ -93,10 +351,79 @@ def construir_grafo_completo(caminho_subregioes: str, caminho_vias: str) -> Graf
 
     # Passo 2: Carregar arestas (vias entre bairros)
     print("\nPasso 2: Carregando arestas (vias)...")
-    carregar_arestas_vias(grafo, caminho_vias)
+    carregar_arestas(grafo, caminho_vias, tamanho_bloco)
+
+    if usar_snapshot:
+        try:
+            grafo.salvar_snapshot(arquivo_snapshot, fontes)
+            print(f"\n✓ Snapshot salvo em: {arquivo_snapshot}")
+        except OSError as e:
+            print(f"\nNão foi possível salvar o snapshot ({e})")
+
+    if caminho_coordenadas:
+        print("\nPasso 3: Carregando coordenadas dos bairros...")
+        carregar_coordenadas(grafo, caminho_coordenadas)
 
     print("\n" + "="*60)
     print("GRAFO CONSTRUÍDO COM SUCESSO!")
     print("="*60)
 
     return grafo
+
+
+def construir_grafo_csr(caminho_subregioes: str, caminho_vias: str) -> GrafoCSR:
+    """
+    Constrói diretamente a representação compacta (CSR) a partir das duas planilhas,
+    sem criar objetos Aresta intermediários
+
+    Args:
+        caminho_subregioes: Caminho para a planilha de bairros por subregião
+        caminho_vias: Caminho para a planilha de vias
+
+    Returns:
+        GrafoCSR equivalente a GrafoCSR.de_grafo(construir_grafo_completo(...))
+    """
+    print(f"Carregando vértices de: {caminho_subregioes}")
+
+    df_subregioes = pd.read_excel(caminho_subregioes)
+
+    nomes = []
+    indices = {}
+    subregioes = []
+
+    for coluna in df_subregioes.columns:
+        for bairro in df_subregioes[coluna].dropna():
+            bairro_nome = str(bairro).strip()
+
+            if bairro_nome:
+                if bairro_nome not in indices:
+                    indices[bairro_nome] = len(nomes)
+                    nomes.append(bairro_nome)
+                    subregioes.append(coluna)
+                else:
+                    subregioes[indices[bairro_nome]] = coluna
+
+    print(f"Carregando arestas de: {caminho_vias}")
+
+    df = pd.read_excel(caminho_vias)
+
+    origens, destinos, nomes_vias, pesos = normalizar_vias(df)
+
+    # Bairros que só aparecem na planilha de vias entram na ordem em que surgem
+    extremos = np.column_stack([origens, destinos]).ravel()
+    for bairro_nome in pd.unique(extremos):
+        if bairro_nome not in indices:
+            indices[bairro_nome] = len(nomes)
+            nomes.append(bairro_nome)
+            subregioes.append(None)
+
+    ids_origem = np.fromiter((indices[b] for b in origens), dtype=np.int64, count=len(origens))
+    ids_destino = np.fromiter((indices[b] for b in destinos), dtype=np.int64, count=len(destinos))
+    ids_vias, tabela_vias = pd.factorize(nomes_vias)
+
+    grafo_csr = GrafoCSR.de_arrays(
+        nomes, ids_origem, ids_destino, ids_vias, pesos, list(tabela_vias), subregioes
+    )
+
+    print(f"✓ {grafo_csr.num_vertices()} vértices e {grafo_csr.num_arestas} arestas carregados")
+    return grafo_csr
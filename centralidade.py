@@ -0,0 +1,544 @@
+"""
+Centralidades de bairros: intermediação (Brandes), PageRank e autovetor
+
+Na intermediação (betweenness, algoritmo de Brandes), as fontes são
+divididas entre processos de um multiprocessing.Pool. Cada processo recebe
+uma única vez a forma em arrays do grafo (CSR com as arestas paralelas
+reduzidas à via mais curta), nunca objetos Aresta, e devolve o seu vetor
+parcial de dependências; os vetores são somados no final.
+
+Para a intermediação entre bairros, vias paralelas não criam caminhos
+diferentes: no modo ponderado vale a via mais curta de cada par e no modo
+não ponderado cada par de vizinhos é um único salto.
+
+PageRank e autovetor usam iteração de potência sobre uma matriz de
+adjacência esparsa (pares únicos em formato COO, produto via np.bincount),
+em que as vias paralelas somam peso em vez de contar como vizinhos novos.
+"""
+import heapq
+import math
+import multiprocessing
+import os
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Abaixo deste número de bairros, criar processos custa mais que o cálculo
+MINIMO_VERTICES_PARALELO = 500
+
+# Blocos de fontes por processo (blocos menores equilibram melhor a carga)
+BLOCOS_POR_PROCESSO = 4
+
+# Estado de cada processo do pool (preenchido por _iniciar_processo)
+_offsets: List[int] = []
+_alvos: List[int] = []
+_pesos: List[float] = []
+_ponderado = True
+
+
+def arrays_colapsados(grafo):
+    """
+    Forma em arrays (CSR) das adjacências colapsadas do grafo
+
+    Returns:
+        Tupla (nomes, offsets, alvos, pesos): bairros na ordem de grafo.vertices
+        e, para cada bairro i, os vizinhos alvos[offsets[i]:offsets[i+1]]
+        com o peso da via mais curta
+    """
+    nomes = list(grafo.vertices.keys())
+    indices = {nome: i for i, nome in enumerate(nomes)}
+    adjacencias = grafo.adjacencias_colapsadas()
+
+    graus = np.fromiter((len(adjacencias.get(nome, ())) for nome in nomes), dtype=np.int64, count=len(nomes))
+    offsets = np.zeros(len(nomes) + 1, dtype=np.int64)
+    np.cumsum(graus, out=offsets[1:])
+
+    alvos = np.fromiter(
+        (indices[destino] for nome in nomes for destino, _, _ in adjacencias.get(nome, ())),
+        dtype=np.int32, count=int(offsets[-1])
+    )
+    pesos = np.fromiter(
+        (peso for nome in nomes for _, peso, _ in adjacencias.get(nome, ())),
+        dtype=np.float64, count=int(offsets[-1])
+    )
+    return nomes, offsets, alvos, pesos
+
+
+def _iniciar_processo(offsets: np.ndarray, alvos: np.ndarray, pesos: np.ndarray, ponderado: bool):
+    """Recebe os arrays do grafo uma única vez por processo"""
+    global _offsets, _alvos, _pesos, _ponderado
+    # Listas Python são mais rápidas que escalares NumPy no laço da busca
+    _offsets = offsets.tolist()
+    _alvos = alvos.tolist()
+    _pesos = pesos.tolist()
+    _ponderado = ponderado
+
+
+def _caminhos_mais_curtos(fonte: int):
+    """
+    Busca a partir da fonte (BFS ou Dijkstra)
+
+    Returns:
+        Tupla (ordem, antecessores, sigma): bairros em ordem não decrescente de
+        distância, antecessores em caminhos mínimos e número de caminhos mínimos
+    """
+    offsets, alvos, pesos = _offsets, _alvos, _pesos
+    ordem = []
+    antecessores = {fonte: []}
+    sigma = {fonte: 1.0}
+
+    if not _ponderado:
+        distancias = {fonte: 0}
+        fila = deque([fonte])
+        while fila:
+            v = fila.popleft()
+            ordem.append(v)
+            proxima = distancias[v] + 1
+            for k in range(offsets[v], offsets[v + 1]):
+                w = alvos[k]
+                if w not in distancias:
+                    distancias[w] = proxima
+                    fila.append(w)
+                    sigma[w] = 0.0
+                    antecessores[w] = []
+                if distancias[w] == proxima:
+                    sigma[w] += sigma[v]
+                    antecessores[w].append(v)
+        return ordem, antecessores, sigma
+
+    distancias = {}
+    vistos = {fonte: 0.0}
+    heap = [(0.0, fonte, fonte)]
+    while heap:
+        distancia, anterior, v = heapq.heappop(heap)
+        if v in distancias:
+            continue
+        if v != fonte:
+            sigma[v] += sigma[anterior]
+        ordem.append(v)
+        distancias[v] = distancia
+        for k in range(offsets[v], offsets[v + 1]):
+            w = alvos[k]
+            nova_distancia = distancia + pesos[k]
+            if w not in distancias and (w not in vistos or nova_distancia < vistos[w]):
+                vistos[w] = nova_distancia
+                heapq.heappush(heap, (nova_distancia, v, w))
+                sigma[w] = 0.0
+                antecessores[w] = [v]
+            elif nova_distancia == vistos.get(w):
+                sigma[w] += sigma[v]
+                antecessores[w].append(v)
+    return ordem, antecessores, sigma
+
+
+def _dependencias(fontes: Sequence[int]) -> np.ndarray:
+    """Soma das dependências de Brandes das fontes dadas (vetor parcial)"""
+    centralidade = np.zeros(len(_offsets) - 1, dtype=np.float64)
+    for fonte in fontes:
+        ordem, antecessores, sigma = _caminhos_mais_curtos(fonte)
+        delta = dict.fromkeys(ordem, 0.0)
+        for w in reversed(ordem):
+            coeficiente = (1.0 + delta[w]) / sigma[w]
+            for v in antecessores[w]:
+                delta[v] += sigma[v] * coeficiente
+            if w != fonte:
+                centralidade[w] += delta[w]
+    return centralidade
+
+
+@contextmanager
+def _somador(offsets, alvos, pesos, ponderado: bool, processos: Optional[int]):
+    """
+    Abre (uma única vez) os processos e devolve uma função fontes -> soma das
+    dependências; permite várias rodadas de fontes sobre o mesmo pool
+    """
+    n = len(offsets) - 1
+    if processos is None:
+        processos = os.cpu_count() or 1
+
+    if processos <= 1 or n < MINIMO_VERTICES_PARALELO:
+        _iniciar_processo(offsets, alvos, pesos, ponderado)
+        yield _dependencias
+        return
+
+    num_blocos = processos * BLOCOS_POR_PROCESSO
+    with multiprocessing.Pool(processos, initializer=_iniciar_processo,
+                              initargs=(offsets, alvos, pesos, ponderado)) as pool:
+        def somar(fontes: Sequence[int]) -> np.ndarray:
+            blocos = [list(fontes[i::num_blocos]) for i in range(num_blocos)]
+            parciais = pool.map(_dependencias, [b for b in blocos if b])
+            return np.sum(parciais, axis=0) if parciais else np.zeros(n, dtype=np.float64)
+        yield somar
+
+
+def _somar_dependencias(offsets, alvos, pesos, ponderado: bool, fontes: Sequence[int],
+                        processos: Optional[int]) -> np.ndarray:
+    """Distribui as fontes entre os processos e soma os vetores parciais"""
+    with _somador(offsets, alvos, pesos, ponderado, processos) as somar:
+        return somar(fontes)
+
+
+def _escalar(centralidade: np.ndarray, normalizar: bool, fator_amostragem: float = 1.0) -> np.ndarray:
+    """Ajusta a soma das dependências para um grafo não direcionado"""
+    n = len(centralidade)
+    if normalizar:
+        escala = 1.0 / ((n - 1) * (n - 2)) if n > 2 else 1.0
+    else:
+        # Cada caminho é contado a partir das suas duas pontas
+        escala = 0.5
+    return centralidade * escala * fator_amostragem
+
+
+def centralidade_intermediacao(grafo, ponderado: bool = True, normalizar: bool = True,
+                               processos: Optional[int] = None, epsilon: Optional[float] = None,
+                               top_k: Optional[int] = None, semente: Optional[int] = None) -> Dict[str, float]:
+    """
+    Calcula a centralidade de intermediação exata de todos os bairros
+
+    Args:
+        grafo: Grafo de bairros
+        ponderado: Se True, caminhos mínimos em metros; se False, em número de saltos
+        normalizar: Divide pelo número de pares de outros bairros ((n-1)(n-2)/2)
+        processos: Número de processos (padrão: número de CPUs; 1 calcula no
+            próprio processo)
+        epsilon: Se informado, calcula a versão aproximada por amostragem de
+            fontes com esse erro máximo (em escala normalizada); ver
+            centralidade_intermediacao_aproximada
+        top_k: Só no modo aproximado: para quando os top_k bairros estabilizam
+        semente: Só no modo aproximado: semente do sorteio das fontes
+
+    Returns:
+        Dicionário bairro -> centralidade
+    """
+    if epsilon is not None:
+        return centralidade_intermediacao_aproximada(
+            grafo, ponderado=ponderado, normalizar=normalizar, processos=processos,
+            epsilon=epsilon, top_k=top_k, semente=semente
+        ).valores
+
+    nomes, offsets, alvos, pesos = arrays_colapsados(grafo)
+    soma = _somar_dependencias(offsets, alvos, pesos, ponderado, range(len(nomes)), processos)
+    return dict(zip(nomes, _escalar(soma, normalizar).tolist()))
+
+
+@dataclass
+class CentralidadeAproximada:
+    """
+    Resultado de centralidade_intermediacao_aproximada
+
+    Com probabilidade `confianca`, todos os valores estão a no máximo `erro`
+    (na mesma escala de `valores`) da centralidade exata.
+    """
+    valores: Dict[str, float]
+    erro: float
+    confianca: float
+    # Fontes usadas e total de bairros (amostras == num_vertices: resultado exato)
+    amostras: int
+    num_vertices: int
+    # Por que a amostragem parou: 'epsilon', 'top_k', 'amostras' ou 'exata'
+    motivo: str
+
+    @property
+    def exata(self) -> bool:
+        return self.amostras >= self.num_vertices
+
+    def top(self, k: int) -> List[str]:
+        """Os k bairros de maior centralidade estimada"""
+        return sorted(self.valores, key=self.valores.get, reverse=True)[:k]
+
+
+def _erro_amostragem(n: int, amostras: int, confianca: float) -> float:
+    """
+    Erro máximo (escala normalizada) de todas as estimativas com `amostras` fontes
+
+    Cada fonte s contribui n * delta_s(v) / ((n-1)(n-2)) <= n / (n-1) para a
+    média que define a centralidade normalizada de v. Hoeffding-Serfling
+    (amostragem sem reposição) com união sobre os n bairros dá
+    erro = R * sqrt((1 - (m-1)/n) * ln(2n / (1 - confianca)) / (2m)).
+    """
+    if amostras >= n or n <= 2:
+        return 0.0
+    if amostras <= 0:
+        return math.inf
+    amplitude = n / (n - 1)
+    correcao = 1.0 - (amostras - 1) / n
+    return amplitude * math.sqrt(correcao * math.log(2 * n / (1.0 - confianca)) / (2 * amostras))
+
+
+def amostras_necessarias(n: int, epsilon: float, confianca: float = 0.95) -> int:
+    """Número de fontes que garante erro <= epsilon (escala normalizada) para n bairros"""
+    if n <= 2:
+        return n
+    amplitude = n / (n - 1)
+    # Sem a correção de população finita (limite conservador)
+    m = math.ceil(amplitude ** 2 * math.log(2 * n / (1.0 - confianca)) / (2 * epsilon ** 2))
+    return min(n, m)
+
+
+def centralidade_intermediacao_aproximada(grafo, ponderado: bool = True, normalizar: bool = True,
+                                          processos: Optional[int] = None, epsilon: float = 0.01,
+                                          confianca: float = 0.95, amostras: Optional[int] = None,
+                                          top_k: Optional[int] = None, rodadas_estaveis: int = 3,
+                                          tamanho_lote: Optional[int] = None,
+                                          semente: Optional[int] = None) -> CentralidadeAproximada:
+    """
+    Estima a centralidade de intermediação a partir de uma amostra de fontes
+
+    As fontes são sorteadas uniformemente, sem reposição, e processadas em
+    lotes (usando o mesmo pool de processos do cálculo exato). Depois de cada
+    lote, a soma parcial é extrapolada para os n bairros (n / amostras) e a
+    amostragem para quando:
+      - o limite de erro com a confiança pedida fica abaixo de epsilon, ou
+      - o conjunto dos top_k bairros não muda por `rodadas_estaveis` lotes
+        seguidos (se top_k for informado; a ordem interna pode oscilar entre
+        bairros quase empatados), ou
+      - `amostras` fontes foram usadas (se informado; ignora epsilon).
+    Usando todas as fontes, o resultado é igual ao exato.
+
+    Args:
+        grafo: Grafo de bairros
+        ponderado: Se True, caminhos mínimos em metros; se False, em número de saltos
+        normalizar: Divide pelo número de pares de outros bairros ((n-1)(n-2)/2)
+        processos: Número de processos (padrão: número de CPUs)
+        epsilon: Erro máximo desejado, na escala normalizada
+        confianca: Probabilidade de o erro valer para todos os bairros ao mesmo tempo
+        amostras: Número fixo de fontes (desliga a parada por epsilon)
+        top_k: Número de bairros do topo usados na parada antecipada
+        rodadas_estaveis: Lotes seguidos com o mesmo ranking para parar
+        tamanho_lote: Fontes por lote (padrão: 2% dos bairros, no mínimo 64)
+        semente: Semente do sorteio das fontes
+
+    Returns:
+        CentralidadeAproximada com os valores e o limite de erro alcançado
+    """
+    if not 0.0 < confianca < 1.0:
+        raise ValueError("confianca deve estar entre 0 e 1")
+    if amostras is None and epsilon <= 0:
+        raise ValueError("epsilon deve ser positivo")
+
+    nomes, offsets, alvos, pesos = arrays_colapsados(grafo)
+    n = len(nomes)
+    meta = min(n, amostras) if amostras is not None else amostras_necessarias(n, epsilon, confianca)
+    if tamanho_lote is None:
+        tamanho_lote = max(64, n // 50)
+
+    fontes = np.random.default_rng(semente).permutation(n)
+    soma = np.zeros(n, dtype=np.float64)
+    usadas = 0
+    ranking = None
+    estavel = 0
+    motivo = 'amostras' if amostras is not None else 'epsilon'
+
+    with _somador(offsets, alvos, pesos, ponderado, processos) as somar:
+        while usadas < meta:
+            lote = fontes[usadas:min(meta, usadas + tamanho_lote)].tolist()
+            soma += somar(lote)
+            usadas += len(lote)
+
+            if top_k and usadas < meta:
+                atual = frozenset(np.argsort(-soma, kind='stable')[:top_k].tolist())
+                estavel = estavel + 1 if atual == ranking else 0
+                ranking = atual
+                if estavel >= rodadas_estaveis:
+                    motivo = 'top_k'
+                    break
+
+    if usadas >= n:
+        motivo = 'exata'
+    valores = _escalar(soma, normalizar, n / usadas if usadas else 0.0)
+    erro = _erro_amostragem(n, usadas, confianca)
+    if not normalizar and n > 2:
+        erro *= (n - 1) * (n - 2) / 2
+    return CentralidadeAproximada(
+        valores=dict(zip(nomes, valores.tolist())), erro=erro, confianca=confianca,
+        amostras=usadas, num_vertices=n, motivo=motivo
+    )
+
+
+# Pesos aceitos por matriz_adjacencia_esparsa
+PESOS_ESPARSOS = ('multiplicidade', 'inverso_distancia', 'binario')
+
+
+@dataclass
+class MatrizEsparsa:
+    """
+    Matriz de adjacência ponderada e simétrica em formato COO (pares únicos)
+
+    A entrada (linhas[k], colunas[k]) vale valores[k]; cada par de bairros
+    vizinhos aparece nas duas direções, com as vias paralelas já somadas.
+    """
+    nomes: List[str]
+    linhas: np.ndarray
+    colunas: np.ndarray
+    valores: np.ndarray
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.nomes)
+
+    def multiplicar(self, x: np.ndarray) -> np.ndarray:
+        """Produto matriz-vetor A @ x sem formar a matriz densa"""
+        return np.bincount(self.linhas, weights=self.valores * x[self.colunas], minlength=len(self.nomes))
+
+    def forca(self) -> np.ndarray:
+        """Soma dos pesos de cada linha (grau ponderado)"""
+        return np.bincount(self.linhas, weights=self.valores, minlength=len(self.nomes))
+
+
+def matriz_adjacencia_esparsa(grafo, pesos: str = 'multiplicidade') -> MatrizEsparsa:
+    """
+    Monta uma única vez a matriz de adjacência esparsa a partir de grafo.adjacencias
+
+    Args:
+        grafo: Grafo (ou GrafoCSR, lido direto dos seus arrays)
+        pesos: Valor de cada par de bairros vizinhos:
+            'multiplicidade' - número de vias paralelas entre o par
+            'inverso_distancia' - soma de 1/peso das vias paralelas (vias
+                curtas e numerosas aproximam mais os bairros)
+            'binario' - 1 para cada par, como um grafo simples
+
+    Returns:
+        MatrizEsparsa com os bairros na ordem de grafo.vertices
+    """
+    if pesos not in PESOS_ESPARSOS:
+        raise ValueError(f"Peso desconhecido: '{pesos}' (opções: {', '.join(PESOS_ESPARSOS)})")
+
+    nomes = list(grafo.vertices.keys())
+    n = len(nomes)
+
+    if hasattr(grafo, 'offsets'):
+        origens = np.repeat(np.arange(n, dtype=np.int64), np.diff(grafo.offsets))
+        destinos = grafo.targets.astype(np.int64)
+        distancias = grafo.weights
+    else:
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        adjacencias = grafo.adjacencias
+        graus = np.fromiter((len(adjacencias.get(nome, ())) for nome in nomes), dtype=np.int64, count=n)
+        total = int(graus.sum())
+        origens = np.repeat(np.arange(n, dtype=np.int64), graus)
+        destinos = np.fromiter(
+            (indices[aresta.destino] for nome in nomes for aresta in adjacencias.get(nome, ())),
+            dtype=np.int64, count=total
+        )
+        distancias = np.fromiter(
+            (aresta.peso for nome in nomes for aresta in adjacencias.get(nome, ())),
+            dtype=np.float64, count=total
+        )
+
+    # Laços não participam das centralidades
+    validas = origens != destinos
+    origens, destinos, distancias = origens[validas], destinos[validas], distancias[validas]
+
+    if pesos == 'inverso_distancia':
+        # Vias de comprimento zero viram a menor distância positiva do grafo
+        positivas = distancias[distancias > 0]
+        minimo = positivas.min() if len(positivas) else 1.0
+        contribuicoes = 1.0 / np.maximum(distancias, minimo)
+    else:
+        contribuicoes = np.ones(len(origens), dtype=np.float64)
+
+    # Soma as vias paralelas de cada par (chave única linha * n + coluna)
+    chaves, inverso = np.unique(origens * n + destinos, return_inverse=True)
+    valores = np.bincount(inverso.ravel(), weights=contribuicoes, minlength=len(chaves))
+    if pesos == 'binario':
+        valores = np.ones(len(chaves), dtype=np.float64)
+
+    return MatrizEsparsa(nomes, chaves // n, chaves % n, valores)
+
+
+def _matriz(grafo_ou_matriz, pesos: str) -> MatrizEsparsa:
+    if isinstance(grafo_ou_matriz, MatrizEsparsa):
+        return grafo_ou_matriz
+    return matriz_adjacencia_esparsa(grafo_ou_matriz, pesos)
+
+
+def pagerank(grafo, pesos: str = 'multiplicidade', amortecimento: float = 0.85,
+             tolerancia: float = 1e-8, max_iteracoes: int = 200) -> Dict[str, float]:
+    """
+    PageRank por iteração de potência sobre a matriz de adjacência esparsa
+
+    Args:
+        grafo: Grafo, GrafoCSR ou uma MatrizEsparsa já montada (reaproveitada
+            entre várias métricas)
+        pesos: Ver matriz_adjacencia_esparsa (ignorado se grafo já é MatrizEsparsa)
+        amortecimento: Probabilidade de seguir uma via (o resto salta para um
+            bairro qualquer)
+        tolerancia: Para quando a soma das variações (norma L1) fica abaixo dela
+        max_iteracoes: Limite de iterações
+
+    Returns:
+        Dicionário bairro -> PageRank (os valores somam 1)
+    """
+    matriz = _matriz(grafo, pesos)
+    n = matriz.num_vertices
+    if n == 0:
+        return {}
+
+    forca = matriz.forca()
+    isolados = forca == 0
+    inverso_forca = np.divide(1.0, forca, out=np.zeros(n), where=~isolados)
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iteracoes):
+        # Bairros isolados distribuem o seu valor uniformemente
+        anterior = x
+        x = amortecimento * matriz.multiplicar(anterior * inverso_forca)
+        x += (amortecimento * anterior[isolados].sum() + 1.0 - amortecimento) / n
+        if np.abs(x - anterior).sum() < tolerancia:
+            return dict(zip(matriz.nomes, x.tolist()))
+    raise RuntimeError(f"PageRank não convergiu em {max_iteracoes} iterações")
+
+
+def centralidade_autovetor(grafo, pesos: str = 'multiplicidade', tolerancia: float = 1e-8,
+                           max_iteracoes: int = 1000) -> Dict[str, float]:
+    """
+    Centralidade de autovetor por iteração de potência sobre a matriz esparsa
+
+    Itera com A + I, que tem os mesmos autovetores de A, para convergir
+    também em componentes bipartidas. Em grafos desconexos o vetor se
+    concentra na componente de maior autovalor.
+
+    Args:
+        grafo: Grafo, GrafoCSR ou uma MatrizEsparsa já montada
+        pesos: Ver matriz_adjacencia_esparsa (ignorado se grafo já é MatrizEsparsa)
+        tolerancia: Para quando a variação (norma L1) fica abaixo de n * tolerancia
+        max_iteracoes: Limite de iterações
+
+    Returns:
+        Dicionário bairro -> centralidade (vetor de norma euclidiana 1)
+    """
+    matriz = _matriz(grafo, pesos)
+    n = matriz.num_vertices
+    if n == 0:
+        return {}
+
+    x = np.full(n, 1.0 / n)
+    for _ in range(max_iteracoes):
+        anterior = x
+        x = matriz.multiplicar(anterior) + anterior
+        norma = np.linalg.norm(x)
+        if norma == 0:
+            return dict.fromkeys(matriz.nomes, 0.0)
+        x /= norma
+        if np.abs(x - anterior).sum() < n * tolerancia:
+            return dict(zip(matriz.nomes, x.tolist()))
+    raise RuntimeError(f"Centralidade de autovetor não convergiu em {max_iteracoes} iterações")
+
+
+def escalar_tamanhos(valores: Dict[str, float], minimo: float, maximo: float) -> Dict[str, float]:
+    """
+    Converte uma métrica por bairro em tamanhos de nó entre minimo e maximo
+
+    Usado pelos visualizadores HTML (parâmetro `centralidade`).
+    """
+    if not valores:
+        return {}
+    menor = min(valores.values())
+    maior = max(valores.values())
+    amplitude = maior - menor
+    if amplitude <= 0:
+        return {nome: (minimo + maximo) / 2 for nome in valores}
+    return {nome: minimo + (valor - menor) / amplitude * (maximo - minimo) for nome, valor in valores.items()}
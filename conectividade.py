@@ -0,0 +1,149 @@
+"""
+Análise de conectividade: componentes conexas, pontes e pontos de articulação
+
+Uma única busca em profundidade iterativa (Tarjan) calcula as três coisas em
+tempo linear, sem recursão, então funciona mesmo na malha viária completa,
+onde a profundidade da busca passaria do limite de recursão do Python.
+
+As arestas são identificadas pelo índice da via (posição em Grafo.registros),
+não pelo par de bairros: ao voltar para o pai, apenas a própria via usada
+para descer é ignorada. Assim, duas vias paralelas entre o mesmo par formam
+um ciclo e nenhuma delas é ponte.
+"""
+from dataclasses import dataclass
+from typing import List, Sequence
+
+import numpy as np
+
+
+@dataclass
+class Conectividade:
+    """
+    Resultado da análise de conectividade (ver Grafo.conectividade)
+
+    Os arrays usam os índices de `nomes` para bairros e os índices de
+    `registros` para vias; os métodos listar_* devolvem listas Python.
+    """
+    nomes: List[str]
+    registros: list
+    # Rótulo da componente de cada bairro (0, 1, ...), na ordem de `nomes`
+    componentes: np.ndarray
+    # Índices das vias que são pontes
+    pontes: np.ndarray
+    # Índices dos bairros que são pontos de articulação
+    articulacoes: np.ndarray
+
+    @property
+    def num_componentes(self) -> int:
+        return int(self.componentes.max()) + 1 if len(self.componentes) else 0
+
+    def listar_componentes(self) -> List[List[str]]:
+        """Bairros de cada componente, da maior para a menor"""
+        grupos: List[List[str]] = [[] for _ in range(self.num_componentes)]
+        for nome, componente in zip(self.nomes, self.componentes.tolist()):
+            grupos[componente].append(nome)
+        grupos.sort(key=len, reverse=True)
+        return grupos
+
+    def listar_pontes(self) -> list:
+        """Vias (RegistroVia) cuja remoção desconecta os seus dois bairros"""
+        return [self.registros[i] for i in self.pontes.tolist()]
+
+    def listar_articulacoes(self) -> List[str]:
+        """Bairros cuja remoção aumenta o número de componentes"""
+        return [self.nomes[i] for i in self.articulacoes.tolist()]
+
+
+def tarjan(num_vertices: int, origens: Sequence[int], destinos: Sequence[int]):
+    """
+    Componentes, pontes e articulações de um multigrafo não direcionado
+
+    Args:
+        num_vertices: Número de vértices (ids de 0 a num_vertices - 1)
+        origens: Vértice de origem de cada aresta
+        destinos: Vértice de destino de cada aresta
+
+    Returns:
+        Tupla (componentes, pontes, articulacoes) de arrays NumPy: rótulo da
+        componente por vértice, ids das arestas que são pontes e ids dos
+        vértices de articulação (ambos em ordem crescente)
+    """
+    origens = np.asarray(origens, dtype=np.int64)
+    destinos = np.asarray(destinos, dtype=np.int64)
+    ids = np.arange(len(origens), dtype=np.int64)
+
+    # Laços não afetam a conectividade
+    validas = origens != destinos
+    origens, destinos, ids = origens[validas], destinos[validas], ids[validas]
+
+    # Lista de adjacências em CSR, com as duas direções de cada aresta
+    pontas = np.concatenate([origens, destinos])
+    ordem = np.argsort(pontas, kind='stable')
+    vizinhos = np.concatenate([destinos, origens])[ordem].tolist()
+    arestas = np.concatenate([ids, ids])[ordem].tolist()
+    offsets = np.zeros(num_vertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(pontas, minlength=num_vertices), out=offsets[1:])
+    offsets = offsets.tolist()
+
+    descoberta = [-1] * num_vertices
+    menor = [0] * num_vertices
+    componentes = [-1] * num_vertices
+    aresta_pai = [-1] * num_vertices
+    proxima = offsets[:-1]
+    eh_articulacao = [False] * num_vertices
+    pontes = []
+
+    tempo = 0
+    num_componentes = 0
+    for raiz in range(num_vertices):
+        if descoberta[raiz] != -1:
+            continue
+
+        descoberta[raiz] = menor[raiz] = tempo
+        tempo += 1
+        componentes[raiz] = num_componentes
+        filhos_raiz = 0
+        pilha = [raiz]
+
+        while pilha:
+            v = pilha[-1]
+            k = proxima[v]
+            if k < offsets[v + 1]:
+                proxima[v] = k + 1
+                w = vizinhos[k]
+                aresta = arestas[k]
+                if aresta == aresta_pai[v]:
+                    continue
+                if descoberta[w] == -1:
+                    descoberta[w] = menor[w] = tempo
+                    tempo += 1
+                    componentes[w] = num_componentes
+                    aresta_pai[w] = aresta
+                    pilha.append(w)
+                elif descoberta[w] < menor[v]:
+                    menor[v] = descoberta[w]
+                continue
+
+            # Todos os vizinhos de v foram visitados: propaga para o pai
+            pilha.pop()
+            if not pilha:
+                break
+            u = pilha[-1]
+            if menor[v] < menor[u]:
+                menor[u] = menor[v]
+            if menor[v] > descoberta[u]:
+                pontes.append(aresta_pai[v])
+            if u == raiz:
+                filhos_raiz += 1
+            elif menor[v] >= descoberta[u]:
+                eh_articulacao[u] = True
+
+        if filhos_raiz >= 2:
+            eh_articulacao[raiz] = True
+        num_componentes += 1
+
+    return (
+        np.asarray(componentes, dtype=np.int32),
+        np.sort(np.asarray(pontes, dtype=np.int64)),
+        np.flatnonzero(eh_articulacao).astype(np.int64),
+    )
@@ -0,0 +1,189 @@
+"""
+Escrita das páginas HTML com os dados do grafo em fluxo (streaming)
+
+Os visualizadores montam apenas o template da página (pequeno) e entregam os
+dados como seções: geradores de dicionários (nós e arestas) ou dicionários de
+colunas já prontas (modo agregado, índice espacial). A escrita codifica no
+máximo ITENS_POR_ESCRITA itens por vez, inclusive dentro das colunas, então
+nunca existe a lista completa de dicionários de arestas, nem o json.dumps de
+tudo, nem uma f-string com a página inteira: o texto gerado não pesa no pico
+de memória. Continua em memória o que é proporcional ao grafo e já precisa
+existir para montar os dados (referências às vias, colunas do modo agregado).
+
+O script principal da página é marcado com <script id="grafo-app"> e lê os
+dados de window.DADOS_GRAFO. Modos de saída:
+- 'js' (padrão): os dados vão para '<página>.dados.js', carregado por um
+  <script src>; funciona abrindo o arquivo direto do disco
+- 'json.gz': os dados vão para '<página>.dados.json.gz', que a página baixa
+  com fetch e descompacta (DecompressionStream) antes de rodar o script
+  principal; requer servir a pasta por HTTP
+- arquivo_unico=True: os dados são gravados dentro do próprio HTML, como antes
+"""
+import gzip
+import json
+import os
+from typing import Dict, Iterable, List
+
+FORMATOS_DADOS = ('js', 'json.gz')
+
+# Abertura do script principal nos templates dos visualizadores
+SCRIPT_APP = '<script id="grafo-app">'
+
+# Itens codificados por escrita no arquivo
+ITENS_POR_ESCRITA = 1000
+
+_CARREGADOR_JSON_GZ = """<script>
+        // Baixa os dados, descompacta se preciso e só então roda o script principal
+        fetch('{url}')
+            .then(function (resposta) {{ return resposta.arrayBuffer(); }})
+            .then(function (buffer) {{
+                var bytes = new Uint8Array(buffer);
+                if (bytes[0] === 0x1f && bytes[1] === 0x8b) {{
+                    var fluxo = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('gzip'));
+                    return new Response(fluxo).text();
+                }}
+                // O servidor já descompactou (Content-Encoding: gzip)
+                return new TextDecoder().decode(bytes);
+            }})
+            .then(function (texto) {{
+                window.DADOS_GRAFO = JSON.parse(texto);
+                var app = document.createElement('script');
+                app.text = document.getElementById('grafo-app').text;
+                document.body.appendChild(app);
+            }})
+            .catch(function (erro) {{
+                console.error('Erro ao carregar {url}:', erro);
+                alert('Não foi possível carregar os dados do grafo ({url}). ' +
+                      'Sirva a pasta por HTTP (python -m http.server) ou gere a página com formato_dados=\\'js\\'.');
+            }});
+    </script>
+    """
+
+
+def _escrever_valor(arquivo, valor, codificador: json.JSONEncoder):
+    """
+    Grava um valor JSON sem codificá-lo inteiro de uma vez
+
+    Dicionários são percorridos chave a chave; listas, tuplas e arrays NumPy
+    (qualquer sequência com tolist) são gravados em fatias de
+    ITENS_POR_ESCRITA; outros iteráveis (geradores) em lotes do mesmo
+    tamanho. Cada fatia ou item usa encode (e não iterencode), que tem o
+    codificador em C.
+    """
+    if isinstance(valor, dict):
+        arquivo.write('{')
+        for i, (chave, item) in enumerate(valor.items()):
+            if i:
+                arquivo.write(',')
+            arquivo.write(json.dumps(chave, ensure_ascii=False) + ':')
+            _escrever_valor(arquivo, item, codificador)
+        arquivo.write('}')
+        return
+
+    if isinstance(valor, (list, tuple)) or hasattr(valor, 'tolist'):
+        arquivo.write('[')
+        for inicio in range(0, len(valor), ITENS_POR_ESCRITA):
+            fatia = valor[inicio:inicio + ITENS_POR_ESCRITA]
+            if hasattr(fatia, 'tolist'):
+                fatia = fatia.tolist()
+            if inicio:
+                arquivo.write(',')
+            # Sem os colchetes da fatia
+            arquivo.write(codificador.encode(list(fatia))[1:-1])
+        arquivo.write(']')
+        return
+
+    if isinstance(valor, str) or not hasattr(valor, '__iter__'):
+        arquivo.write(codificador.encode(valor))
+        return
+
+    # Geradores: só ITENS_POR_ESCRITA itens codificados por vez
+    arquivo.write('[')
+    pedacos: List[str] = []
+    separador = ''
+    for item in valor:
+        pedacos.append(codificador.encode(item))
+        if len(pedacos) >= ITENS_POR_ESCRITA:
+            arquivo.write(separador + ','.join(pedacos))
+            pedacos.clear()
+            separador = ','
+    if pedacos:
+        arquivo.write(separador + ','.join(pedacos))
+    arquivo.write(']')
+
+
+def _escrever_json(arquivo, secoes: Dict[str, object]):
+    """Grava {"secao": valor, ...} em fluxo (ver _escrever_valor)"""
+    _escrever_valor(arquivo, secoes, json.JSONEncoder(ensure_ascii=False, separators=(',', ':')))
+
+
+class _EscritorSeguro:
+    """Repassa as escritas trocando '</' por '<\\/', para que os dados não fechem a tag <script>"""
+
+    def __init__(self, arquivo):
+        self._arquivo = arquivo
+
+    def write(self, texto: str):
+        self._arquivo.write(texto.replace('</', '<\\/'))
+
+
+def caminho_dados(arquivo_saida: str, formato_dados: str) -> str:
+    """Arquivo de dados ao lado da página: grafo.html -> grafo.dados.js / grafo.dados.json.gz"""
+    return os.path.splitext(arquivo_saida)[0] + '.dados.' + formato_dados
+
+
+def escrever_pagina(arquivo_saida: str, template: str, secoes: Dict[str, Iterable],
+                    arquivo_unico: bool = False, formato_dados: str = 'js') -> List[str]:
+    """
+    Grava a página e os dados do grafo
+
+    Args:
+        arquivo_saida: Caminho do HTML
+        template: Página sem os dados; o script principal começa com SCRIPT_APP
+            e lê window.DADOS_GRAFO
+        secoes: Nome -> itens (listas ou geradores de objetos serializáveis) ou
+            dicionário de colunas (listas ou arrays NumPy); vira
+            window.DADOS_GRAFO = {nome: ..., ...}
+        arquivo_unico: Grava os dados dentro do HTML em vez de um arquivo separado
+        formato_dados: 'js' ou 'json.gz' (ignorado com arquivo_unico)
+
+    Returns:
+        Lista dos arquivos gravados (o HTML primeiro)
+    """
+    if formato_dados not in FORMATOS_DADOS:
+        raise ValueError(f"Formato de dados desconhecido: '{formato_dados}' (opções: {', '.join(FORMATOS_DADOS)})")
+
+    antes, marcador, depois = template.partition(SCRIPT_APP)
+    if not marcador:
+        raise ValueError(f"Template sem o script principal ({SCRIPT_APP})")
+
+    if arquivo_unico:
+        with open(arquivo_saida, 'w', encoding='utf-8') as f:
+            f.write(antes)
+            f.write('<script>\n        window.DADOS_GRAFO = ')
+            _escrever_json(_EscritorSeguro(f), secoes)
+            f.write(';\n    </script>\n    ')
+            f.write(marcador)
+            f.write(depois)
+        return [arquivo_saida]
+
+    arquivo_dados = caminho_dados(arquivo_saida, formato_dados)
+    url = os.path.basename(arquivo_dados)
+
+    if formato_dados == 'js':
+        with open(arquivo_dados, 'w', encoding='utf-8') as f:
+            f.write('window.DADOS_GRAFO = ')
+            _escrever_json(f, secoes)
+            f.write(';\n')
+        carregamento = f'<script src="{url}"></script>\n    ' + marcador
+    else:
+        with gzip.open(arquivo_dados, 'wt', encoding='utf-8') as f:
+            _escrever_json(f, secoes)
+        # O script principal só roda depois que o carregador tiver os dados
+        carregamento = _CARREGADOR_JSON_GZ.format(url=url) + '<script type="text/plain" id="grafo-app">'
+
+    with open(arquivo_saida, 'w', encoding='utf-8') as f:
+        f.write(antes)
+        f.write(carregamento)
+        f.write(depois)
+    return [arquivo_saida, arquivo_dados]
@@ -2,28 +2,104 @@
 Implementação de um Grafo não direcionado com arestas paralelas
 para representar bairros e suas conexões através de vias
 """
+import sys
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Set
-from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from collections import Counter, OrderedDict, defaultdict
+
+from caminhos import (
+    AdjacenciasColapsadas, Caminho, a_estrela, caminho_minimo, colapsar_arestas_paralelas, colapsar_por_via,
+    dijkstra_bidirecional, distancia_haversine, fator_heuristica, k_caminhos_minimos
+)
+from arvore_geradora import ArvoreGeradora, kruskal
+from conectividade import Conectividade, tarjan
+from snapshot import ler_snapshot, salvar_snapshot
+
+
+def _internar(valor):
+    """Interna strings para que nomes repetidos compartilhem o mesmo objeto"""
+    return sys.intern(valor) if type(valor) is str else valor
+
+
+class RegistroVia:
+    """Registro único de uma via, compartilhado pelas arestas de ida e de volta"""
+    __slots__ = ('origem', 'destino', 'nome_via', 'peso')
+
+    def __init__(self, origem: str, destino: str, nome_via: str, peso: float):
+        self.origem = origem
+        self.destino = destino
+        self.nome_via = nome_via
+        self.peso = peso
+
+    def __repr__(self):
+        return f"RegistroVia({self.origem} <-> {self.destino}, via: {self.nome_via}, peso: {self.peso})"
 
 
-@dataclass
 class Aresta:
-    """Representa uma aresta do grafo"""
-    origem: str
-    destino: str
-    nome_via: str
-    peso: float
+    """
+    Representa uma aresta do grafo: uma direção de um RegistroVia.
+    A aresta reversa aponta para o mesmo registro com reversa=True.
+    """
+    __slots__ = ('registro', 'reversa')
+
+    def __init__(self, origem: str, destino: str, nome_via: str, peso: float):
+        self.registro = RegistroVia(origem, destino, nome_via, peso)
+        self.reversa = False
+
+    @classmethod
+    def de_registro(cls, registro: RegistroVia, reversa: bool = False) -> 'Aresta':
+        """Cria uma aresta que reutiliza um registro de via existente"""
+        aresta = cls.__new__(cls)
+        aresta.registro = registro
+        aresta.reversa = reversa
+        return aresta
+
+    @property
+    def origem(self) -> str:
+        return self.registro.destino if self.reversa else self.registro.origem
+
+    @property
+    def destino(self) -> str:
+        return self.registro.origem if self.reversa else self.registro.destino
+
+    @property
+    def nome_via(self) -> str:
+        return self.registro.nome_via
+
+    @property
+    def peso(self) -> float:
+        return self.registro.peso
+
+    def __eq__(self, other):
+        if isinstance(other, Aresta):
+            return (self.origem, self.destino, self.nome_via, self.peso) == \
+                (other.origem, other.destino, other.nome_via, other.peso)
+        return NotImplemented
+
+    # Arestas são comparadas por valor, como no dataclass original
+    __hash__ = None
 
     def __repr__(self):
         return f"Aresta({self.origem} -> {self.destino}, via: {self.nome_via}, peso: {self.peso})"
 
 
-@dataclass
 class Vertice:
     """Representa um vértice (bairro) do grafo"""
-    nome: str
-    subregiao: Optional[str] = None
+    __slots__ = ('nome', 'subregiao', 'latitude', 'longitude')
+
+    def __init__(self, nome: str, subregiao: Optional[str] = None,
+                 latitude: Optional[float] = None, longitude: Optional[float] = None):
+        self.nome = nome
+        self.subregiao = subregiao
+        # Coordenadas (graus) do centróide do bairro, quando conhecidas
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @property
+    def coordenadas(self) -> Optional[Tuple[float, float]]:
+        if self.latitude is None or self.longitude is None:
+            return None
+        return (self.latitude, self.longitude)
 
     def __repr__(self):
         return f"Vertice({self.nome}, subregiao: {self.subregiao})"
@@ -37,6 +113,48 @@ class Vertice:
         return False
 
 
+@dataclass
+class MetricasGrafo:
+    """Fotografia das estatísticas do grafo (ver Grafo.metricas)"""
+    num_vertices: int
+    num_arestas: int
+    grau_total: int
+    grau_medio: float
+    vertice_maior_grau: Optional[str]
+    maior_grau: int
+    histograma_graus: Dict[int, int]
+    vertices_por_subregiao: Dict[str, int]
+
+    @property
+    def num_subregioes(self) -> int:
+        return len(self.vertices_por_subregiao)
+
+
+@dataclass
+class Vizinhanca:
+    """
+    Bairros a até k saltos de um bairro central (rede ego), ver Grafo.vizinhanca
+
+    Instâncias ficam em cache e são compartilhadas entre chamadas: não altere.
+    """
+    centro: str
+    k: int
+    # Bairros em ordem de descoberta (camada a camada, o centro primeiro)
+    vertices: List[str]
+    # Número de saltos (arestas) do centro até cada bairro
+    saltos: Dict[str, int]
+    # Vias com os dois extremos na vizinhança (subgrafo induzido), cada uma uma única vez
+    arestas: List[Aresta]
+
+    def camada(self, distancia: int) -> List[str]:
+        """Bairros a exatamente `distancia` saltos do centro"""
+        return [v for v in self.vertices if self.saltos[v] == distancia]
+
+
+# Número de vizinhanças mantidas no cache LRU de Grafo.vizinhanca
+TAMANHO_CACHE_VIZINHANCA = 256
+
+
 class Grafo:
     """
     Grafo não direcionado com suporte a arestas paralelas
@@ -46,26 +164,84 @@ class Grafo:
         self.vertices: Dict[str, Vertice] = {}
         # Lista de adjacências: cada vértice mapeia para uma lista de arestas
         self.adjacencias: Dict[str, List[Aresta]] = defaultdict(list)
+        # Índice secundário: origem -> destino -> arestas paralelas, para consultas O(1) por par
+        self.arestas_por_par: Dict[str, Dict[str, List[Aresta]]] = defaultdict(dict)
+        # Registros de via na ordem de inserção (cada via aparece uma única vez)
+        self.registros: List[RegistroVia] = []
         self.num_arestas = 0
+        # Incrementada a cada alteração, invalida estruturas pré-processadas
+        self.versao = 0
+        self._adjacencias_colapsadas: Optional[AdjacenciasColapsadas] = None
+        self._versao_colapsada = -1
+        self._adjacencias_por_via: AdjacenciasColapsadas = {}
+        self._versao_por_via = -1
+        self._conectividade: Optional[Conectividade] = None
+        self._versao_conectividade = -1
+        # Cache LRU de vizinhanças: (bairro, k, versao) -> Vizinhanca
+        self._cache_vizinhanca: 'OrderedDict[tuple, Vizinhanca]' = OrderedDict()
+        self._fator_heuristica = 0.0
+        self._versao_heuristica = -1
+
+        # Estatísticas mantidas incrementalmente (ver metricas())
+        self._posicoes: Dict[str, int] = {}
+        self._grau_total = 0
+        self._vertice_maior_grau: Optional[str] = None
+        self._maior_grau = 0
+        self._histograma_graus: Counter = Counter()
+        self._vertices_por_subregiao: Counter = Counter()
+
+    def _registrar_grau(self, vertice: str, grau_anterior: int, grau_novo: int):
+        """Atualiza total, histograma e maior grau após o grau de um vértice mudar"""
+        self._grau_total += grau_novo - grau_anterior
+
+        self._histograma_graus[grau_anterior] -= 1
+        if not self._histograma_graus[grau_anterior]:
+            del self._histograma_graus[grau_anterior]
+        self._histograma_graus[grau_novo] += 1
+
+        # Graus só aumentam; em caso de empate vence o vértice inserido primeiro
+        if grau_novo > self._maior_grau or (
+            grau_novo == self._maior_grau
+            and self._posicoes[vertice] < self._posicoes[self._vertice_maior_grau]
+        ):
+            self._vertice_maior_grau = vertice
+            self._maior_grau = grau_novo
 
     def adicionar_vertice(self, nome: str, subregiao: Optional[str] = None) -> Vertice:
         """Adiciona um vértice ao grafo"""
-        nome_normalizado = nome.strip()
+        nome_normalizado = sys.intern(nome.strip())
+        subregiao = _internar(subregiao)
 
         if nome_normalizado not in self.vertices:
             vertice = Vertice(nome_normalizado, subregiao)
             self.vertices[nome_normalizado] = vertice
+            self.versao += 1
+
+            self._posicoes[nome_normalizado] = len(self._posicoes)
+            self._histograma_graus[0] += 1
+            if self._vertice_maior_grau is None:
+                self._vertice_maior_grau = nome_normalizado
+            if subregiao:
+                self._vertices_por_subregiao[subregiao] += 1
         else:
             # Atualiza subregião se fornecida
             if subregiao:
-                self.vertices[nome_normalizado].subregiao = subregiao
+                vertice = self.vertices[nome_normalizado]
+                if vertice.subregiao:
+                    self._vertices_por_subregiao[vertice.subregiao] -= 1
+                    if not self._vertices_por_subregiao[vertice.subregiao]:
+                        del self._vertices_por_subregiao[vertice.subregiao]
+                self._vertices_por_subregiao[subregiao] += 1
+
+                vertice.subregiao = subregiao
+                self.versao += 1
 
         return self.vertices[nome_normalizado]
 
     def adicionar_aresta(self, origem: str, destino: str, nome_via: str, peso: float):
         """Adiciona uma aresta ao grafo (não direcionado, então adiciona em ambas as direções)"""
-        origem_norm = origem.strip()
-        destino_norm = destino.strip()
+        origem_norm = sys.intern(origem.strip())
+        destino_norm = sys.intern(destino.strip())
 
         # Garante que os vértices existem
         if origem_norm not in self.vertices:
@@ -73,17 +249,103 @@ class Grafo:
         if destino_norm not in self.vertices:
             self.adicionar_vertice(destino_norm)
 
+        # Um único registro é compartilhado pelas duas direções
+        registro = RegistroVia(origem_norm, destino_norm, sys.intern(nome_via.strip()), peso)
+        self.registros.append(registro)
+
         # Cria a aresta
-        aresta = Aresta(origem_norm, destino_norm, nome_via.strip(), peso)
+        aresta = Aresta.de_registro(registro)
 
         # Adiciona nas adjacências (grafo não direcionado)
         self.adjacencias[origem_norm].append(aresta)
+        self.arestas_por_par[origem_norm].setdefault(destino_norm, []).append(aresta)
 
         # Adiciona a aresta reversa
-        aresta_reversa = Aresta(destino_norm, origem_norm, nome_via.strip(), peso)
+        aresta_reversa = Aresta.de_registro(registro, reversa=True)
         self.adjacencias[destino_norm].append(aresta_reversa)
+        self.arestas_por_par[destino_norm].setdefault(origem_norm, []).append(aresta_reversa)
+
+        grau_origem = len(self.adjacencias[origem_norm])
+        if origem_norm == destino_norm:
+            self._registrar_grau(origem_norm, grau_origem - 2, grau_origem)
+        else:
+            self._registrar_grau(origem_norm, grau_origem - 1, grau_origem)
+            grau_destino = len(self.adjacencias[destino_norm])
+            self._registrar_grau(destino_norm, grau_destino - 1, grau_destino)
 
         self.num_arestas += 1
+        self.versao += 1
+
+    def adicionar_arestas_em_lote(self, origens: Sequence[str], destinos: Sequence[str],
+                                  vias: Sequence[str], pesos: Sequence[float]) -> int:
+        """
+        Adiciona várias arestas de uma vez, em uma única passagem
+
+        O resultado é idêntico a chamar adicionar_aresta() para cada posição,
+        na mesma ordem. A normalização (strip + intern) é feita uma única vez
+        por nome distinto, então vale a pena passar listas em que nomes
+        repetidos já são o mesmo objeto (ex.: saída de pandas.factorize).
+
+        Args:
+            origens: Bairro de origem de cada via
+            destinos: Bairro de destino de cada via
+            vias: Nome de cada via
+            pesos: Distância em metros de cada via
+
+        Returns:
+            Número de arestas adicionadas
+        """
+        if not (len(origens) == len(destinos) == len(vias) == len(pesos)):
+            raise ValueError("origens, destinos, vias e pesos devem ter o mesmo tamanho")
+
+        normalizados: Dict[str, str] = {}
+
+        def normalizar(nome: str) -> str:
+            nome_norm = normalizados.get(nome)
+            if nome_norm is None:
+                nome_norm = normalizados[nome] = sys.intern(nome.strip())
+            return nome_norm
+
+        vertices = self.vertices
+        adjacencias = self.adjacencias
+        arestas_por_par = self.arestas_por_par
+        registros = self.registros
+        de_registro = Aresta.de_registro
+        # Grau de cada vértice tocado antes do lote; as estatísticas são atualizadas no final
+        graus_anteriores: Dict[str, int] = {}
+
+        for origem, destino, nome_via, peso in zip(origens, destinos, vias, pesos):
+            origem_norm = normalizar(origem)
+            destino_norm = normalizar(destino)
+
+            if origem_norm not in vertices:
+                self.adicionar_vertice(origem_norm)
+            if destino_norm not in vertices:
+                self.adicionar_vertice(destino_norm)
+
+            if origem_norm not in graus_anteriores:
+                graus_anteriores[origem_norm] = len(adjacencias.get(origem_norm, ()))
+            if destino_norm not in graus_anteriores:
+                graus_anteriores[destino_norm] = len(adjacencias.get(destino_norm, ()))
+
+            registro = RegistroVia(origem_norm, destino_norm, normalizar(nome_via), peso)
+            registros.append(registro)
+
+            aresta = de_registro(registro)
+            adjacencias[origem_norm].append(aresta)
+            arestas_por_par[origem_norm].setdefault(destino_norm, []).append(aresta)
+
+            aresta_reversa = de_registro(registro, True)
+            adjacencias[destino_norm].append(aresta_reversa)
+            arestas_por_par[destino_norm].setdefault(origem_norm, []).append(aresta_reversa)
+
+        for vertice, grau_anterior in graus_anteriores.items():
+            self._registrar_grau(vertice, grau_anterior, len(adjacencias[vertice]))
+
+        self.num_arestas += len(origens)
+        self.versao += 1
+
+        return len(origens)
 
     def obter_vizinhos(self, vertice: str) -> List[Aresta]:
         """Retorna todas as arestas que saem de um vértice"""
@@ -93,31 +355,269 @@ class Grafo:
         """Retorna um vértice pelo nome"""
         return self.vertices.get(nome)
 
+    def vizinhanca(self, bairro: str, k: int = 1) -> Optional[Vizinhanca]:
+        """
+        Retorna os bairros a até k saltos de um bairro, com o subgrafo induzido
+
+        A busca em largura avança uma fronteira (lista de bairros) por camada.
+        Os resultados ficam em um cache LRU indexado por (bairro, k, versão do
+        grafo), então gerar a rede ego de todos os bairros não refaz a busca
+        enquanto o grafo não mudar.
+
+        Args:
+            bairro: Bairro central
+            k: Número máximo de saltos
+
+        Returns:
+            Vizinhanca, ou None se o bairro não existir
+        """
+        bairro = bairro.strip()
+        if bairro not in self.vertices:
+            return None
+
+        chave = (bairro, k, self.versao)
+        cache = self._cache_vizinhanca
+        resultado = cache.get(chave)
+        if resultado is not None:
+            cache.move_to_end(chave)
+            return resultado
+
+        saltos = {bairro: 0}
+        vertices = [bairro]
+        fronteira = [bairro]
+        for distancia in range(1, k + 1):
+            proxima = []
+            for vertice in fronteira:
+                for vizinho in self.arestas_por_par.get(vertice, ()):
+                    if vizinho not in saltos:
+                        saltos[vizinho] = distancia
+                        proxima.append(vizinho)
+            if not proxima:
+                break
+            vertices.extend(proxima)
+            fronteira = proxima
+
+        # Cada via aparece nas duas pontas; a aresta não reversa a representa uma única vez
+        arestas = [
+            aresta
+            for vertice in vertices
+            for aresta in self.adjacencias.get(vertice, ())
+            if not aresta.reversa and aresta.destino in saltos
+        ]
+
+        resultado = Vizinhanca(bairro, k, vertices, saltos, arestas)
+        cache[chave] = resultado
+        if len(cache) > TAMANHO_CACHE_VIZINHANCA:
+            cache.popitem(last=False)
+        return resultado
+
+    def conectividade(self) -> Conectividade:
+        """
+        Calcula componentes conexas, pontes e pontos de articulação
+
+        Usa uma busca em profundidade iterativa (Tarjan), em tempo linear e sem
+        limite de profundidade. Vias paralelas entre o mesmo par de bairros
+        nunca são pontes. O resultado é reaproveitado até o grafo ser alterado.
+
+        Returns:
+            Conectividade com os resultados como arrays NumPy e listas
+        """
+        if self._versao_conectividade != self.versao:
+            nomes = list(self.vertices.keys())
+            indices = {nome: i for i, nome in enumerate(nomes)}
+            registros = list(self.registros)
+            origens = [indices[r.origem] for r in registros]
+            destinos = [indices[r.destino] for r in registros]
+
+            componentes, pontes, articulacoes = tarjan(len(nomes), origens, destinos)
+            self._conectividade = Conectividade(nomes, registros, componentes, pontes, articulacoes)
+            self._versao_conectividade = self.versao
+        return self._conectividade
+
+    def arvore_geradora_minima(self) -> ArvoreGeradora:
+        """
+        Calcula a árvore geradora mínima (Kruskal) sobre os pesos das vias
+
+        Entre vias paralelas, só a mais curta de cada par é candidata. Se o
+        grafo for desconexo, o resultado é uma floresta (uma árvore por componente).
+
+        Returns:
+            ArvoreGeradora com as vias mantidas e o peso total
+        """
+        nomes = list(self.vertices.keys())
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        registros = list(self.registros)
+        origens = [indices[r.origem] for r in registros]
+        destinos = [indices[r.destino] for r in registros]
+        pesos = [r.peso for r in registros]
+
+        vias, num_componentes = kruskal(len(nomes), origens, destinos, pesos)
+        peso_total = float(sum(pesos[i] for i in vias.tolist()))
+        return ArvoreGeradora(nomes, registros, vias, peso_total, num_componentes)
+
     def grau(self, vertice: str) -> int:
         """Retorna o grau de um vértice (número de arestas incidentes)"""
         return len(self.adjacencias.get(vertice, []))
 
     def existe_aresta(self, origem: str, destino: str) -> bool:
         """Verifica se existe pelo menos uma aresta entre dois vértices"""
-        if origem not in self.adjacencias:
-            return False
-
-        for aresta in self.adjacencias[origem]:
-            if aresta.destino == destino:
-                return True
-        return False
+        pares = self.arestas_por_par.get(origem)
+        return pares is not None and destino in pares
 
     def obter_arestas_entre(self, origem: str, destino: str) -> List[Aresta]:
         """Retorna todas as arestas entre dois vértices (arestas paralelas)"""
-        if origem not in self.adjacencias:
+        pares = self.arestas_por_par.get(origem)
+        if pares is None:
             return []
 
-        arestas = []
-        for aresta in self.adjacencias[origem]:
-            if aresta.destino == destino:
-                arestas.append(aresta)
-
-        return arestas
+        return list(pares.get(destino, []))
+
+    def adjacencias_colapsadas(self) -> AdjacenciasColapsadas:
+        """
+        Retorna as adjacências com as arestas paralelas reduzidas à via de menor peso.
+        O resultado é calculado uma vez e reaproveitado até o grafo ser alterado.
+        """
+        if self._versao_colapsada != self.versao:
+            colapsado = colapsar_arestas_paralelas(self.adjacencias)
+            for nome in self.vertices:
+                colapsado.setdefault(nome, [])
+            self._adjacencias_colapsadas = colapsado
+            self._versao_colapsada = self.versao
+        return self._adjacencias_colapsadas
+
+    def adjacencias_por_via(self) -> AdjacenciasColapsadas:
+        """
+        Retorna as adjacências com uma entrada por (vizinho, nome_via), de modo
+        que vias paralelas com nomes diferentes continuem separadas.
+        Também é reaproveitado até o grafo ser alterado.
+        """
+        if self._versao_por_via != self.versao:
+            por_via = colapsar_por_via(self.adjacencias)
+            for nome in self.vertices:
+                por_via.setdefault(nome, [])
+            self._adjacencias_por_via = por_via
+            self._versao_por_via = self.versao
+        return self._adjacencias_por_via
+
+    def definir_coordenadas(self, nome: str, latitude: float, longitude: float) -> Optional[Vertice]:
+        """
+        Define as coordenadas (centróide, em graus) de um bairro
+
+        Returns:
+            O vértice atualizado, ou None se o bairro não existir no grafo
+        """
+        vertice = self.vertices.get(nome.strip())
+        if vertice is None:
+            return None
+
+        vertice.latitude = float(latitude)
+        vertice.longitude = float(longitude)
+        self.versao += 1
+        return vertice
+
+    def _heuristica_haversine(self, destino: str):
+        """Retorna a heurística admissível de A* para o destino (ver caminhos.fator_heuristica)"""
+        adjacencias = self.adjacencias_colapsadas()
+        if self._versao_heuristica != self.versao:
+            coordenadas = {
+                nome: v.coordenadas for nome, v in self.vertices.items() if v.coordenadas is not None
+            }
+            self._fator_heuristica = fator_heuristica(adjacencias, coordenadas)
+            self._versao_heuristica = self.versao
+
+        fator = self._fator_heuristica
+        alvo = self.vertices.get(destino)
+        if fator == 0.0 or alvo is None or alvo.coordenadas is None:
+            return lambda vertice: 0.0
+
+        vertices = self.vertices
+        latitude_alvo, longitude_alvo = alvo.coordenadas
+
+        def heuristica(vertice: str) -> float:
+            v = vertices[vertice]
+            return fator * distancia_haversine(v.latitude, v.longitude, latitude_alvo, longitude_alvo)
+
+        return heuristica
+
+    def caminho_minimo(self, origem: str, destino: str, algoritmo: str = 'dijkstra') -> Optional[Caminho]:
+        """
+        Calcula o caminho mínimo (em metros) entre dois bairros
+
+        Args:
+            origem: Bairro de partida
+            destino: Bairro de chegada
+            algoritmo: 'dijkstra', 'bidirecional' (buscas a partir dos dois
+                extremos que se encontram no meio) ou 'a_estrela' (usa as
+                coordenadas dos bairros como heurística; sem coordenadas,
+                equivale a Dijkstra)
+
+        Returns:
+            Caminho com a distância total, os bairros percorridos, a via
+            escolhida em cada trecho e o número de bairros expandidos,
+            ou None se não houver caminho
+        """
+        origem = origem.strip()
+        destino = destino.strip()
+
+        if algoritmo == 'dijkstra':
+            return caminho_minimo(self.adjacencias_colapsadas(), origem, destino)
+        if algoritmo == 'bidirecional':
+            return dijkstra_bidirecional(self.adjacencias_colapsadas(), origem, destino)
+        if algoritmo == 'a_estrela':
+            heuristica = self._heuristica_haversine(destino)
+            return a_estrela(self.adjacencias_colapsadas(), origem, destino, heuristica)
+
+        raise ValueError(f"Algoritmo de caminho mínimo desconhecido: '{algoritmo}'")
+
+    def k_caminhos_minimos(self, origem: str, destino: str, k: int = 3,
+                           vias_distintas: bool = False) -> List[Caminho]:
+        """
+        Calcula até k rotas alternativas sem repetição de bairros (Yen)
+
+        Args:
+            origem: Bairro de partida
+            destino: Bairro de chegada
+            k: Número de rotas
+            vias_distintas: Se True, trocar de via entre os mesmos bairros
+                (arestas paralelas) já conta como uma rota alternativa; se
+                False, as rotas diferem na sequência de bairros e cada trecho
+                usa a via mais curta
+
+        Returns:
+            Lista de Caminho em ordem crescente de distância (em metros)
+        """
+        adjacencias = self.adjacencias_por_via() if vias_distintas else self.adjacencias_colapsadas()
+        return k_caminhos_minimos(adjacencias, origem.strip(), destino.strip(), k)
+
+    def salvar_snapshot(self, caminho: str, fontes: Optional[Sequence[str]] = None):
+        """
+        Salva o grafo em um snapshot binário (ver snapshot.py)
+
+        Args:
+            caminho: Caminho do arquivo de snapshot
+            fontes: Planilhas de origem, usadas para detectar snapshots desatualizados
+        """
+        salvar_snapshot(self, caminho, fontes)
+
+    @classmethod
+    def carregar_snapshot(cls, caminho: str) -> 'Grafo':
+        """Reconstrói um grafo a partir de um snapshot binário, sem ler as planilhas"""
+        dados = ler_snapshot(caminho)
+        strings = [sys.intern(texto) for texto in dados.strings]
+        nomes = [strings[i] for i in dados.vertices_nome.tolist()]
+
+        grafo = cls()
+        for nome, subregiao in zip(nomes, dados.subregioes()):
+            grafo.adicionar_vertice(nome, subregiao)
+
+        # Origens e destinos são ids de vértice; vias são índices na tabela de strings
+        grafo.adicionar_arestas_em_lote(
+            [nomes[i] for i in dados.origens.tolist()],
+            [nomes[i] for i in dados.destinos.tolist()],
+            [strings[i] for i in dados.vias.tolist()],
+            dados.pesos.tolist()
+        )
+        return grafo
 
     def num_vertices(self) -> int:
         """Retorna o número de vértices do grafo"""
@@ -130,30 +630,42 @@ class Grafo:
     def __repr__(self):
         return f"Grafo(vertices={self.num_vertices()}, arestas={self.num_arestas})"
 
+    def metricas(self) -> MetricasGrafo:
+        """
+        Retorna as estatísticas do grafo. Os valores são mantidos incrementalmente
+        por adicionar_vertice/adicionar_aresta, então a chamada não percorre o grafo.
+        """
+        num_vertices = len(self.vertices)
+        return MetricasGrafo(
+            num_vertices=num_vertices,
+            num_arestas=self.num_arestas,
+            grau_total=self._grau_total,
+            grau_medio=self._grau_total / num_vertices if num_vertices else 0.0,
+            vertice_maior_grau=self._vertice_maior_grau,
+            maior_grau=self._maior_grau,
+            histograma_graus=dict(self._histograma_graus),
+            vertices_por_subregiao=dict(self._vertices_por_subregiao),
+        )
+
     def estatisticas(self):
         """Exibe estatísticas do grafo"""
+        metricas = self.metricas()
+
         print(f"\n{'='*60}")
         print(f"ESTATÍSTICAS DO GRAFO")
         print(f"{'='*60}")
-        print(f"Número de vértices (bairros): {self.num_vertices()}")
-        print(f"Número de arestas (vias): {self.num_arestas}")
+        print(f"Número de vértices (bairros): {metricas.num_vertices}")
+        print(f"Número de arestas (vias): {metricas.num_arestas}")
 
         # Grau médio
-        if self.num_vertices() > 0:
-            grau_total = sum(self.grau(v) for v in self.vertices)
-            grau_medio = grau_total / self.num_vertices()
-            print(f"Grau médio: {grau_medio:.2f}")
+        if metricas.num_vertices > 0:
+            print(f"Grau médio: {metricas.grau_medio:.2f}")
 
         # Vértice com maior grau
-        if self.vertices:
-            max_vertice = max(self.vertices.keys(), key=lambda v: self.grau(v))
-            print(f"Bairro com mais conexões: {max_vertice} (grau: {self.grau(max_vertice)})")
+        if metricas.vertice_maior_grau is not None:
+            print(f"Bairro com mais conexões: {metricas.vertice_maior_grau} (grau: {metricas.maior_grau})")
 
         # Subregiões
-        subregioes = set()
-        for v in self.vertices.values():
-            if v.subregiao:
-                subregioes.add(v.subregiao)
-        print(f"Número de subregiões: {len(subregioes)}")
+        print(f"Número de subregiões: {metricas.num_subregioes}")
 
         print(f"{'='*60}\n")
@@ -0,0 +1,251 @@
+"""
+Representação compacta (CSR - Compressed Sparse Row) do grafo de bairros
+
+Os vértices viram ids inteiros e as adjacências ficam em arrays NumPy:
+- offsets: as arestas que saem do vértice i estão em offsets[i]:offsets[i+1]
+- targets: id do vértice de destino de cada aresta
+- weights: peso (distância em metros) de cada aresta
+- via_id: índice do nome da via na tabela nomes_vias
+
+Assim como no Grafo, cada via aparece duas vezes (ida e volta).
+A estrutura é imutável: para alterar o grafo, altere o Grafo original
+e gere uma nova representação.
+"""
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from grafo import Aresta, Grafo, Vertice
+from snapshot import ler_snapshot
+
+
+class _AdjacenciasCSR(Mapping):
+    """Visão somente leitura que imita Grafo.adjacencias sobre os arrays CSR"""
+
+    def __init__(self, grafo_csr: 'GrafoCSR'):
+        self._grafo = grafo_csr
+
+    def __getitem__(self, vertice: str) -> List[Aresta]:
+        if vertice not in self._grafo.indices:
+            raise KeyError(vertice)
+        return self._grafo.obter_vizinhos(vertice)
+
+    def __iter__(self):
+        return iter(self._grafo.nomes)
+
+    def __len__(self):
+        return len(self._grafo.nomes)
+
+
+class GrafoCSR:
+    """
+    Grafo não direcionado com arestas paralelas armazenado em arrays NumPy
+    """
+
+    def __init__(self, nomes: Sequence[str], subregioes: Sequence[Optional[str]],
+                 offsets: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                 via_id: np.ndarray, nomes_vias: Sequence[str]):
+        self.nomes: List[str] = list(nomes)
+        self.indices: Dict[str, int] = {nome: i for i, nome in enumerate(self.nomes)}
+        self.vertices: Dict[str, Vertice] = {
+            nome: Vertice(nome, subregiao) for nome, subregiao in zip(self.nomes, subregioes)
+        }
+        self.nomes_vias: List[str] = list(nomes_vias)
+
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int64)
+        self.targets = np.ascontiguousarray(targets, dtype=np.int32)
+        self.weights = np.ascontiguousarray(weights, dtype=np.float64)
+        self.via_id = np.ascontiguousarray(via_id, dtype=np.int32)
+
+        for array in (self.offsets, self.targets, self.weights, self.via_id):
+            array.flags.writeable = False
+
+        if len(self.offsets) != len(self.nomes) + 1:
+            raise ValueError("offsets deve ter tamanho num_vertices + 1")
+        if not (len(self.targets) == len(self.weights) == len(self.via_id) == self.offsets[-1]):
+            raise ValueError("targets, weights e via_id devem ter o mesmo tamanho (offsets[-1])")
+
+        # Cada via é armazenada nas duas direções
+        self.num_arestas = len(self.targets) // 2
+
+    @classmethod
+    def de_grafo(cls, grafo: Grafo) -> 'GrafoCSR':
+        """
+        Constrói a representação CSR a partir de um Grafo existente
+
+        A ordem dos vértices segue grafo.vertices e a ordem das arestas de cada
+        vértice segue grafo.adjacencias, então obter_vizinhos() devolve as
+        arestas na mesma ordem do grafo original.
+        """
+        nomes = list(grafo.vertices.keys())
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        subregioes = [v.subregiao for v in grafo.vertices.values()]
+
+        n = len(nomes)
+        total = sum(len(grafo.adjacencias.get(nome, [])) for nome in nomes)
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        targets = np.empty(total, dtype=np.int32)
+        weights = np.empty(total, dtype=np.float64)
+        via_id = np.empty(total, dtype=np.int32)
+
+        nomes_vias: List[str] = []
+        indices_vias: Dict[str, int] = {}
+
+        k = 0
+        for i, nome in enumerate(nomes):
+            for aresta in grafo.adjacencias.get(nome, []):
+                if aresta.nome_via not in indices_vias:
+                    indices_vias[aresta.nome_via] = len(nomes_vias)
+                    nomes_vias.append(aresta.nome_via)
+                targets[k] = indices[aresta.destino]
+                weights[k] = aresta.peso
+                via_id[k] = indices_vias[aresta.nome_via]
+                k += 1
+            offsets[i + 1] = k
+
+        return cls(nomes, subregioes, offsets, targets, weights, via_id, nomes_vias)
+
+    @classmethod
+    def de_arrays(cls, nomes: Sequence[str], origens: Iterable[int], destinos: Iterable[int],
+                  vias: Iterable[int], pesos: Iterable[float], nomes_vias: Sequence[str],
+                  subregioes: Optional[Sequence[Optional[str]]] = None) -> 'GrafoCSR':
+        """
+        Constrói a representação CSR diretamente de arrays de arestas já codificadas
+
+        Args:
+            nomes: Nome de cada vértice (o índice na lista é o id do vértice)
+            origens: Id do vértice de origem de cada via
+            destinos: Id do vértice de destino de cada via
+            vias: Índice de cada via em nomes_vias
+            pesos: Distância em metros de cada via
+            nomes_vias: Tabela de nomes de vias
+            subregioes: Subregião de cada vértice (opcional)
+
+        Returns:
+            GrafoCSR equivalente a inserir as vias, na ordem dada, com adicionar_aresta
+        """
+        n = len(nomes)
+        origens = np.asarray(origens, dtype=np.int64)
+        destinos = np.asarray(destinos, dtype=np.int64)
+        vias = np.asarray(vias, dtype=np.int32)
+        pesos = np.asarray(pesos, dtype=np.float64)
+
+        m = len(origens)
+        if not (len(destinos) == len(vias) == len(pesos) == m):
+            raise ValueError("origens, destinos, vias e pesos devem ter o mesmo tamanho")
+
+        # Intercala ida (posições pares) e volta (posições ímpares) para que a
+        # ordenação estável preserve a ordem de inserção em cada vértice
+        fontes = np.empty(2 * m, dtype=np.int64)
+        fontes[0::2] = origens
+        fontes[1::2] = destinos
+        alvos = np.empty(2 * m, dtype=np.int64)
+        alvos[0::2] = destinos
+        alvos[1::2] = origens
+
+        ordem = np.argsort(fontes, kind='stable')
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(fontes, minlength=n), out=offsets[1:])
+
+        if subregioes is None:
+            subregioes = [None] * n
+
+        return cls(
+            nomes, subregioes, offsets,
+            alvos[ordem],
+            np.repeat(pesos, 2)[ordem],
+            np.repeat(vias, 2)[ordem],
+            nomes_vias
+        )
+
+    @classmethod
+    def carregar_snapshot(cls, caminho: str) -> 'GrafoCSR':
+        """
+        Constrói a representação CSR diretamente de um snapshot binário
+        (ver Grafo.salvar_snapshot), sem criar objetos Aresta
+        """
+        dados = ler_snapshot(caminho)
+        return cls.de_arrays(
+            dados.nomes_vertices(), dados.origens, dados.destinos,
+            dados.vias, dados.pesos, dados.strings, dados.subregioes()
+        )
+
+    def _fatia(self, i: int) -> slice:
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+    def vizinhos_ids(self, i: int):
+        """Retorna (targets, weights, via_id) das arestas que saem do vértice de id i"""
+        fatia = self._fatia(i)
+        return self.targets[fatia], self.weights[fatia], self.via_id[fatia]
+
+    def _criar_aresta(self, i: int, k: int) -> Aresta:
+        return Aresta(
+            self.nomes[i],
+            self.nomes[self.targets[k]],
+            self.nomes_vias[self.via_id[k]],
+            float(self.weights[k])
+        )
+
+    @property
+    def adjacencias(self) -> Mapping:
+        """Visão compatível com Grafo.adjacencias (as arestas são criadas sob demanda)"""
+        return _AdjacenciasCSR(self)
+
+    def obter_vizinhos(self, vertice: str) -> List[Aresta]:
+        """Retorna todas as arestas que saem de um vértice"""
+        i = self.indices.get(vertice)
+        if i is None:
+            return []
+        return [self._criar_aresta(i, k) for k in range(self.offsets[i], self.offsets[i + 1])]
+
+    def obter_vertice(self, nome: str) -> Optional[Vertice]:
+        """Retorna um vértice pelo nome"""
+        return self.vertices.get(nome)
+
+    def grau(self, vertice: str) -> int:
+        """Retorna o grau de um vértice (número de arestas incidentes)"""
+        i = self.indices.get(vertice)
+        if i is None:
+            return 0
+        return int(self.offsets[i + 1] - self.offsets[i])
+
+    def graus(self) -> np.ndarray:
+        """Retorna o grau de todos os vértices, na ordem dos ids"""
+        return np.diff(self.offsets)
+
+    def existe_aresta(self, origem: str, destino: str) -> bool:
+        """Verifica se existe pelo menos uma aresta entre dois vértices"""
+        i = self.indices.get(origem)
+        j = self.indices.get(destino)
+        if i is None or j is None:
+            return False
+        return bool(np.any(self.targets[self._fatia(i)] == j))
+
+    def obter_arestas_entre(self, origem: str, destino: str) -> List[Aresta]:
+        """Retorna todas as arestas entre dois vértices (arestas paralelas)"""
+        i = self.indices.get(origem)
+        j = self.indices.get(destino)
+        if i is None or j is None:
+            return []
+
+        inicio = self.offsets[i]
+        posicoes = np.flatnonzero(self.targets[self._fatia(i)] == j)
+        return [self._criar_aresta(i, inicio + p) for p in posicoes]
+
+    def num_vertices(self) -> int:
+        """Retorna o número de vértices do grafo"""
+        return len(self.nomes)
+
+    def listar_vertices(self) -> List[str]:
+        """Retorna lista com nomes de todos os vértices"""
+        return list(self.nomes)
+
+    def nbytes(self) -> int:
+        """Retorna o total de bytes ocupado pelos arrays de adjacência"""
+        return int(self.offsets.nbytes + self.targets.nbytes + self.weights.nbytes + self.via_id.nbytes)
+
+    def __repr__(self):
+        return f"GrafoCSR(vertices={self.num_vertices()}, arestas={self.num_arestas})"
@@ -0,0 +1,435 @@
+"""
+Hierarquia de contração (contraction hierarchies) para caminhos mínimos rápidos
+
+Pré-processamento:
+- As arestas paralelas são reduzidas à via de menor peso (adjacências colapsadas)
+- Os bairros são contraídos um a um, em ordem de prioridade pela diferença de
+  arestas (atalhos criados - arestas removidas) somada ao número de vizinhos já
+  contraídos, com atualização preguiçosa da fila
+- Ao contrair v, cada par de vizinhos (u, w) ganha um atalho u-w com peso
+  d(u,v) + d(v,w), a menos que uma busca de testemunha encontre um caminho
+  tão curto quanto sem passar por v. Se u-w já existe, fica o menor peso
+
+Consulta: Dijkstra bidirecional em que cada lado só sobe na hierarquia (para
+bairros de posição maior). Como o grafo é não direcionado, o grafo de busca
+descendente invertido é igual ao ascendente, então as duas buscas usam os
+mesmos arrays CSR. Os atalhos do caminho encontrado são desempacotados de volta
+até as vias originais (nome_via).
+
+A hierarquia pode ser salva em um único arquivo .npz e carregada na
+inicialização de um servidor, sem o Grafo.
+"""
+import heapq
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from caminhos import Caminho
+from grafo import Grafo
+
+VERSAO_FORMATO = 1
+
+SEM_FILHO = -1
+
+# Limite de bairros fixados em cada busca de testemunha. Buscas interrompidas
+# apenas geram atalhos a mais, sem afetar a corretude das consultas.
+LIMITE_TESTEMUNHA = 64
+
+
+class HierarquiaContracao:
+    """
+    Hierarquia de contração em forma de arrays
+
+    Cada aresta da hierarquia (original ou atalho) tem um id. Atalhos guardam
+    os ids das duas arestas que substituem (filho_1: extremo_1 -> meio,
+    filho_2: meio -> extremo_2); arestas originais guardam o índice da via.
+    """
+
+    def __init__(self, nomes: Sequence[str], posicoes: np.ndarray,
+                 offsets: np.ndarray, alvos: np.ndarray, pesos: np.ndarray, ids_aresta: np.ndarray,
+                 extremos_1: np.ndarray, extremos_2: np.ndarray, vias: np.ndarray,
+                 filhos_1: np.ndarray, filhos_2: np.ndarray, nomes_vias: Sequence[str],
+                 num_arestas: int = 0):
+        self.nomes: List[str] = list(nomes)
+        self.indices: Dict[str, int] = {nome: i for i, nome in enumerate(self.nomes)}
+        # Posição de cada bairro na ordem de contração
+        self.posicoes = posicoes
+        # Grafo de busca ascendente (CSR): arestas de cada bairro para bairros de posição maior
+        self.offsets = offsets
+        self.alvos = alvos
+        self.pesos = pesos
+        self.ids_aresta = ids_aresta
+        # Tabela de arestas da hierarquia, usada para desempacotar atalhos
+        self.extremos_1 = extremos_1
+        self.extremos_2 = extremos_2
+        self.vias = vias
+        self.filhos_1 = filhos_1
+        self.filhos_2 = filhos_2
+        self.nomes_vias: List[str] = list(nomes_vias)
+        # Número de vias do grafo de origem, para detectar hierarquias desatualizadas
+        self.num_arestas = num_arestas
+        # Listas de arestas ascendentes por bairro: acessar escalares NumPy um a
+        # um no laço da busca custaria mais que a própria busca
+        self._ascendentes = [
+            list(zip(alvos[a:b].tolist(), self.pesos[a:b].tolist(), ids_aresta[a:b].tolist()))
+            for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+        ]
+
+    @property
+    def num_atalhos(self) -> int:
+        return int(np.count_nonzero(self.filhos_1 != SEM_FILHO))
+
+    @classmethod
+    def construir(cls, grafo: Grafo, limite_testemunha: int = LIMITE_TESTEMUNHA) -> 'HierarquiaContracao':
+        """
+        Contrai todos os bairros do grafo e monta os arrays de busca
+
+        Args:
+            grafo: Grafo de origem
+            limite_testemunha: Máximo de bairros fixados em cada busca de testemunha
+
+        Returns:
+            HierarquiaContracao pronta para consultas
+        """
+        nomes = list(grafo.vertices.keys())
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        n = len(nomes)
+
+        nomes_vias: List[str] = []
+        indices_vias: Dict[str, int] = {}
+
+        # Tabela de arestas (listas durante a construção)
+        extremos_1: List[int] = []
+        extremos_2: List[int] = []
+        pesos_arestas: List[float] = []
+        vias: List[int] = []
+        filhos_1: List[int] = []
+        filhos_2: List[int] = []
+
+        # Grafo restante: vizinho -> id da melhor aresta até ele
+        restante: List[Dict[int, int]] = [{} for _ in range(n)]
+
+        for origem, vizinhos in grafo.adjacencias_colapsadas().items():
+            i = indices[origem]
+            for destino, peso, via in vizinhos:
+                j = indices[destino]
+                if j < i:
+                    continue
+                if via not in indices_vias:
+                    indices_vias[via] = len(nomes_vias)
+                    nomes_vias.append(via)
+                id_aresta = len(extremos_1)
+                extremos_1.append(i)
+                extremos_2.append(j)
+                pesos_arestas.append(peso)
+                vias.append(indices_vias[via])
+                filhos_1.append(SEM_FILHO)
+                filhos_2.append(SEM_FILHO)
+                restante[i][j] = id_aresta
+                restante[j][i] = id_aresta
+
+        contraidos = [False] * n
+        vizinhos_contraidos = [0] * n
+
+        def busca_testemunha(origem: int, ignorado: int, limite_distancia: float) -> Dict[int, float]:
+            """Dijkstra limitado no grafo restante, sem passar pelo bairro ignorado"""
+            distancias = {origem: 0.0}
+            heap = [(0.0, origem)]
+            fixados = 0
+            while heap and fixados < limite_testemunha:
+                distancia, vertice = heapq.heappop(heap)
+                if distancia > distancias[vertice]:
+                    continue
+                if distancia > limite_distancia:
+                    break
+                fixados += 1
+                for vizinho, id_aresta in restante[vertice].items():
+                    if vizinho == ignorado:
+                        continue
+                    nova_distancia = distancia + pesos_arestas[id_aresta]
+                    if nova_distancia < distancias.get(vizinho, float('inf')):
+                        distancias[vizinho] = nova_distancia
+                        heapq.heappush(heap, (nova_distancia, vizinho))
+            return distancias
+
+        def atalhos_necessarios(v: int):
+            """Lista (u, w, peso, aresta_uv, aresta_vw) dos atalhos que a contração de v exige"""
+            vizinhos = list(restante[v].items())
+            if len(vizinhos) < 2:
+                return []
+            maior_saida = max(pesos_arestas[a] for _, a in vizinhos)
+            atalhos = []
+            for k, (u, aresta_uv) in enumerate(vizinhos[:-1]):
+                peso_uv = pesos_arestas[aresta_uv]
+                distancias = busca_testemunha(u, v, peso_uv + maior_saida)
+                for w, aresta_vw in vizinhos[k + 1:]:
+                    peso_atalho = peso_uv + pesos_arestas[aresta_vw]
+                    if distancias.get(w, float('inf')) > peso_atalho:
+                        atalhos.append((u, w, peso_atalho, aresta_uv, aresta_vw))
+            return atalhos
+
+        def prioridade(v: int) -> int:
+            diferenca_arestas = len(atalhos_necessarios(v)) - len(restante[v])
+            return diferenca_arestas + vizinhos_contraidos[v]
+
+        fila = [(prioridade(v), v) for v in range(n)]
+        heapq.heapify(fila)
+
+        posicoes = np.empty(n, dtype=np.int64)
+        # Arestas ascendentes de cada bairro: as que ele ainda tinha ao ser contraído
+        ascendentes: List[List[int]] = [[] for _ in range(n)]
+        posicao = 0
+
+        while fila:
+            _, v = heapq.heappop(fila)
+            if contraidos[v]:
+                continue
+
+            # Atualização preguiçosa: se a prioridade piorou, volta para a fila
+            atual = prioridade(v)
+            if fila and atual > fila[0][0]:
+                heapq.heappush(fila, (atual, v))
+                continue
+
+            for u, w, peso, aresta_uv, aresta_vw in atalhos_necessarios(v):
+                existente = restante[u].get(w)
+                if existente is not None and pesos_arestas[existente] <= peso:
+                    continue
+                id_aresta = len(extremos_1)
+                extremos_1.append(u)
+                extremos_2.append(w)
+                pesos_arestas.append(peso)
+                vias.append(SEM_FILHO)
+                # filho_1 vai de u até v e filho_2 de v até w
+                filhos_1.append(aresta_uv)
+                filhos_2.append(aresta_vw)
+                restante[u][w] = id_aresta
+                restante[w][u] = id_aresta
+
+            contraidos[v] = True
+            posicoes[v] = posicao
+            posicao += 1
+            ascendentes[v] = list(restante[v].values())
+            for u in restante[v]:
+                del restante[u][v]
+                vizinhos_contraidos[u] += 1
+            restante[v] = {}
+
+        graus = np.fromiter((len(a) for a in ascendentes), dtype=np.int64, count=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(graus, out=offsets[1:])
+
+        extremos_1_arr = np.asarray(extremos_1, dtype=np.int32)
+        extremos_2_arr = np.asarray(extremos_2, dtype=np.int32)
+        pesos_arr = np.asarray(pesos_arestas, dtype=np.float64)
+
+        ids_aresta = np.fromiter((a for lista in ascendentes for a in lista), dtype=np.int32,
+                                 count=int(offsets[-1]))
+        origens = np.repeat(np.arange(n, dtype=np.int32), graus)
+        alvos = np.where(extremos_1_arr[ids_aresta] == origens,
+                         extremos_2_arr[ids_aresta], extremos_1_arr[ids_aresta]).astype(np.int32)
+
+        return cls(
+            nomes, posicoes, offsets, alvos, pesos_arr[ids_aresta], ids_aresta,
+            extremos_1_arr, extremos_2_arr, np.asarray(vias, dtype=np.int32),
+            np.asarray(filhos_1, dtype=np.int32), np.asarray(filhos_2, dtype=np.int32), nomes_vias,
+            grafo.num_arestas
+        )
+
+    def _busca_ascendente(self, distancias: Dict[int, float], anteriores: Dict[int, int],
+                          heap: list):
+        """Fixa o próximo bairro de um dos lados e relaxa suas arestas ascendentes"""
+        distancia, vertice = heapq.heappop(heap)
+        if distancia > distancias[vertice]:
+            return None
+
+        ascendentes = self._ascendentes[vertice]
+        # Stall-on-demand: se um bairro acima já alcança este por um caminho
+        # mais curto, a distância dele não é mínima e não vale expandi-lo
+        infinito = float('inf')
+        for vizinho, peso, _ in ascendentes:
+            if distancias.get(vizinho, infinito) + peso < distancia:
+                return vertice
+
+        for vizinho, peso, id_aresta in ascendentes:
+            nova_distancia = distancia + peso
+            if nova_distancia < distancias.get(vizinho, float('inf')):
+                distancias[vizinho] = nova_distancia
+                anteriores[vizinho] = id_aresta
+                heapq.heappush(heap, (nova_distancia, vizinho))
+        return vertice
+
+    def _desempacotar(self, id_aresta: int, inicio: int, vias: List[str], bairros: List[int]):
+        """Acrescenta as vias e bairros originais de uma aresta percorrida a partir de inicio"""
+        pilha = [(id_aresta, inicio)]
+        while pilha:
+            aresta, de = pilha.pop()
+            para = int(self.extremos_2[aresta]) if self.extremos_1[aresta] == de else int(self.extremos_1[aresta])
+            filho_1 = int(self.filhos_1[aresta])
+            if filho_1 == SEM_FILHO:
+                vias.append(self.nomes_vias[self.vias[aresta]])
+                bairros.append(para)
+                continue
+
+            filho_2 = int(self.filhos_2[aresta])
+            # filho_2 liga o meio ao extremo_2 do atalho
+            extremo_2 = self.extremos_2[aresta]
+            meio = int(self.extremos_1[filho_2]) if self.extremos_2[filho_2] == extremo_2 else int(self.extremos_2[filho_2])
+            # filho_1 liga extremo_1 ao meio; ao percorrer ao contrário a ordem se inverte
+            primeiro, segundo = (filho_1, filho_2) if self.extremos_1[aresta] == de else (filho_2, filho_1)
+            # A pilha é LIFO: empilha o segundo trecho antes do primeiro
+            pilha.append((segundo, meio))
+            pilha.append((primeiro, de))
+
+    def _trechos(self, anteriores: Dict[int, int], inicio: int, fim: int) -> List[tuple]:
+        """Arestas da árvore de busca de inicio até fim, na ordem inicio -> fim"""
+        trechos = []
+        vertice = fim
+        while vertice != inicio:
+            aresta = anteriores[vertice]
+            anterior = int(self.extremos_1[aresta]) if self.extremos_2[aresta] == vertice else int(self.extremos_2[aresta])
+            trechos.append((aresta, anterior))
+            vertice = anterior
+        trechos.reverse()
+        return trechos
+
+    def caminho_minimo(self, origem: str, destino: str) -> Optional[Caminho]:
+        """
+        Calcula o caminho mínimo entre dois bairros usando a hierarquia
+
+        Returns:
+            Caminho com as vias originais (atalhos desempacotados), ou None se
+            não houver caminho
+        """
+        origem = origem.strip()
+        destino = destino.strip()
+        s = self.indices.get(origem)
+        t = self.indices.get(destino)
+        if s is None or t is None:
+            return None
+        if s == t:
+            return Caminho(origem, destino, 0.0, [origem], [], 1)
+
+        distancias = ({s: 0.0}, {t: 0.0})
+        anteriores = ({}, {})
+        heaps = ([(0.0, s)], [(0.0, t)])
+        melhor = float('inf')
+        encontro = None
+        expandidos = 0
+
+        while heaps[0] or heaps[1]:
+            # Cada lado para quando o topo da sua fila não pode mais melhorar o encontro
+            for lado in (0, 1):
+                if heaps[lado] and heaps[lado][0][0] >= melhor:
+                    heaps[lado].clear()
+            candidatos = [lado for lado in (0, 1) if heaps[lado]]
+            if not candidatos:
+                break
+            lado = min(candidatos, key=lambda l: heaps[l][0][0])
+
+            vertice = self._busca_ascendente(distancias[lado], anteriores[lado], heaps[lado])
+            if vertice is None:
+                continue
+            expandidos += 1
+
+            outro = distancias[1 - lado].get(vertice)
+            if outro is not None and distancias[lado][vertice] + outro < melhor:
+                melhor = distancias[lado][vertice] + outro
+                encontro = vertice
+
+        if encontro is None:
+            return None
+
+        bairros = [s]
+        vias: List[str] = []
+        for aresta, de in self._trechos(anteriores[0], s, encontro):
+            self._desempacotar(aresta, de, vias, bairros)
+        # A árvore reversa vai de t até o encontro; percorre-se de volta, do encontro até t
+        for aresta, de in reversed(self._trechos(anteriores[1], t, encontro)):
+            para = int(self.extremos_2[aresta]) if self.extremos_1[aresta] == de else int(self.extremos_1[aresta])
+            self._desempacotar(aresta, para, vias, bairros)
+
+        return Caminho(origem, destino, melhor, [self.nomes[b] for b in bairros], vias, expandidos)
+
+    def distancia(self, origem: str, destino: str) -> float:
+        """Retorna a distância mínima em metros (inf se não houver caminho)"""
+        caminho = self.caminho_minimo(origem, destino)
+        return caminho.distancia if caminho else float('inf')
+
+    def salvar(self, caminho: str):
+        """Salva a hierarquia em um único arquivo .npz"""
+        np.savez(
+            caminho,
+            versao_formato=np.array(VERSAO_FORMATO),
+            num_arestas=np.array(self.num_arestas),
+            nomes=np.array(self.nomes, dtype=str),
+            nomes_vias=np.array(self.nomes_vias, dtype=str),
+            posicoes=self.posicoes,
+            offsets=self.offsets,
+            alvos=self.alvos,
+            pesos=self.pesos,
+            ids_aresta=self.ids_aresta,
+            extremos_1=self.extremos_1,
+            extremos_2=self.extremos_2,
+            vias=self.vias,
+            filhos_1=self.filhos_1,
+            filhos_2=self.filhos_2,
+        )
+
+    @classmethod
+    def carregar(cls, caminho: str) -> 'HierarquiaContracao':
+        """Carrega uma hierarquia salva com salvar()"""
+        with np.load(caminho, allow_pickle=False) as dados:
+            if int(dados['versao_formato']) != VERSAO_FORMATO:
+                raise ValueError(f"Versão de formato da hierarquia não suportada: {int(dados['versao_formato'])}")
+            return cls(
+                dados['nomes'].tolist(), dados['posicoes'],
+                dados['offsets'], dados['alvos'], dados['pesos'], dados['ids_aresta'],
+                dados['extremos_1'], dados['extremos_2'], dados['vias'],
+                dados['filhos_1'], dados['filhos_2'], dados['nomes_vias'].tolist(),
+                int(dados['num_arestas'])
+            )
+
+
+def caminho_hierarquia(caminho_vias: str) -> str:
+    """Retorna o arquivo da hierarquia, ao lado da planilha de vias"""
+    return os.path.splitext(caminho_vias)[0] + '.hierarquia.npz'
+
+
+def obter_hierarquia(grafo: Grafo, caminho_vias: str, recalcular: bool = False) -> HierarquiaContracao:
+    """
+    Carrega a hierarquia salva ao lado da planilha de vias ou, se ela não
+    existir ou estiver desatualizada, constrói e salva uma nova
+
+    Args:
+        grafo: Grafo construído a partir da planilha
+        caminho_vias: Caminho da planilha de vias usada para construir o grafo
+        recalcular: Força a reconstrução mesmo que exista uma hierarquia salva
+
+    Returns:
+        HierarquiaContracao pronta para consultas
+    """
+    arquivo = caminho_hierarquia(caminho_vias)
+
+    if not recalcular and os.path.exists(arquivo):
+        atualizada = (
+            not os.path.exists(caminho_vias)
+            or os.path.getmtime(arquivo) >= os.path.getmtime(caminho_vias)
+        )
+        if atualizada:
+            try:
+                hierarquia = HierarquiaContracao.carregar(arquivo)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Hierarquia salva inválida ({e}), reconstruindo...")
+            else:
+                if hierarquia.nomes == list(grafo.vertices.keys()) and hierarquia.num_arestas == grafo.num_arestas:
+                    print(f"✓ Hierarquia de contração carregada de: {arquivo}")
+                    return hierarquia
+
+    print(f"Construindo hierarquia de contração ({grafo.num_vertices()} bairros)...")
+    hierarquia = HierarquiaContracao.construir(grafo)
+    hierarquia.salvar(arquivo)
+    print(f"✓ Hierarquia salva em: {arquivo} ({hierarquia.num_atalhos} atalhos)")
+
+    return hierarquia
@@ -0,0 +1,170 @@
+"""
+Índice espacial (quadtree solta) para as páginas em canvas
+
+As páginas de visualizar_simples e visualizar_organico procuravam o bairro
+sob o mouse percorrendo todos os vértices e redesenhavam todas as arestas a
+cada movimento. O índice é calculado em Python, gravado junto com os dados
+(DADOS_GRAFO.indice) e consultado em JavaScript (CONSULTA_QUADTREE_JS) para:
+- achar o bairro sob o mouse visitando só as células em volta do ponteiro
+- desenhar só as arestas e bairros que cruzam a área visível (pan e zoom)
+
+Cada item (bairro ou aresta) fica na célula que contém o seu centro (a
+posição do bairro ou o ponto médio da aresta), no nível mais fundo em que a
+célula, expandida em meio lado para cada direção ("solta"), ainda contém a
+caixa do item inteira. Assim nenhum item pequeno sobe para a raiz só por
+cruzar uma divisa de células, como acontece na quadtree comum. Uma consulta
+desce apenas pelas células cuja área expandida cruza o retângulo procurado.
+
+Formato gravado (em colunas, como em agregacao_arestas):
+
+    {
+        "x": ..., "y": ..., "lado": ...,   # quadrado da raiz
+        "filhos": [...],                   # 4 por célula (-1 se vazio);
+                                           # quadrante k: x + (k & 1), y + (k >> 1)
+        "inicio": [...],                   # itens da célula c: inicio[c]:inicio[c+1]
+        "itens": [...]                     # índices nos arrays da página
+    }
+
+A célula 0 é a raiz; as células são numeradas nível a nível.
+"""
+from typing import Iterable, Sequence
+
+import numpy as np
+
+# Média de itens por célula no nível mais fundo
+ITENS_POR_CELULA = 8
+
+# Limite de níveis (a precisão de float64 vai muito além disso)
+PROFUNDIDADE_MAXIMA = 20
+
+# Função JavaScript que percorre o índice (ver construir_quadtree)
+CONSULTA_QUADTREE_JS = """
+        // Chama visitar(i) para cada item cuja célula solta cruza o retângulo
+        // [x0, x1] x [y0, y1]; o teste exato fica com quem chama
+        function consultarQuadtree(q, x0, y0, x1, y1, visitar) {
+            const pilha = [0, q.x, q.y, q.lado];
+            while (pilha.length) {
+                const lado = pilha.pop(), cy = pilha.pop(), cx = pilha.pop(), c = pilha.pop();
+                const folga = lado / 2;
+                if (cx - folga > x1 || cx + lado + folga < x0 || cy - folga > y1 || cy + lado + folga < y0) continue;
+                for (let j = q.inicio[c]; j < q.inicio[c + 1]; j++) visitar(q.itens[j]);
+                for (let k = 0; k < 4; k++) {
+                    const filho = q.filhos[4 * c + k];
+                    if (filho >= 0) pilha.push(filho, cx + (k & 1) * folga, cy + (k >> 1) * folga, folga);
+                }
+            }
+        }
+
+        // Teste exato: a caixa [ax0, ax1] x [ay0, ay1] cruza o retângulo?
+        function caixaCruza(ax0, ay0, ax1, ay1, x0, y0, x1, y1) {
+            return ax0 <= x1 && ax1 >= x0 && ay0 <= y1 && ay1 >= y0;
+        }
+"""
+
+
+def construir_quadtree(xmin: Sequence[float], ymin: Sequence[float], xmax: Sequence[float],
+                       ymax: Sequence[float], itens_por_celula: int = ITENS_POR_CELULA) -> dict:
+    """
+    Monta a quadtree solta das caixas [xmin, xmax] x [ymin, ymax] (uma por item)
+
+    Args:
+        xmin, ymin, xmax, ymax: Caixa de cada item, na ordem dos arrays da página
+        itens_por_celula: Média desejada de itens por célula no nível mais fundo
+
+    Returns:
+        Dicionário no formato descrito no módulo, com as colunas em arrays
+        NumPy (escrita_html grava em fatias, sem montar listas Python)
+    """
+    xmin = np.asarray(xmin, dtype=np.float64)
+    ymin = np.asarray(ymin, dtype=np.float64)
+    xmax = np.asarray(xmax, dtype=np.float64)
+    ymax = np.asarray(ymax, dtype=np.float64)
+    n = len(xmin)
+    if n == 0:
+        return {'x': 0.0, 'y': 0.0, 'lado': 1.0, 'filhos': np.full(4, -1, dtype=np.int64),
+                'inicio': np.zeros(2, dtype=np.int64), 'itens': np.empty(0, dtype=np.int64)}
+
+    # Quadrado da raiz: cobre todos os centros e é pelo menos do tamanho do
+    # maior item, para que a raiz expandida contenha qualquer caixa
+    centros_x = (xmin + xmax) / 2
+    centros_y = (ymin + ymax) / 2
+    x0, y0 = float(centros_x.min()), float(centros_y.min())
+    lado = max(float(centros_x.max()) - x0, float(centros_y.max()) - y0,
+               float((xmax - xmin).max()), float((ymax - ymin).max()), 1e-9) * (1 + 1e-9)
+
+    # Nível de cada item: o mais fundo em que meia extensão <= meio lado da célula
+    profundidade = int(np.ceil(np.log(max(n / itens_por_celula, 1)) / np.log(4)))
+    profundidade = min(max(profundidade, 1), PROFUNDIDADE_MAXIMA)
+    meia_extensao = np.maximum(xmax - xmin, ymax - ymin) / (2 * lado)
+    with np.errstate(divide='ignore'):
+        niveis = np.floor(np.log2(0.5 / meia_extensao))
+    niveis = np.clip(np.nan_to_num(niveis, posinf=profundidade), 0, profundidade).astype(np.int64)
+
+    tamanhos = np.left_shift(1, niveis)
+    celulas_x = np.minimum(((centros_x - x0) / lado * tamanhos).astype(np.int64), tamanhos - 1)
+    celulas_y = np.minimum(((centros_y - y0) / lado * tamanhos).astype(np.int64), tamanhos - 1)
+
+    # Células de cada nível (ocupadas ou ancestrais de ocupadas), do fundo para a raiz
+    chaves_por_nivel = [None] * (profundidade + 1)
+    abaixo = np.empty(0, dtype=np.int64)
+    for nivel in range(profundidade, -1, -1):
+        deste = niveis == nivel
+        chaves = celulas_x[deste] << nivel | celulas_y[deste]
+        if len(abaixo):
+            # Pai de (cx, cy) no nível + 1 é (cx >> 1, cy >> 1)
+            pais_x = (abaixo >> (nivel + 1)) >> 1
+            pais_y = (abaixo & ((1 << (nivel + 1)) - 1)) >> 1
+            chaves = np.concatenate([chaves, pais_x << nivel | pais_y])
+        chaves_por_nivel[nivel] = abaixo = np.unique(chaves)
+
+    # Numeração nível a nível e ligação de cada célula ao quadrante do pai
+    deslocamentos = np.cumsum([0] + [len(chaves) for chaves in chaves_por_nivel])
+    filhos = np.full(4 * int(deslocamentos[-1]), -1, dtype=np.int64)
+    for nivel in range(1, profundidade + 1):
+        chaves = chaves_por_nivel[nivel]
+        cx = chaves >> nivel
+        cy = chaves & ((1 << nivel) - 1)
+        pais = deslocamentos[nivel - 1] + np.searchsorted(chaves_por_nivel[nivel - 1],
+                                                          (cx >> 1) << (nivel - 1) | (cy >> 1))
+        filhos[4 * pais + (cx & 1) + 2 * (cy & 1)] = deslocamentos[nivel] + np.arange(len(chaves))
+
+    # Itens agrupados por célula
+    celula_item = np.empty(n, dtype=np.int64)
+    for nivel in range(profundidade + 1):
+        deste = niveis == nivel
+        chaves = celulas_x[deste] << nivel | celulas_y[deste]
+        celula_item[deste] = deslocamentos[nivel] + np.searchsorted(chaves_por_nivel[nivel], chaves)
+    ordem = np.argsort(celula_item, kind='stable')
+    inicio = np.zeros(int(deslocamentos[-1]) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(celula_item, minlength=int(deslocamentos[-1])), out=inicio[1:])
+
+    return {
+        'x': x0, 'y': y0, 'lado': lado,
+        'filhos': filhos,
+        'inicio': inicio,
+        'itens': ordem,
+    }
+
+
+def indice_pagina(xs: Sequence[float], ys: Sequence[float], raios: Sequence[float],
+                  origens: Iterable[int], destinos: Iterable[int]) -> dict:
+    """
+    Índices de uma página em canvas, para DADOS_GRAFO.indice
+
+    Args:
+        xs, ys, raios: Posição e raio de cada bairro, na ordem de vertices da página
+        origens, destinos: Índice (em vertices) das pontas de cada aresta, na
+            ordem de arestas da página (sequências ou geradores)
+
+    Returns:
+        {'vertices': quadtree dos círculos, 'arestas': quadtree dos segmentos}
+    """
+    xs, ys, raios = (np.asarray(v, dtype=np.float64) for v in (xs, ys, raios))
+    # fromiter aceita geradores sem criar uma lista de ints por aresta
+    origens = np.fromiter(origens, dtype=np.int64)
+    destinos = np.fromiter(destinos, dtype=np.int64)
+    return {
+        'vertices': construir_quadtree(xs - raios, ys - raios, xs + raios, ys + raios),
+        'arestas': construir_quadtree(np.minimum(xs[origens], xs[destinos]), np.minimum(ys[origens], ys[destinos]),
+                                      np.maximum(xs[origens], xs[destinos]), np.maximum(ys[origens], ys[destinos])),
+    }
@@ -0,0 +1,253 @@
+"""
+Layout de forças (Fruchterman-Reingold) calculado em Python para os
+visualizadores HTML, no lugar da estabilização do vis.js no navegador
+
+Atração: cada par de bairros vizinhos (vias paralelas contam uma vez) é uma
+mola, acumulada de forma vetorizada com np.bincount.
+
+Repulsão: até LIMITE_REPULSAO_EXATA bairros, todos os pares são calculados
+em blocos de arrays. Acima disso, usa uma quadtree construída nível a nível
+(Barnes-Hut em grade): em cada nível, a massa e o centro de massa de cada
+célula saem de np.bincount, e cada bairro interage com as células bem
+separadas do nível (filhas das vizinhas da sua célula pai que não são
+vizinhas da sua própria célula) - no máximo 27 por nível. No último nível
+as células vizinhas também entram pelo centro de massa.
+
+O sorteio inicial usa uma semente fixa, então o mesmo grafo sempre gera o
+mesmo desenho. obter_layout guarda o resultado em disco, com o nome do
+arquivo derivado de uma impressão digital do grafo e dos parâmetros.
+"""
+import hashlib
+import os
+import struct
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+VERSAO_FORMATO = 1
+
+# Distância ideal entre bairros vizinhos (em pixels do vis.js)
+ESPACAMENTO = 150.0
+
+# Até este número de bairros a repulsão é calculada par a par
+LIMITE_REPULSAO_EXATA = 2000
+
+# Bairros por bloco na repulsão exata (limita a memória a bloco x n)
+TAMANHO_BLOCO = 512
+
+# Média de bairros por célula no nível mais fino da quadtree
+BAIRROS_POR_CELULA = 4
+
+# Deslocamentos (em células) das vizinhas de uma célula, incluindo ela mesma
+_VIZINHAS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+def _pares(grafo) -> Tuple[list, np.ndarray, np.ndarray]:
+    """Bairros na ordem de grafo.vertices e os pares (i < j) de vizinhos, sem repetição"""
+    nomes = list(grafo.vertices.keys())
+    indices = {nome: i for i, nome in enumerate(nomes)}
+    n = len(nomes)
+
+    origens = np.fromiter((indices[r.origem] for r in grafo.registros), dtype=np.int64,
+                          count=len(grafo.registros))
+    destinos = np.fromiter((indices[r.destino] for r in grafo.registros), dtype=np.int64,
+                           count=len(grafo.registros))
+    validas = origens != destinos
+    menores = np.minimum(origens[validas], destinos[validas])
+    maiores = np.maximum(origens[validas], destinos[validas])
+    chaves = np.unique(menores * n + maiores)
+    return nomes, chaves // n, chaves % n
+
+
+def impressao_grafo(grafo, **parametros) -> str:
+    """
+    Impressão digital (SHA-256) dos bairros, das vias e dos parâmetros do layout
+
+    Muda sempre que um bairro ou via é adicionado, removido ou alterado, mas
+    não depende de estilo (cores, tamanhos), então o layout em cache continua
+    válido quando só a aparência da página muda.
+    """
+    resumo = hashlib.sha256()
+    resumo.update(struct.pack('<I', VERSAO_FORMATO))
+    for nome in grafo.vertices:
+        resumo.update(nome.encode('utf-8'))
+        resumo.update(b'\0')
+    resumo.update(b'\1')
+    for registro in grafo.registros:
+        resumo.update(f"{registro.origem}\0{registro.destino}\0{registro.peso!r}\0".encode('utf-8'))
+    for chave in sorted(parametros):
+        resumo.update(f"{chave}={parametros[chave]!r}\0".encode('utf-8'))
+    return resumo.hexdigest()
+
+
+def _repulsao_exata(posicoes: np.ndarray, k2: float) -> np.ndarray:
+    """Força k²/d entre todos os pares, em blocos de TAMANHO_BLOCO bairros"""
+    n = len(posicoes)
+    forcas = np.zeros_like(posicoes)
+    for inicio in range(0, n, TAMANHO_BLOCO):
+        bloco = posicoes[inicio:inicio + TAMANHO_BLOCO]
+        delta = bloco[:, None, :] - posicoes[None, :, :]
+        d2 = np.einsum('ijk,ijk->ij', delta, delta)
+        # O próprio bairro (d = 0) não contribui
+        d2[np.arange(len(bloco)), np.arange(inicio, inicio + len(bloco))] = np.inf
+        np.maximum(d2, 1e-9, out=d2)
+        forcas[inicio:inicio + len(bloco)] = np.einsum('ijk,ij->ik', delta, k2 / d2)
+    return forcas
+
+
+def _repulsao_quadtree(posicoes: np.ndarray, k2: float) -> np.ndarray:
+    """Repulsão aproximada por uma quadtree em grade, nível a nível"""
+    n = len(posicoes)
+    minimo = posicoes.min(axis=0)
+    lado = max(float((posicoes.max(axis=0) - minimo).max()), 1e-9) * (1 + 1e-9)
+    relativas = (posicoes - minimo) / lado
+
+    profundidade = max(1, int(np.ceil(np.log(max(n / BAIRROS_POR_CELULA, 1)) / np.log(4))))
+    forcas = np.zeros_like(posicoes)
+
+    for nivel in range(1, profundidade + 1):
+        tamanho = 1 << nivel
+        celulas = np.minimum((relativas * tamanho).astype(np.int64), tamanho - 1)
+        cx, cy = celulas[:, 0], celulas[:, 1]
+
+        # Massa e centro de massa de cada célula ocupada (chaves ordenadas)
+        chaves, inverso = np.unique(cx * tamanho + cy, return_inverse=True)
+        inverso = inverso.ravel()
+        massas = np.bincount(inverso, minlength=len(chaves)).astype(np.float64)
+        centros = np.stack([
+            np.bincount(inverso, weights=posicoes[:, 0], minlength=len(chaves)),
+            np.bincount(inverso, weights=posicoes[:, 1], minlength=len(chaves)),
+        ], axis=1) / massas[:, None]
+
+        def interagir(dx: np.ndarray, dy: np.ndarray, excluir_propria: bool = False):
+            """Soma a força das células (cx + dx, cy + dy) que existirem"""
+            ax, ay = cx + dx, cy + dy
+            dentro = (ax >= 0) & (ax < tamanho) & (ay >= 0) & (ay < tamanho)
+            alvo = np.where(dentro, ax * tamanho + ay, -1)
+            posicao = np.minimum(np.searchsorted(chaves, alvo), len(chaves) - 1)
+            existe = dentro & (chaves[posicao] == alvo)
+            massa = np.where(existe, massas[posicao], 0.0)
+            centro = centros[posicao]
+            if excluir_propria:
+                # Remove o próprio bairro do centro de massa da sua célula
+                massa = massa - 1.0
+                com_outros = massa > 0
+                centro = np.where(com_outros[:, None],
+                                  (centro * (massa + 1.0)[:, None] - posicoes) / np.maximum(massa, 1.0)[:, None],
+                                  posicoes)
+                massa = np.maximum(massa, 0.0)
+            delta = posicoes - centro
+            d2 = np.maximum(np.einsum('ij,ij->i', delta, delta), 1e-9)
+            forcas[:] += delta * (k2 * massa / d2)[:, None]
+
+        # Células bem separadas: filhas das vizinhas da célula pai que não
+        # são vizinhas da própria célula
+        px, py = cx & 1, cy & 1
+        for ox in range(-2, 4):
+            for oy in range(-2, 4):
+                dx = ox - px
+                dy = oy - py
+                distante = (np.abs(dx) > 1) | (np.abs(dy) > 1)
+                interagir(np.where(distante, dx, tamanho * 4), np.where(distante, dy, tamanho * 4))
+
+        if nivel == profundidade:
+            for dx, dy in _VIZINHAS:
+                interagir(np.full(n, dx), np.full(n, dy), excluir_propria=(dx == 0 and dy == 0))
+
+    return forcas
+
+
+def calcular_layout(grafo, iteracoes: int = 300, semente: int = 42,
+                    espacamento: float = ESPACAMENTO) -> Dict[str, Tuple[float, float]]:
+    """
+    Calcula as posições dos bairros por forças (Fruchterman-Reingold)
+
+    Args:
+        grafo: Instância do grafo
+        iteracoes: Número de passos da simulação (a temperatura cai linearmente)
+        semente: Semente das posições iniciais
+        espacamento: Distância ideal entre vizinhos
+
+    Returns:
+        Dicionário bairro -> (x, y), centrado na origem
+    """
+    nomes, origens, destinos = _pares(grafo)
+    n = len(nomes)
+    if n == 0:
+        return {}
+
+    k = float(espacamento)
+    k2 = k * k
+    lado = k * np.sqrt(n)
+    posicoes = np.random.default_rng(semente).uniform(-lado / 2, lado / 2, size=(n, 2))
+    repulsao = _repulsao_exata if n <= LIMITE_REPULSAO_EXATA else _repulsao_quadtree
+
+    temperatura_inicial = lado / 10
+    for passo in range(iteracoes):
+        forcas = repulsao(posicoes, k2)
+
+        # Atração d²/k ao longo de cada par de vizinhos
+        delta = posicoes[origens] - posicoes[destinos]
+        distancias = np.sqrt(np.einsum('ij,ij->i', delta, delta)) + 1e-9
+        tracao = delta * (distancias / k)[:, None]
+        for eixo in range(2):
+            forcas[:, eixo] -= np.bincount(origens, weights=tracao[:, eixo], minlength=n)
+            forcas[:, eixo] += np.bincount(destinos, weights=tracao[:, eixo], minlength=n)
+
+        # Cada bairro anda no máximo a temperatura atual
+        temperatura = temperatura_inicial * (1 - passo / iteracoes)
+        modulos = np.sqrt(np.einsum('ij,ij->i', forcas, forcas)) + 1e-9
+        posicoes += forcas * (np.minimum(modulos, temperatura) / modulos)[:, None]
+
+    posicoes -= posicoes.mean(axis=0)
+    return dict(zip(nomes, map(tuple, posicoes.tolist())))
+
+
+def obter_layout(grafo, diretorio_cache: Optional[str] = '.cache_layout', recalcular: bool = False,
+                 iteracoes: int = 300, semente: int = 42,
+                 espacamento: float = ESPACAMENTO) -> Dict[str, Tuple[float, float]]:
+    """
+    Carrega o layout em cache para este grafo ou calcula e salva um novo
+
+    O arquivo é '<diretorio_cache>/layout_<impressão>.npz', então qualquer
+    mudança nos bairros, nas vias ou nos parâmetros gera um novo layout, e
+    regenerar a página só com mudanças de estilo reaproveita o anterior.
+
+    Args:
+        grafo: Instância do grafo
+        diretorio_cache: Onde guardar os layouts (None desliga o cache)
+        recalcular: Ignora o cache existente
+        iteracoes, semente, espacamento: Ver calcular_layout
+
+    Returns:
+        Dicionário bairro -> (x, y)
+    """
+    if diretorio_cache is None:
+        return calcular_layout(grafo, iteracoes, semente, espacamento)
+
+    impressao = impressao_grafo(grafo, iteracoes=iteracoes, semente=semente, espacamento=espacamento)
+    arquivo = os.path.join(diretorio_cache, f"layout_{impressao[:32]}.npz")
+
+    if not recalcular and os.path.exists(arquivo):
+        try:
+            with np.load(arquivo, allow_pickle=False) as dados:
+                if int(dados['versao_formato']) != VERSAO_FORMATO or str(dados['impressao']) != impressao:
+                    raise ValueError("layout de outra versão ou grafo")
+                return dict(zip(dados['nomes'].tolist(), map(tuple, dados['posicoes'].tolist())))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Layout em cache inválido ({e}), recalculando...")
+
+    layout = calcular_layout(grafo, iteracoes, semente, espacamento)
+
+    os.makedirs(diretorio_cache, exist_ok=True)
+    temporario = arquivo + '.tmp.npz'
+    np.savez(
+        temporario,
+        versao_formato=np.array(VERSAO_FORMATO),
+        impressao=np.array(impressao),
+        nomes=np.array(list(layout.keys()), dtype=str),
+        posicoes=np.array(list(layout.values()), dtype=np.float64).reshape(-1, 2),
+    )
+    # Renomeia só depois de completo, para nunca deixar um cache pela metade
+    os.replace(temporario, arquivo)
+    return layout
@@ -2,7 +2,7 @@
 Script principal para construir e testar o grafo de bairros
 """
 import argparse
-from carregar_dados import construir_grafo_completo
+from carregar_dados import TAMANHO_BLOCO_PADRAO, construir_grafo_completo
 
 
 def main():
@@ -19,13 +19,35 @@ def main():
         '--vias',
         type=str,
         default='/mnt/c/Users/luise/Downloads/Todas as vias FINAL (1).xlsx',
-        help='Caminho para planilha de vias'
+        help='Caminho para planilha de vias (.xlsx, .csv ou .parquet; o leitor é escolhido pela extensão)'
+    )
+
+    parser.add_argument(
+        '--sem-snapshot',
+        action='store_true',
+        help='Sempre ler as planilhas, ignorando o snapshot binário'
+    )
+
+    parser.add_argument(
+        '--tamanho-bloco',
+        type=int,
+        default=TAMANHO_BLOCO_PADRAO,
+        help='Linhas lidas por bloco ao carregar vias de CSV/Parquet'
+    )
+
+    parser.add_argument(
+        '--coordenadas',
+        type=str,
+        default=None,
+        help='CSV (bairro, latitude, longitude) ou GeoJSON com os centróides dos bairros, usados pelo A*'
     )
 
     args = parser.parse_args()
 
     # Construir o grafo
-    grafo = construir_grafo_completo(args.subregioes, args.vias)
+    grafo = construir_grafo_completo(args.subregioes, args.vias, usar_snapshot=not args.sem_snapshot,
+                                     tamanho_bloco=args.tamanho_bloco,
+                                     caminho_coordenadas=args.coordenadas)
 
     # Exibir estatísticas
     grafo.estatisticas()
@@ -61,8 +83,32 @@ def main():
     else:
         print(f"   Não há conexão direta entre esses bairros")
 
-    # Exemplo 3: Listar alguns bairros
-    print(f"\n3. Primeiros 10 bairros no grafo:")
+    # Exemplo 3: Caminho mínimo entre dois bairros
+    origem = "Água Fria"
+    destino = "Boa Viagem"
+    print(f"\n3. Caminho mínimo entre '{origem}' e '{destino}':")
+    caminho = grafo.caminho_minimo(origem, destino)
+    if caminho:
+        print(f"   Distância total: {caminho.distancia:.2f}m")
+        for i, via in enumerate(caminho.vias):
+            print(f"   {i+1}. {caminho.bairros[i]} -> {caminho.bairros[i+1]} via {via}")
+        caminho_a_estrela = grafo.caminho_minimo(origem, destino, algoritmo='a_estrela')
+        print(f"   Bairros expandidos: Dijkstra {caminho.vertices_expandidos}, "
+              f"A* {caminho_a_estrela.vertices_expandidos}")
+    else:
+        print(f"   Não há caminho entre esses bairros")
+
+    # Exemplo 4: Pontos únicos de falha
+    conectividade = grafo.conectividade()
+    print(f"\n4. Conectividade:")
+    print(f"   Componentes conexas: {conectividade.num_componentes}")
+    print(f"   Vias que são pontes: {len(conectividade.pontes)}")
+    for via in conectividade.listar_pontes()[:5]:
+        print(f"   - {via.nome_via} ({via.origem} - {via.destino})")
+    print(f"   Bairros de articulação: {', '.join(conectividade.listar_articulacoes()[:10]) or 'nenhum'}")
+
+    # Exemplo 5: Listar alguns bairros
+    print(f"\n5. Primeiros 10 bairros no grafo:")
     bairros = grafo.listar_vertices()[:10]
     for i, bairro in enumerate(bairros):
         v = grafo.obter_vertice(bairro)
@@ -0,0 +1,190 @@
+"""
+Matriz de distâncias mínimas entre todos os pares de bairros
+
+A matriz é calculada uma única vez com Floyd-Warshall vetorizado em NumPy e
+salva em disco ao lado das planilhas de origem. Nas execuções seguintes ela é
+carregada com memory-map, e cada consulta de distância passa a ser O(1).
+
+Arquivos gerados (prefixo = caminho da planilha de vias sem extensão):
+- <prefixo>.distancias.npy: matriz N x N float32 com as distâncias em metros
+- <prefixo>.anteriores.npy: matriz N x N int32 com o bairro anterior no caminho
+- <prefixo>.vias.npy: matriz N x N int32 com a melhor via direta entre dois bairros
+- <prefixo>.matriz.json: nomes dos bairros, tabela de vias e metadados
+"""
+import json
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from caminhos import Caminho
+from grafo import Grafo
+
+VERSAO_FORMATO = 1
+
+SEM_ANTERIOR = -1
+
+
+class MatrizDistancias:
+    """
+    Distâncias mínimas e matriz de anteriores para todos os pares de bairros
+    """
+
+    def __init__(self, nomes: Sequence[str], distancias: np.ndarray, anteriores: np.ndarray,
+                 vias: np.ndarray, nomes_vias: Sequence[str], num_arestas: int = 0):
+        self.nomes: List[str] = list(nomes)
+        self.indices: Dict[str, int] = {nome: i for i, nome in enumerate(self.nomes)}
+        self.distancias = distancias
+        self.anteriores = anteriores
+        self.vias = vias
+        self.nomes_vias: List[str] = list(nomes_vias)
+        self.num_arestas = num_arestas
+
+    @classmethod
+    def construir(cls, grafo: Grafo) -> 'MatrizDistancias':
+        """
+        Calcula a matriz de distâncias com Floyd-Warshall vetorizado
+
+        A ordem das linhas/colunas segue grafo.vertices. Arestas paralelas são
+        reduzidas à via de menor peso antes do cálculo.
+        """
+        nomes = list(grafo.vertices.keys())
+        indices = {nome: i for i, nome in enumerate(nomes)}
+        n = len(nomes)
+
+        distancias = np.full((n, n), np.inf, dtype=np.float64)
+        np.fill_diagonal(distancias, 0.0)
+        anteriores = np.full((n, n), SEM_ANTERIOR, dtype=np.int32)
+        vias = np.full((n, n), SEM_ANTERIOR, dtype=np.int32)
+
+        nomes_vias: List[str] = []
+        indices_vias: Dict[str, int] = {}
+
+        for origem, vizinhos in grafo.adjacencias_colapsadas().items():
+            i = indices[origem]
+            for destino, peso, via in vizinhos:
+                j = indices[destino]
+                if via not in indices_vias:
+                    indices_vias[via] = len(nomes_vias)
+                    nomes_vias.append(via)
+                distancias[i, j] = peso
+                anteriores[i, j] = i
+                vias[i, j] = indices_vias[via]
+
+        # Floyd-Warshall: a cada passo k, cada linha é relaxada de uma vez
+        for k in range(n):
+            por_k = distancias[:, k, None] + distancias[None, k, :]
+            melhora = por_k < distancias
+            if not melhora.any():
+                continue
+            np.copyto(distancias, por_k, where=melhora)
+            np.copyto(anteriores, np.broadcast_to(anteriores[k], (n, n)), where=melhora)
+
+        return cls(nomes, distancias.astype(np.float32), anteriores, vias, nomes_vias, grafo.num_arestas)
+
+    def distancia(self, origem: str, destino: str) -> float:
+        """Retorna a distância mínima em metros (inf se não houver caminho)"""
+        i = self.indices.get(origem)
+        j = self.indices.get(destino)
+        if i is None or j is None:
+            return float('inf')
+        return float(self.distancias[i, j])
+
+    def caminho(self, origem: str, destino: str) -> Optional[Caminho]:
+        """Reconstrói o caminho mínimo usando a matriz de anteriores"""
+        i = self.indices.get(origem)
+        j = self.indices.get(destino)
+        if i is None or j is None or not np.isfinite(self.distancias[i, j]):
+            return None
+
+        bairros = [j]
+        vias = []
+        atual = j
+        while atual != i:
+            anterior = int(self.anteriores[i, atual])
+            vias.append(self.nomes_vias[self.vias[anterior, atual]])
+            bairros.append(anterior)
+            atual = anterior
+
+        bairros.reverse()
+        vias.reverse()
+        return Caminho(origem, destino, float(self.distancias[i, j]),
+                       [self.nomes[b] for b in bairros], vias)
+
+    def salvar(self, prefixo: str):
+        """Salva a matriz em disco (arquivos .npy + metadados .json)"""
+        np.save(f"{prefixo}.distancias.npy", np.asarray(self.distancias, dtype=np.float32))
+        np.save(f"{prefixo}.anteriores.npy", np.asarray(self.anteriores, dtype=np.int32))
+        np.save(f"{prefixo}.vias.npy", np.asarray(self.vias, dtype=np.int32))
+
+        metadados = {
+            'versao_formato': VERSAO_FORMATO,
+            'nomes': self.nomes,
+            'nomes_vias': self.nomes_vias,
+            'num_arestas': self.num_arestas,
+        }
+        # O .json é escrito por último e marca a matriz como completa
+        with open(f"{prefixo}.matriz.json", 'w', encoding='utf-8') as f:
+            json.dump(metadados, f, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, prefixo: str) -> 'MatrizDistancias':
+        """Carrega a matriz salva em disco usando memory-map (somente leitura)"""
+        with open(f"{prefixo}.matriz.json", 'r', encoding='utf-8') as f:
+            metadados = json.load(f)
+
+        if metadados.get('versao_formato') != VERSAO_FORMATO:
+            raise ValueError(f"Versão de formato da matriz não suportada: {metadados.get('versao_formato')}")
+
+        return cls(
+            metadados['nomes'],
+            np.load(f"{prefixo}.distancias.npy", mmap_mode='r'),
+            np.load(f"{prefixo}.anteriores.npy", mmap_mode='r'),
+            np.load(f"{prefixo}.vias.npy", mmap_mode='r'),
+            metadados['nomes_vias'],
+            metadados['num_arestas']
+        )
+
+
+def prefixo_matriz(caminho_vias: str) -> str:
+    """Retorna o prefixo dos arquivos da matriz, ao lado da planilha de vias"""
+    return os.path.splitext(caminho_vias)[0]
+
+
+def obter_matriz_distancias(grafo: Grafo, caminho_vias: str, recalcular: bool = False) -> MatrizDistancias:
+    """
+    Carrega a matriz salva ao lado da planilha de vias ou, se ela não existir
+    ou estiver desatualizada, calcula e salva uma nova
+
+    Args:
+        grafo: Grafo construído a partir da planilha
+        caminho_vias: Caminho da planilha de vias usada para construir o grafo
+        recalcular: Força o recálculo mesmo que exista uma matriz salva
+
+    Returns:
+        MatrizDistancias pronta para consultas
+    """
+    prefixo = prefixo_matriz(caminho_vias)
+    arquivo_metadados = f"{prefixo}.matriz.json"
+
+    if not recalcular and os.path.exists(arquivo_metadados):
+        atualizada = (
+            not os.path.exists(caminho_vias)
+            or os.path.getmtime(arquivo_metadados) >= os.path.getmtime(caminho_vias)
+        )
+        if atualizada:
+            try:
+                matriz = MatrizDistancias.carregar(prefixo)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Matriz salva inválida ({e}), recalculando...")
+            else:
+                if matriz.nomes == list(grafo.vertices.keys()) and matriz.num_arestas == grafo.num_arestas:
+                    print(f"✓ Matriz de distâncias carregada de: {prefixo}.*.npy")
+                    return matriz
+
+    print(f"Calculando matriz de distâncias ({grafo.num_vertices()} bairros)...")
+    matriz = MatrizDistancias.construir(grafo)
+    matriz.salvar(prefixo)
+    print(f"✓ Matriz de distâncias salva em: {prefixo}.*.npy")
+
+    return matriz
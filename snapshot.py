@@ -0,0 +1,243 @@
+"""
+Formato binário de snapshot do grafo, para inicialização rápida
+
+Ler as planilhas .xlsx (openpyxl) é de longe a etapa mais lenta de cada
+execução. O snapshot guarda o grafo já construído em um único arquivo
+binário, que é lido com np.memmap: os arrays não são copiados para a
+memória e podem ser compartilhados entre processos.
+
+Layout do arquivo (little-endian, seções alinhadas em 8 bytes):
+- Cabeçalho (CABECALHO): assinatura, versão do formato, contagens e a
+  impressão digital (tamanho e mtime) das planilhas de origem
+- Tabela de strings: offsets int64[num_strings + 1] + bytes UTF-8
+- Vértices: nome int32[num_vertices], subregiao int32[num_vertices],
+  tipo_subregiao int8[num_vertices]
+- Arestas (na ordem de inserção): origem int32[num_arestas],
+  destino int32[num_arestas], via int32[num_arestas], peso float64[num_arestas]
+"""
+import os
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+ASSINATURA = b'GRAFOBR\0'
+VERSAO_FORMATO = 1
+
+# assinatura, versão, reservado, num_vertices, num_arestas, num_strings,
+# bytes_strings e 4 campos de impressão digital das fontes
+CABECALHO = struct.Struct('<8sII' + 'q' * 8)
+
+# Tipos possíveis da subregião (o nome da coluna da planilha pode ser numérico)
+TIPO_NENHUM, TIPO_STR, TIPO_INT, TIPO_FLOAT = 0, 1, 2, 3
+
+
+@dataclass
+class DadosSnapshot:
+    """Conteúdo de um snapshot: tabela de strings e arrays (memory-mapped)"""
+    strings: List[str]
+    vertices_nome: np.ndarray
+    vertices_subregiao: np.ndarray
+    vertices_tipo_subregiao: np.ndarray
+    origens: np.ndarray
+    destinos: np.ndarray
+    vias: np.ndarray
+    pesos: np.ndarray
+    impressao_fontes: Tuple[int, int, int, int]
+
+    def nomes_vertices(self) -> List[str]:
+        return [self.strings[i] for i in self.vertices_nome]
+
+    def subregioes(self) -> list:
+        """Retorna a subregião de cada vértice, com o tipo original"""
+        conversores = {TIPO_STR: str, TIPO_INT: int, TIPO_FLOAT: float}
+        subregioes = []
+        for indice, tipo in zip(self.vertices_subregiao, self.vertices_tipo_subregiao):
+            if tipo == TIPO_NENHUM:
+                subregioes.append(None)
+            else:
+                subregioes.append(conversores[tipo](self.strings[indice]))
+        return subregioes
+
+
+def impressao_fontes(fontes: Optional[Sequence[str]]) -> Tuple[int, int, int, int]:
+    """
+    Calcula a impressão digital (tamanho, mtime) de até duas planilhas de origem.
+    Arquivos ausentes contam como zero.
+    """
+    campos = []
+    for caminho in list(fontes or [])[:2]:
+        if os.path.exists(caminho):
+            info = os.stat(caminho)
+            campos.extend([info.st_size, info.st_mtime_ns])
+        else:
+            campos.extend([0, 0])
+    campos.extend([0] * (4 - len(campos)))
+    return tuple(campos)
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + 7) // 8 * 8
+
+
+def _codificar_subregiao(subregiao) -> Tuple[int, str]:
+    if subregiao is None:
+        return TIPO_NENHUM, ''
+    if isinstance(subregiao, str):
+        return TIPO_STR, subregiao
+    if isinstance(subregiao, (int, np.integer)):
+        return TIPO_INT, str(int(subregiao))
+    if isinstance(subregiao, (float, np.floating)):
+        return TIPO_FLOAT, repr(float(subregiao))
+    return TIPO_STR, str(subregiao)
+
+
+def salvar_snapshot(grafo, caminho: str, fontes: Optional[Sequence[str]] = None):
+    """
+    Salva o grafo em formato binário
+
+    Args:
+        grafo: Grafo a ser salvo
+        caminho: Caminho do arquivo de snapshot
+        fontes: Planilhas de origem, usadas para detectar snapshots desatualizados
+    """
+    strings: List[str] = []
+    indices = {}
+
+    def indice_string(texto: str) -> int:
+        indice = indices.get(texto)
+        if indice is None:
+            indice = indices[texto] = len(strings)
+            strings.append(texto)
+        return indice
+
+    n = len(grafo.vertices)
+    indices_vertices = {}
+    vertices_nome = np.empty(n, dtype=np.int32)
+    vertices_subregiao = np.full(n, -1, dtype=np.int32)
+    vertices_tipo = np.zeros(n, dtype=np.int8)
+
+    for i, (nome, vertice) in enumerate(grafo.vertices.items()):
+        indices_vertices[nome] = i
+        vertices_nome[i] = indice_string(nome)
+        tipo, texto = _codificar_subregiao(vertice.subregiao)
+        vertices_tipo[i] = tipo
+        if tipo != TIPO_NENHUM:
+            vertices_subregiao[i] = indice_string(texto)
+
+    m = len(grafo.registros)
+    origens = np.empty(m, dtype=np.int32)
+    destinos = np.empty(m, dtype=np.int32)
+    vias = np.empty(m, dtype=np.int32)
+    pesos = np.empty(m, dtype=np.float64)
+
+    for k, registro in enumerate(grafo.registros):
+        origens[k] = indices_vertices[registro.origem]
+        destinos[k] = indices_vertices[registro.destino]
+        vias[k] = indice_string(registro.nome_via)
+        pesos[k] = registro.peso
+
+    codificadas = [texto.encode('utf-8') for texto in strings]
+    offsets_strings = np.zeros(len(strings) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in codificadas], out=offsets_strings[1:])
+    bytes_strings = b''.join(codificadas)
+
+    cabecalho = CABECALHO.pack(
+        ASSINATURA, VERSAO_FORMATO, 0,
+        n, m, len(strings), len(bytes_strings),
+        *impressao_fontes(fontes)
+    )
+
+    secoes = [
+        offsets_strings.tobytes(), bytes_strings,
+        vertices_nome.tobytes(), vertices_subregiao.tobytes(), vertices_tipo.tobytes(),
+        origens.tobytes(), destinos.tobytes(), vias.tobytes(), pesos.tobytes(),
+    ]
+
+    # Escreve em um arquivo temporário e substitui no final, para que um
+    # leitor nunca veja um snapshot pela metade
+    temporario = f"{caminho}.tmp"
+    with open(temporario, 'wb') as f:
+        f.write(cabecalho)
+        for secao in secoes:
+            f.write(b'\0' * (_alinhar(f.tell()) - f.tell()))
+            f.write(secao)
+    os.replace(temporario, caminho)
+
+
+def _ler_cabecalho(caminho: str):
+    with open(caminho, 'rb') as f:
+        dados = f.read(CABECALHO.size)
+
+    if len(dados) < CABECALHO.size:
+        raise ValueError(f"Snapshot truncado: {caminho}")
+
+    campos = CABECALHO.unpack(dados)
+    assinatura, versao = campos[0], campos[1]
+    if assinatura != ASSINATURA:
+        raise ValueError(f"Arquivo não é um snapshot de grafo: {caminho}")
+    if versao != VERSAO_FORMATO:
+        raise ValueError(f"Versão de snapshot não suportada: {versao}")
+
+    return campos
+
+
+def ler_snapshot(caminho: str) -> DadosSnapshot:
+    """
+    Lê um snapshot usando np.memmap (os arrays são somente leitura)
+
+    Raises:
+        ValueError: Se o arquivo não for um snapshot válido desta versão
+    """
+    campos = _ler_cabecalho(caminho)
+    n, m, num_strings, tamanho_strings = campos[3:7]
+    impressao = tuple(campos[7:11])
+
+    posicao = CABECALHO.size
+
+    def mapear(dtype, quantidade):
+        nonlocal posicao
+        posicao = _alinhar(posicao)
+        dtype = np.dtype(dtype)
+        if quantidade == 0:
+            array = np.empty(0, dtype=dtype)
+        else:
+            array = np.memmap(caminho, dtype=dtype, mode='r', offset=posicao, shape=(quantidade,))
+        posicao += dtype.itemsize * quantidade
+        return array
+
+    offsets_strings = mapear(np.int64, num_strings + 1)
+    bytes_strings = mapear(np.uint8, tamanho_strings).tobytes()
+    strings = [
+        bytes_strings[offsets_strings[i]:offsets_strings[i + 1]].decode('utf-8')
+        for i in range(num_strings)
+    ]
+
+    return DadosSnapshot(
+        strings=strings,
+        vertices_nome=mapear(np.int32, n),
+        vertices_subregiao=mapear(np.int32, n),
+        vertices_tipo_subregiao=mapear(np.int8, n),
+        origens=mapear(np.int32, m),
+        destinos=mapear(np.int32, m),
+        vias=mapear(np.int32, m),
+        pesos=mapear(np.float64, m),
+        impressao_fontes=impressao,
+    )
+
+
+def snapshot_atualizado(caminho: str, fontes: Sequence[str]) -> bool:
+    """Verifica se o snapshot existe e foi gerado a partir das versões atuais das planilhas"""
+    if not os.path.exists(caminho):
+        return False
+    try:
+        campos = _ler_cabecalho(caminho)
+    except (OSError, ValueError):
+        return False
+    return tuple(campos[7:11]) == impressao_fontes(fontes)
+
+
+def caminho_snapshot(caminho_vias: str) -> str:
+    """Retorna o caminho padrão do snapshot, ao lado da planilha de vias"""
+    return os.path.splitext(caminho_vias)[0] + '.grafo.bin'
@@ -82,7 +82,8 @@ def visualizar_grafo_simples(grafo, titulo="Grafo de Bairros do Recife"):
     ax.axis('off')
 
     # Adicionar legenda
-    info_text = f"Vértices: {grafo.num_vertices()}\nArestas: {grafo.num_arestas}\nGrau médio: {sum(grafo.grau(v) for v in vertices) / len(vertices):.2f}"
+    metricas = grafo.metricas()
+    info_text = f"Vértices: {metricas.num_vertices}\nArestas: {metricas.num_arestas}\nGrau médio: {metricas.grau_medio:.2f}"
     ax.text(0.02, 0.98, info_text, transform=ax.transAxes,
             fontsize=12, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor='white', alpha=0.8))
@@ -109,69 +110,63 @@ def visualizar_subgrafo(grafo, bairro_central, profundidade=1):
     """
     print(f"\nGerando visualização do subgrafo centrado em '{bairro_central}'...")
 
-    if bairro_central not in grafo.vertices:
+    vizinhanca = grafo.vizinhanca(bairro_central, profundidade)
+    if vizinhanca is None:
         print(f"Erro: Bairro '{bairro_central}' não encontrado no grafo")
         return
 
-    # Encontrar vértices do subgrafo usando BFS simples
-    vertices_subgrafo = {bairro_central}
-    camada_atual = {bairro_central}
-
-    for _ in range(profundidade):
-        proxima_camada = set()
-        for vertice in camada_atual:
-            for aresta in grafo.obter_vizinhos(vertice):
-                proxima_camada.add(aresta.destino)
-        vertices_subgrafo.update(proxima_camada)
-        camada_atual = proxima_camada
+    bairro_central = vizinhanca.centro
+    vertices_subgrafo = vizinhanca.saltos
 
     # Criar figura
     fig, ax = plt.subplots(figsize=(15, 15))
 
-    # Posicionar vértices em círculo
-    vertices = list(vertices_subgrafo)
-    n = len(vertices)
-
+    # Posicionar vértices em círculos concêntricos, um por número de saltos
     posicoes = {}
     raio = 5
 
     # Colocar bairro central no meio
     posicoes[bairro_central] = (0, 0)
 
-    # Outros vértices em círculo
-    outros = [v for v in vertices if v != bairro_central]
-    for i, vertice in enumerate(outros):
-        angulo = 2 * pi * i / len(outros)
-        x = raio * cos(angulo)
-        y = raio * sin(angulo)
-        posicoes[vertice] = (x, y)
+    for distancia in range(1, profundidade + 1):
+        camada = vizinhanca.camada(distancia)
+        for i, vertice in enumerate(camada):
+            angulo = 2 * pi * i / len(camada)
+            x = raio * distancia * cos(angulo)
+            y = raio * distancia * sin(angulo)
+            posicoes[vertice] = (x, y)
+
+    # Grau dentro do subgrafo (cada via conta nas duas pontas)
+    graus_locais = {vertice: 0 for vertice in vertices_subgrafo}
+    for aresta in vizinhanca.arestas:
+        graus_locais[aresta.origem] += 1
+        graus_locais[aresta.destino] += 1
 
     # Desenhar arestas do subgrafo
     arestas_desenhadas = set()
 
-    for origem in vertices_subgrafo:
-        for aresta in grafo.obter_vizinhos(origem):
-            if aresta.destino in vertices_subgrafo:
-                par = tuple(sorted([origem, aresta.destino]))
-
-                if par not in arestas_desenhadas:
-                    x1, y1 = posicoes[origem]
-                    x2, y2 = posicoes[aresta.destino]
-
-                    # Cor da aresta baseada no peso (distância)
-                    peso = aresta.peso
-                    if peso < 500:
-                        cor = 'green'
-                        alpha = 0.6
-                    elif peso < 1500:
-                        cor = 'orange'
-                        alpha = 0.5
-                    else:
-                        cor = 'red'
-                        alpha = 0.4
-
-                    ax.plot([x1, x2], [y1, y2], color=cor, alpha=alpha, linewidth=2)
-                    arestas_desenhadas.add(par)
+    for aresta in vizinhanca.arestas:
+        origem = aresta.origem
+        par = tuple(sorted([origem, aresta.destino]))
+
+        if par not in arestas_desenhadas:
+            x1, y1 = posicoes[origem]
+            x2, y2 = posicoes[aresta.destino]
+
+            # Cor da aresta baseada no peso (distância)
+            peso = aresta.peso
+            if peso < 500:
+                cor = 'green'
+                alpha = 0.6
+            elif peso < 1500:
+                cor = 'orange'
+                alpha = 0.5
+            else:
+                cor = 'red'
+                alpha = 0.4
+
+            ax.plot([x1, x2], [y1, y2], color=cor, alpha=alpha, linewidth=2)
+            arestas_desenhadas.add(par)
 
     # Desenhar vértices
     for vertice in vertices_subgrafo:
@@ -181,8 +176,7 @@ def visualizar_subgrafo(grafo, bairro_central, profundidade=1):
             # Destaque para o bairro central
             ax.scatter(x, y, s=800, c='red', alpha=0.9, edgecolors='black', linewidths=3)
         else:
-            grau_local = sum(1 for a in grafo.obter_vizinhos(vertice) if a.destino in vertices_subgrafo)
-            tamanho = 300 + grau_local * 50
+            tamanho = 300 + graus_locais[vertice] * 50
             ax.scatter(x, y, s=tamanho, c='lightblue', alpha=0.7, edgecolors='black', linewidths=2)
 
         # Label para todos os vértices (subgrafo pequeno)
@@ -2,82 +2,131 @@
 Visualização interativa do grafo usando HTML
 (Não requer bibliotecas externas além de pandas)
 """
-import json
 import html
+import json
 from carregar_dados import construir_grafo_completo
+from agregacao_arestas import TITULO_PAR_JS, agregar_arestas, total_vias, vias_unicas
+from centralidade import escalar_tamanhos
+from escrita_html import escrever_pagina
+from layout_forcas import obter_layout
 
 
-def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
+def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html', centralidade=None,
+                          fisica=False, diretorio_cache_layout='.cache_layout', agregar=False,
+                          arquivo_unico=False, formato_dados='js'):
     """
     Gera uma visualização HTML interativa do grafo usando vis.js
 
     Args:
         grafo: Instância do grafo
         arquivo_saida: Nome do arquivo HTML de saída
+        centralidade: Métrica opcional por bairro (ex.: centralidade.centralidade_intermediacao)
+            que passa a definir o tamanho dos nós no lugar do grau
+        fisica: Se True, o navegador ainda estabiliza o layout com a física do
+            vis.js ao abrir a página; por padrão as posições já vêm calculadas
+            (layout_forcas) e a física fica desligada
+        diretorio_cache_layout: Onde guardar o layout calculado (None desliga o cache)
+        agregar: Se True, desenha uma aresta por par de bairros (espessura pela
+            quantidade de vias) e monta a lista de vias do tooltip só ao passar
+            o mouse (ver agregacao_arestas); o HTML fica bem menor
+        arquivo_unico: Se True, grava os dados dentro do HTML; por padrão vão
+            para um arquivo separado ao lado dele (ver escrita_html)
+        formato_dados: 'js' (abre direto do disco) ou 'json.gz' (menor, requer HTTP)
     """
     print("Gerando visualização interativa HTML...")
 
-    # Preparar dados dos nós
-    nos = []
-    for nome, vertice in grafo.vertices.items():
-        grau = grafo.grau(nome)
-
-        # Tamanho baseado no grau
-        tamanho = 10 + grau * 2
-
-        # Cor baseada na subregião
-        if vertice.subregiao:
-            cores_subregioes = {
-                '1.1': '#FF6B6B', '1.2': '#4ECDC4', '1.3': '#45B7D1',
-                '2.1': '#FFA07A', '2.2': '#98D8C8', '2.3': '#6C5CE7',
-                '3.1': '#FDCB6E', '3.2': '#E17055', '3.3': '#74B9FF',
-                '4.1': '#A29BFE', '4.2': '#FD79A8', '4.3': '#FDCB6E',
-                '5.1': '#00B894', '5.2': '#00CEC9', '5.3': '#81ECEC',
-                '6.1': '#FAB1A0', '6.2': '#FF7675', '6.3': '#FD79A8'
+    metricas = grafo.metricas()
+
+    # Posições calculadas uma vez (e reaproveitadas do cache) em Python
+    posicoes = obter_layout(grafo, diretorio_cache_layout)
+
+    tamanhos = escalar_tamanhos(centralidade, 10, 60) if centralidade else {}
+    legenda_tamanho = 'Centralidade do bairro' if centralidade else 'Número de vias do bairro'
+
+    # Cor de cada subregião (aplicada no navegador, não repetida em cada nó)
+    cores_subregioes = {
+        '1.1': '#FF6B6B', '1.2': '#4ECDC4', '1.3': '#45B7D1',
+        '2.1': '#FFA07A', '2.2': '#98D8C8', '2.3': '#6C5CE7',
+        '3.1': '#FDCB6E', '3.2': '#E17055', '3.3': '#74B9FF',
+        '4.1': '#A29BFE', '4.2': '#FD79A8', '4.3': '#FDCB6E',
+        '5.1': '#00B894', '5.2': '#00CEC9', '5.3': '#81ECEC',
+        '6.1': '#FAB1A0', '6.2': '#FF7675', '6.3': '#FD79A8'
+    }
+
+    # Preparar dados dos nós (gerados sob demanda durante a escrita). Só os
+    # campos; rótulo, cor e tooltip são montados na página (montarTituloNo)
+    def gerar_nos():
+        for nome, vertice in grafo.vertices.items():
+            grau = grafo.grau(nome)
+
+            dados_no = {
+                'id': nome,
+                'subregiao': vertice.subregiao,
+                'grau': grau,
+                'x': round(posicoes[nome][0], 1),
+                'y': round(posicoes[nome][1], 1)
             }
-            cor = cores_subregioes.get(vertice.subregiao, '#95A5A6')
-        else:
-            cor = '#95A5A6'
-
-        nos.append({
-            'id': nome,
-            'label': nome,
-            'title': f"{nome}<br>Subregião: {vertice.subregiao}<br>Conexões: {grau}",
-            'value': tamanho,
-            'color': cor
-        })
-
-    # Preparar dados das arestas - DESENHAR TODAS AS ARESTAS INDIVIDUALMENTE
-    arestas = []
-    arestas_adicionadas = set()
-    total_arestas_reais = 0
+            if nome in tamanhos:
+                # Sem centralidade, o tamanho (10 + 2 * grau) sai do grau na página
+                dados_no['value'] = round(tamanhos[nome], 1)
+                dados_no['centralidade'] = round(centralidade[nome], 4)
+            yield dados_no
 
-    for origem in grafo.adjacencias:
-        for aresta in grafo.adjacencias[origem]:
-            # Criar um ID único para cada aresta (incluindo o nome da via)
-            # para permitir arestas paralelas
-            aresta_id = (origem, aresta.destino, aresta.nome_via, aresta.peso)
-
-            # Evitar duplicatas (grafo não direcionado - só desenhar uma vez)
-            aresta_reversa_id = (aresta.destino, origem, aresta.nome_via, aresta.peso)
-
-            if aresta_id not in arestas_adicionadas and aresta_reversa_id not in arestas_adicionadas:
-                # Todas as arestas com a mesma largura fina
-                largura = 1
+    secoes = {'nos': gerar_nos()}
 
+    # Preparar dados das arestas - DESENHAR TODAS AS ARESTAS INDIVIDUALMENTE
+    if agregar:
+        # Uma aresta por par; o título de cada uma é montado no primeiro hover
+        dados_pares = agregar_arestas(grafo, {nome: i for i, nome in enumerate(grafo.vertices)})
+        total_arestas_reais = total_vias(dados_pares)
+        secoes['pares'] = dados_pares
+        dados_arestas_js = """var dadosArestas = DADOS_GRAFO.pares;
+            var edgesData = dadosArestas.pares.a.map(function(a, k) {
+                var n = dadosArestas.pares.n[k];
+                return {
+                    id: k,
+                    from: nodesData[a].id,
+                    to: nodesData[dadosArestas.pares.b[k]].id,
+                    width: 1 + Math.log2(n),
+                    length: Math.min(300, resumoPar(dadosArestas, k).min / 5)
+                };
+            });"""
+        legenda_arestas = """<div class="legend-item">• <b>Cada linha</b> = Um par de bairros vizinhos</div>
+        <div class="legend-item">• <b>Espessura da linha</b> = Número de vias entre o par</div>"""
+        eventos_agregado_js = TITULO_PAR_JS + """
+        network.on("hoverEdge", function (params) {
+            var aresta = edges.get(params.edge);
+            if (aresta && !aresta.title) {
+                edges.update({ id: aresta.id, title: montarTituloPar(dadosArestas, aresta.id, aresta.from, aresta.to) });
+            }
+        });
+"""
+    else:
+        # Vias paralelas (nomes diferentes) continuam separadas; vias idênticas
+        # são desenhadas uma vez (grafo não direcionado)
+        vias = vias_unicas(grafo)
+        total_arestas_reais = len(vias)
+
+        def gerar_arestas():
+            for registro in vias:
                 # Título mostrando detalhes da via
-                titulo = f"<b>{aresta.nome_via}</b><br>Distância: {aresta.peso:.2f}m<br>{origem} ↔ {aresta.destino}"
+                titulo = (f"<b>{registro.nome_via}</b><br>Distância: {registro.peso:.2f}m"
+                          f"<br>{registro.origem} ↔ {registro.destino}")
 
-                arestas.append({
-                    'from': origem,
-                    'to': aresta.destino,
+                yield {
+                    'from': registro.origem,
+                    'to': registro.destino,
                     'title': titulo,
-                    'width': largura,
-                    'length': min(300, aresta.peso / 5)
-                })
+                    # Todas as arestas com a mesma largura fina
+                    'width': 1,
+                    'length': min(300, registro.peso / 5)
+                }
 
-                arestas_adicionadas.add(aresta_id)
-                total_arestas_reais += 1
+        secoes['arestas'] = gerar_arestas()
+        dados_arestas_js = "var edgesData = DADOS_GRAFO.arestas;"
+        legenda_arestas = """<div class="legend-item">• <b>Cada linha</b> = Uma via individual</div>
+        <div class="legend-item">• <b>Múltiplas linhas</b> = Arestas paralelas (múltiplas vias)</div>"""
+        eventos_agregado_js = ''
 
     # Template HTML
     html_template = f"""
@@ -207,9 +256,9 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
     </div>
 
     <div id="info">
-        <span class="stats">📍 Vértices (Bairros): {grafo.num_vertices()}</span>
+        <span class="stats">📍 Vértices (Bairros): {metricas.num_vertices}</span>
         <span class="stats">🛣️ Arestas (Vias): {total_arestas_reais}</span>
-        <span class="stats">📊 Grau Médio: {sum(grafo.grau(v) for v in grafo.vertices) / len(grafo.vertices):.2f}</span>
+        <span class="stats">📊 Grau Médio: {metricas.grau_medio:.2f}</span>
     </div>
 
     <div id="controls">
@@ -227,10 +276,9 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
 
     <div id="legend">
         <div class="legend-title">📌 Legenda</div>
-        <div class="legend-item">• <b>Tamanho do nó</b> = Número de vias do bairro</div>
+        <div class="legend-item">• <b>Tamanho do nó</b> = {legenda_tamanho}</div>
         <div class="legend-item">• <b>Cor do nó</b> = Subregião do bairro</div>
-        <div class="legend-item">• <b>Cada linha</b> = Uma via individual</div>
-        <div class="legend-item">• <b>Múltiplas linhas</b> = Arestas paralelas (múltiplas vias)</div>
+        {legenda_arestas}
         <div class="legend-item">• <b>Passe o mouse</b> para ver nome e distância da via</div>
         <div class="legend-item">• <b>Clique e arraste</b> para mover</div>
         <div class="legend-item">• <b>Scroll</b> para zoom</div>
@@ -238,13 +286,20 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
 
     <div id="mynetwork"></div>
 
-    <script type="text/javascript">
+    <script id="grafo-app">
         console.log('Iniciando carregamento do grafo...');
 
-        // Dados
+        // Dados (window.DADOS_GRAFO, gravado por escrita_html)
         try {{
-            var nodesData = {json.dumps(nos)};
-            var edgesData = {json.dumps(arestas)};
+            var coresSubregioes = {json.dumps(cores_subregioes)};
+            var nodesData = DADOS_GRAFO.nos.map(function(n) {{
+                n.label = n.id;
+                // Tamanho baseado na centralidade, se informada, ou no grau
+                if (n.value === undefined) n.value = 10 + n.grau * 2;
+                n.color = coresSubregioes[n.subregiao] || '#95A5A6';
+                return n;
+            }});
+            {dados_arestas_js}
 
             var nodes = new vis.DataSet(nodesData);
             var edges = new vis.DataSet(edgesData);
@@ -302,7 +357,7 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
                 hoverWidth: 3
             }},
             physics: {{
-                enabled: true,
+                enabled: {'true' if fisica else 'false'},
                 barnesHut: {{
                     gravitationalConstant: -2000,
                     centralGravity: 0.3,
@@ -312,7 +367,7 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
                     avoidOverlap: 0.1
                 }},
                 stabilization: {{
-                    enabled: true,
+                    enabled: {'true' if fisica else 'false'},
                     iterations: 1000,
                     updateInterval: 25,
                     onlyDynamicEdges: false,
@@ -367,8 +422,19 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
             }}
         }});
 
+        {eventos_agregado_js}
+        // Tooltip de cada bairro, montado no primeiro hover
+        function montarTituloNo(no) {{
+            return no.id + '<br>Subregião: ' + no.subregiao + '<br>Conexões: ' + no.grau +
+                (no.centralidade !== undefined ? '<br>Centralidade: ' + no.centralidade.toFixed(4) : '');
+        }}
+
         network.on("hoverNode", function (params) {{
             container.style.cursor = 'pointer';
+            var no = nodes.get(params.node);
+            if (no && !no.title) {{
+                nodes.update({{ id: no.id, title: montarTituloNo(no) }});
+            }}
         }});
 
         network.on("blurNode", function (params) {{
@@ -405,7 +471,7 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
                 searchResults.innerHTML = results.map(function(node) {{
                     return '<div class="search-result-item" onclick="focusNode(\'' + node.id + '\')">' +
                            '<span class="highlight-node">' + node.label + '</span><br>' +
-                           '<small>Subregião: ' + node.title.split('Subregião: ')[1].split('<br>')[0] + '</small>' +
+                           '<small>Subregião: ' + node.subregiao + '</small>' +
                            '</div>';
                 }}).join('');
             }} else {{
@@ -478,10 +544,10 @@ def gerar_html_interativo(grafo, arquivo_saida='grafo_interativo.html'):
 """
 
     # Salvar arquivo
-    with open(arquivo_saida, 'w', encoding='utf-8') as f:
-        f.write(html_template)
+    # Os dados são gravados em fluxo, fora da f-string
+    arquivos = escrever_pagina(arquivo_saida, html_template, secoes, arquivo_unico, formato_dados)
 
-    print(f"\n✓ Visualização interativa salva em: {arquivo_saida}")
+    print(f"\n✓ Visualização interativa salva em: {', '.join(arquivos)}")
     print(f"\nPara visualizar, abra o arquivo '{arquivo_saida}' em qualquer navegador!")
     print("Ou execute: xdg-open " + arquivo_saida)
 
@@ -4,14 +4,32 @@ Distribui os bairros baseado em subregiões de forma mais natural
 """
 import random
 from carregar_dados import construir_grafo_completo
+from agregacao_arestas import agregar_arestas, total_vias, vias_unicas
+from centralidade import escalar_tamanhos
+from escrita_html import escrever_pagina
+from indice_espacial import CONSULTA_QUADTREE_JS, indice_pagina
 
 
-def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
+def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html', centralidade=None, agregar=False,
+                               arquivo_unico=False, formato_dados='js'):
     """
     Gera visualização com layout baseado em subregiões (mais natural)
+
+    Args:
+        grafo: Instância do grafo
+        arquivo_saida: Nome do arquivo HTML de saída
+        centralidade: Métrica opcional por bairro (ex.: centralidade.centralidade_intermediacao)
+            que passa a definir o tamanho dos nós no lugar do grau
+        agregar: Se True, desenha uma linha por par de bairros (espessura pela
+            quantidade de vias) em vez de uma por via; o HTML fica bem menor
+        arquivo_unico: Se True, grava os dados dentro do HTML; por padrão vão
+            para um arquivo separado ao lado dele (ver escrita_html)
+        formato_dados: 'js' (abre direto do disco) ou 'json.gz' (menor, requer HTTP)
     """
     print("Gerando visualização com layout orgânico...")
 
+    metricas = grafo.metricas()
+
     # Agrupar bairros por subregião
     bairros_por_subregiao = {}
     for nome, vertice in grafo.vertices.items():
@@ -53,55 +71,89 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
 
             posicoes[bairro] = (x, y)
 
-    # Preparar arestas
-    arestas_lista = []
-    arestas_processadas = set()
-
-    for origem in grafo.adjacencias:
-        for aresta in grafo.adjacencias[origem]:
-            aresta_id = (origem, aresta.destino, aresta.nome_via, aresta.peso)
-            aresta_reversa_id = (aresta.destino, origem, aresta.nome_via, aresta.peso)
-
-            if aresta_id not in arestas_processadas and aresta_reversa_id not in arestas_processadas:
-                if origem in posicoes and aresta.destino in posicoes:
-                    x1, y1 = posicoes[origem]
-                    x2, y2 = posicoes[aresta.destino]
-
-                    arestas_lista.append({
-                        'x1': x1, 'y1': y1,
-                        'x2': x2, 'y2': y2,
-                        'origem': origem.replace("'", "\\'"),
-                        'destino': aresta.destino.replace("'", "\\'"),
-                        'via': aresta.nome_via.replace("'", "\\'"),
-                        'peso': aresta.peso
-                    })
-                    arestas_processadas.add(aresta_id)
+    # Preparar arestas (geradas sob demanda durante a escrita)
+    vias = [] if agregar else [
+        registro for registro in vias_unicas(grafo)
+        if registro.origem in posicoes and registro.destino in posicoes
+    ]
+
+    def gerar_arestas():
+        for registro in vias:
+            x1, y1 = posicoes[registro.origem]
+            x2, y2 = posicoes[registro.destino]
+
+            yield {
+                'x1': x1, 'y1': y1,
+                'x2': x2, 'y2': y2,
+                'origem': registro.origem,
+                'destino': registro.destino,
+                'via': registro.nome_via,
+                'peso': registro.peso
+            }
 
     # Preparar vértices
-    vertices_lista = []
     cores_subregioes = {}
 
     for i, subregiao in enumerate(sorted(subregioes)):
         hue = (i * 360 / len(subregioes)) % 360
         cores_subregioes[subregiao] = f'hsl({hue}, 70%, 60%)'
 
-    for nome in grafo.vertices.keys():
-        if nome in posicoes:
+    tamanhos = escalar_tamanhos(centralidade, 6, 25) if centralidade else {}
+    nomes_desenhados = [nome for nome in grafo.vertices.keys() if nome in posicoes]
+
+    def tamanho_vertice(nome):
+        return tamanhos.get(nome, min(25, 6 + grafo.grau(nome) * 0.4))
+
+    def gerar_vertices():
+        for nome in nomes_desenhados:
             x, y = posicoes[nome]
             vertice = grafo.obter_vertice(nome)
             grau = grafo.grau(nome)
 
             cor = cores_subregioes.get(vertice.subregiao, '#999')
-            tamanho = min(25, 6 + grau * 0.4)
+            tamanho = tamanho_vertice(nome)
 
-            vertices_lista.append({
+            dados_vertice = {
                 'x': x, 'y': y,
-                'nome': nome.replace("'", "\\'"),
+                'nome': nome,
                 'subregiao': vertice.subregiao if vertice.subregiao else 'N/A',
                 'grau': grau,
                 'cor': cor,
                 'tamanho': tamanho
-            })
+            }
+            if nome in tamanhos:
+                dados_vertice['centralidade'] = centralidade[nome]
+            yield dados_vertice
+
+    secoes = {'vertices': gerar_vertices()}
+    indices = {nome: i for i, nome in enumerate(nomes_desenhados)}
+    if agregar:
+        # Uma linha por par de bairros, com as coordenadas tiradas dos vértices
+        dados_pares = agregar_arestas(grafo, indices, detalhes=False)
+        num_vias = total_vias(dados_pares)
+        secoes['pares'] = dados_pares
+        origens, destinos = dados_pares['pares']['a'], dados_pares['pares']['b']
+        arestas_js = """const dadosArestas = DADOS_GRAFO.pares;
+        const arestas = dadosArestas.pares.a.map((a, k) => {
+            const b = dadosArestas.pares.b[k];
+            return {
+                x1: vertices[a].x, y1: vertices[a].y,
+                x2: vertices[b].x, y2: vertices[b].y,
+                largura: 0.8 * (1 + Math.log2(dadosArestas.pares.n[k]))
+            };
+        });"""
+    else:
+        num_vias = len(vias)
+        secoes['arestas'] = gerar_arestas()
+        arestas_js = "const arestas = DADOS_GRAFO.arestas;"
+        origens = (indices[registro.origem] for registro in vias)
+        destinos = (indices[registro.destino] for registro in vias)
+
+    # Índice espacial: hover e desenho só do que está na área visível
+    secoes['indice'] = indice_pagina(
+        [posicoes[nome][0] for nome in nomes_desenhados], [posicoes[nome][1] for nome in nomes_desenhados],
+        [tamanho_vertice(nome) for nome in nomes_desenhados], origens, destinos
+    )
 
     # HTML
     html = f"""
@@ -241,7 +293,7 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
 <body>
     <div id="header">
         <h1>🗺️ Grafo de Bairros do Recife - Layout Orgânico</h1>
-        <p>{grafo.num_vertices()} bairros | {len(arestas_lista)} vias | Distribuição por subregiões</p>
+        <p>{metricas.num_vertices} bairros | {num_vias} vias | Distribuição por subregiões</p>
     </div>
 
     <div id="search-box">
@@ -272,13 +324,20 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
 
     <div id="tooltip"></div>
 
-    <script>
+    <script id="grafo-app">
         const canvas = document.getElementById('canvas');
         const ctx = canvas.getContext('2d');
         const tooltip = document.getElementById('tooltip');
 
-        const arestas = {str(arestas_lista)};
-        const vertices = {str(vertices_lista)};
+        // Dados (window.DADOS_GRAFO, gravado por escrita_html)
+        const vertices = DADOS_GRAFO.vertices;
+        {arestas_js}
+        const indice = DADOS_GRAFO.indice;
+
+        // Índice espacial (ver indice_espacial.py)
+        {CONSULTA_QUADTREE_JS}
+        // Folga para os nomes escritos acima dos círculos
+        const MARGEM_ROTULO = 80;
 
         let scale = 1;
         let offsetX = -800;
@@ -287,17 +346,24 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
         let lastX, lastY;
         let showLabels = true;
 
+        // Desenha só o que cruza a área visível do canvas
         function draw() {{
             ctx.clearRect(0, 0, canvas.width, canvas.height);
             ctx.save();
             ctx.translate(offsetX, offsetY);
             ctx.scale(scale, scale);
 
+            const x0 = -offsetX / scale, y0 = -offsetY / scale;
+            const x1 = (canvas.width - offsetX) / scale, y1 = (canvas.height - offsetY) / scale;
+
             // Arestas
             ctx.globalAlpha = 0.15;
             ctx.strokeStyle = '#888';
-            ctx.lineWidth = 0.8;
-            arestas.forEach(a => {{
+            consultarQuadtree(indice.arestas, x0, y0, x1, y1, i => {{
+                const a = arestas[i];
+                if (!caixaCruza(Math.min(a.x1, a.x2), Math.min(a.y1, a.y2),
+                                Math.max(a.x1, a.x2), Math.max(a.y1, a.y2), x0, y0, x1, y1)) return;
+                ctx.lineWidth = a.largura || 0.8;
                 ctx.beginPath();
                 ctx.moveTo(a.x1, a.y1);
                 ctx.lineTo(a.x2, a.y2);
@@ -305,8 +371,17 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
             }});
             ctx.globalAlpha = 1;
 
-            // Vértices
-            vertices.forEach(v => {{
+            // Vértices, na ordem original
+            const visiveis = [];
+            consultarQuadtree(indice.vertices, x0 - MARGEM_ROTULO, y0 - MARGEM_ROTULO,
+                              x1 + MARGEM_ROTULO, y1 + MARGEM_ROTULO, i => {{
+                const v = vertices[i];
+                if (caixaCruza(v.x - v.tamanho - MARGEM_ROTULO, v.y - v.tamanho - MARGEM_ROTULO,
+                               v.x + v.tamanho + MARGEM_ROTULO, v.y + v.tamanho + MARGEM_ROTULO,
+                               x0, y0, x1, y1)) visiveis.push(i);
+            }});
+            visiveis.sort((a, b) => a - b).forEach(i => {{
+                const v = vertices[i];
                 // Círculo
                 ctx.fillStyle = v.cor;
                 ctx.beginPath();
@@ -347,19 +422,22 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
                 const x = (e.clientX - rect.left - offsetX) / scale;
                 const y = (e.clientY - rect.top - offsetY) / scale;
 
-                let found = false;
-                for (const v of vertices) {{
-                    const dist = Math.sqrt((x - v.x) ** 2 + (y - v.y) ** 2);
-                    if (dist < v.tamanho) {{
-                        tooltip.style.display = 'block';
-                        tooltip.style.left = e.clientX + 15 + 'px';
-                        tooltip.style.top = e.clientY + 15 + 'px';
-                        tooltip.innerHTML = `<strong>${{v.nome}}</strong><br>📍 Subregião: ${{v.subregiao}}<br>🛣️ Vias: ${{v.grau}}`;
-                        found = true;
-                        break;
-                    }}
+                // Só os bairros das células em volta do ponteiro (o primeiro, se houver vários)
+                let achado = -1;
+                consultarQuadtree(indice.vertices, x, y, x, y, i => {{
+                    const v = vertices[i];
+                    if ((achado < 0 || i < achado) && Math.sqrt((x - v.x) ** 2 + (y - v.y) ** 2) < v.tamanho) achado = i;
+                }});
+                if (achado >= 0) {{
+                    const v = vertices[achado];
+                    tooltip.style.display = 'block';
+                    tooltip.style.left = e.clientX + 15 + 'px';
+                    tooltip.style.top = e.clientY + 15 + 'px';
+                    tooltip.innerHTML = `<strong>${{v.nome}}</strong><br>📍 Subregião: ${{v.subregiao}}<br>🛣️ Vias: ${{v.grau}}` +
+                        (v.centralidade !== undefined ? `<br>⭐ Centralidade: ${{v.centralidade.toFixed(4)}}` : '');
+                }} else {{
+                    tooltip.style.display = 'none';
                 }}
-                if (!found) tooltip.style.display = 'none';
             }}
         }});
 
@@ -425,7 +503,7 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
 
             if (results.length > 0) {{
                 searchResults.innerHTML = results.map(v =>
-                    `<div class="search-item" onclick="focusNode('${{v.nome}}')">
+                    `<div class="search-item" onclick="focusNode(${{vertices.indexOf(v)}})">
                         <strong>${{v.nome}}</strong><br>
                         <small>📍 ${{v.subregiao}} • 🛣️ ${{v.grau}} vias</small>
                     </div>`
@@ -435,8 +513,8 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
             }}
         }});
 
-        function focusNode(nome) {{
-            const v = vertices.find(x => x.nome === nome);
+        function focusNode(indice) {{
+            const v = vertices[indice];
             if (v) {{
                 scale = 1.5;
                 offsetX = canvas.width / 2 - v.x * scale;
@@ -468,10 +546,10 @@ def visualizar_layout_organico(grafo, arquivo_saida='grafo_organico.html'):
 </html>
 """
 
-    with open(arquivo_saida, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Os dados são gravados em fluxo, fora da f-string
+    arquivos = escrever_pagina(arquivo_saida, html, secoes, arquivo_unico, formato_dados)
 
-    print(f"✓ Visualização salva em: {arquivo_saida}")
+    print(f"✓ Visualização salva em: {', '.join(arquivos)}")
     return arquivo_saida
 
 
@@ -2,20 +2,92 @@
 Visualização do grafo usando Plotly (mais leve e confiável)
 """
 import plotly.graph_objects as go
-import random
 from math import cos, sin, pi
 from carregar_dados import construir_grafo_completo
+from agregacao_arestas import agregar_arestas, total_vias
+from centralidade import escalar_tamanhos
 
 
-def visualizar_grafo_plotly(grafo, arquivo_saida='grafo_plotly.html'):
+# A partir deste número de vias, os traços usam WebGL (go.Scattergl)
+LIMITE_WEBGL = 5000
+
+
+def _segmentos_arestas(grafo, posicoes):
     """
-    Gera visualização interativa usando Plotly
+    Coordenadas de todas as vias em um único par de listas, separadas por None,
+    e o ponto médio de cada via com o texto do tooltip
+
+    Returns:
+        Tupla (x, y, meio_x, meio_y, textos)
+    """
+    x, y = [], []
+    meio_x, meio_y, textos = [], [], []
+    arestas_processadas = set()
+
+    # Cada via aparece uma vez em grafo.registros; o conjunto mantém a
+    # deduplicação original de vias idênticas (mesmo par, nome e peso)
+    for registro in grafo.registros:
+        aresta_id = (registro.origem, registro.destino, registro.nome_via, registro.peso)
+        aresta_reversa_id = (registro.destino, registro.origem, registro.nome_via, registro.peso)
+        if aresta_id in arestas_processadas or aresta_reversa_id in arestas_processadas:
+            continue
+        arestas_processadas.add(aresta_id)
+
+        x0, y0 = posicoes[registro.origem]
+        x1, y1 = posicoes[registro.destino]
+        x += (x0, x1, None)
+        y += (y0, y1, None)
+        meio_x.append((x0 + x1) / 2)
+        meio_y.append((y0 + y1) / 2)
+        textos.append(f"{registro.nome_via}<br>{registro.peso:.2f}m")
+
+    return x, y, meio_x, meio_y, textos
+
+
+def _segmentos_pares(grafo, vertices, posicoes):
+    """
+    Como _segmentos_arestas, mas com um segmento por par de bairros e o
+    resumo das vias paralelas (quantidade, mínima e média) no tooltip
+
+    Returns:
+        Tupla (x, y, meio_x, meio_y, textos, número de vias)
+    """
+    dados = agregar_arestas(grafo, {nome: i for i, nome in enumerate(vertices)}, detalhes=False)
+    pares = dados['pares']
+    x, y = [], []
+    meio_x, meio_y, textos = [], [], []
+
+    for a, b, n, minimo, media in zip(pares['a'], pares['b'], pares['n'], pares['min'], pares['media']):
+        x0, y0 = posicoes[vertices[a]]
+        x1, y1 = posicoes[vertices[b]]
+        x += (x0, x1, None)
+        y += (y0, y1, None)
+        meio_x.append((x0 + x1) / 2)
+        meio_y.append((y0 + y1) / 2)
+        textos.append(f"{vertices[a]} ↔ {vertices[b]}<br>{n} via(s)<br>Mínima: {minimo:.2f}m<br>Média: {media:.2f}m")
+
+    return x, y, meio_x, meio_y, textos, total_vias(dados)
+
+
+def construir_figura_plotly(grafo, centralidade=None, webgl=None, agregar=False):
+    """
+    Monta a figura Plotly do grafo (sem gravar)
+
+    Todas as vias ficam em um único traço de linhas (segmentos separados por
+    None), e o tooltip de cada via vem de um traço de marcadores invisíveis no
+    ponto médio. Assim a figura tem sempre 3 traços, qualquer que seja o
+    número de vias.
 
     Args:
         grafo: Instância do grafo
-        arquivo_saida: Nome do arquivo HTML de saída
+        centralidade: Métrica opcional por bairro que define o tamanho dos nós
+        webgl: Se True, usa go.Scattergl; se None, usa a partir de LIMITE_WEBGL vias
+        agregar: Se True, um segmento por par de bairros em vez de um por via
+
+    Returns:
+        Tupla (figura, número de vias desenhadas)
     """
-    print("Gerando visualização com Plotly...")
+    metricas = grafo.metricas()
 
     # Posicionar vértices em círculo
     vertices = list(grafo.vertices.keys())
@@ -30,35 +102,35 @@ def visualizar_grafo_plotly(grafo, arquivo_saida='grafo_plotly.html'):
         posicoes[vertice] = (x, y)
 
     # Preparar dados das arestas
-    edge_traces = []
-    arestas_processadas = set()
+    if agregar:
+        edge_x, edge_y, meio_x, meio_y, textos_arestas, num_vias = _segmentos_pares(grafo, vertices, posicoes)
+    else:
+        edge_x, edge_y, meio_x, meio_y, textos_arestas = _segmentos_arestas(grafo, posicoes)
+        num_vias = len(textos_arestas)
+
+    if webgl is None:
+        webgl = len(textos_arestas) >= LIMITE_WEBGL
+    Traco = go.Scattergl if webgl else go.Scatter
 
-    print(f"Desenhando {grafo.num_arestas * 2} arestas...")
-
-    for origem in grafo.adjacencias:
-        for aresta in grafo.adjacencias[origem]:
-            # Criar ID único
-            aresta_id = (origem, aresta.destino, aresta.nome_via, aresta.peso)
-            aresta_reversa_id = (aresta.destino, origem, aresta.nome_via, aresta.peso)
-
-            if aresta_id not in arestas_processadas and aresta_reversa_id not in arestas_processadas:
-                x0, y0 = posicoes[origem]
-                x1, y1 = posicoes[aresta.destino]
-
-                # Criar uma linha para cada aresta
-                edge_trace = go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=0.5, color='#888'),
-                    hoverinfo='text',
-                    text=f"{aresta.nome_via}<br>{aresta.peso:.2f}m",
-                    showlegend=False
-                )
-                edge_traces.append(edge_trace)
-                arestas_processadas.add(aresta_id)
-
-    print(f"✓ {len(edge_traces)} arestas desenhadas")
+    edge_trace = Traco(
+        x=edge_x,
+        y=edge_y,
+        mode='lines',
+        line=dict(width=0.5, color='#888'),
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+    # Marcadores invisíveis no meio de cada via, só para o tooltip
+    hover_trace = Traco(
+        x=meio_x,
+        y=meio_y,
+        mode='markers',
+        marker=dict(size=6, color='#888', opacity=0),
+        hoverinfo='text',
+        text=textos_arestas,
+        showlegend=False
+    )
 
     # Preparar dados dos vértices
     node_x = []
@@ -69,13 +141,15 @@ def visualizar_grafo_plotly(grafo, arquivo_saida='grafo_plotly.html'):
 
     # Cores por subregião
     cores_subregioes = {}
-    subregioes_unicas = set(v.subregiao for v in grafo.vertices.values() if v.subregiao)
+    subregioes_unicas = metricas.vertices_por_subregiao.keys()
 
     for i, subregiao in enumerate(sorted(subregioes_unicas)):
         # Gerar cor baseada no índice
         hue = (i * 360 / len(subregioes_unicas)) % 360
         cores_subregioes[subregiao] = f'hsl({hue}, 70%, 50%)'
 
+    tamanhos = escalar_tamanhos(centralidade, 10, 40) if centralidade else {}
+
     for vertice_nome in vertices:
         x, y = posicoes[vertice_nome]
         node_x.append(x)
@@ -84,13 +158,17 @@ def visualizar_grafo_plotly(grafo, arquivo_saida='grafo_plotly.html'):
         vertice = grafo.obter_vertice(vertice_nome)
         grau = grafo.grau(vertice_nome)
 
-        node_text.append(f"{vertice_nome}<br>Subregião: {vertice.subregiao}<br>Vias: {grau}")
-        node_size.append(10 + grau * 0.5)  # Tamanho baseado no grau
+        texto = f"{vertice_nome}<br>Subregião: {vertice.subregiao}<br>Vias: {grau}"
+        if vertice_nome in tamanhos:
+            texto += f"<br>Centralidade: {centralidade[vertice_nome]:.4f}"
+        node_text.append(texto)
+        # Tamanho baseado na centralidade, se informada, ou no grau
+        node_size.append(tamanhos.get(vertice_nome, 10 + grau * 0.5))
 
         cor = cores_subregioes.get(vertice.subregiao, '#999')
         node_color.append(cor)
 
-    node_trace = go.Scatter(
+    node_trace = Traco(
         x=node_x,
         y=node_y,
         mode='markers+text',
@@ -108,12 +186,12 @@ def visualizar_grafo_plotly(grafo, arquivo_saida='grafo_plotly.html'):
     )
 
     # Criar figura
-    fig = go.Figure(data=edge_traces + [node_trace])
+    fig = go.Figure(data=[edge_trace, hover_trace, node_trace])
 
     # Layout
     fig.update_layout(
         title=dict(
-            text=f"Grafo de Bairros do Recife<br><sub>{grafo.num_vertices()} bairros, {len(edge_traces)} vias</sub>",
+            text=f"Grafo de Bairros do Recife<br><sub>{metricas.num_vertices} bairros, {num_vias} vias</sub>",
             x=0.5,
             xanchor='center'
         ),
@@ -127,6 +205,29 @@ def visualizar_grafo_plotly(grafo, arquivo_saida='grafo_plotly.html'):
         height=1000
     )
 
+    return fig, num_vias
+
+
+def visualizar_grafo_plotly(grafo, arquivo_saida='grafo_plotly.html', centralidade=None, webgl=None,
+                            agregar=False):
+    """
+    Gera visualização interativa usando Plotly
+
+    Args:
+        grafo: Instância do grafo
+        arquivo_saida: Nome do arquivo HTML de saída
+        centralidade: Métrica opcional por bairro (ex.: centralidade.centralidade_intermediacao)
+            que passa a definir o tamanho dos nós no lugar do grau
+        webgl: Força (True) ou desliga (False) o uso de WebGL; por padrão, é
+            usado a partir de LIMITE_WEBGL vias
+        agregar: Se True, desenha um segmento por par de bairros, com o resumo
+            das vias paralelas no tooltip
+    """
+    print("Gerando visualização com Plotly...")
+
+    fig, num_vias = construir_figura_plotly(grafo, centralidade, webgl, agregar)
+    print(f"✓ {num_vias} arestas desenhadas")
+
     # Salvar
     fig.write_html(arquivo_saida)
     print(f"✓ Visualização salva em: {arquivo_saida}")
@@ -4,14 +4,32 @@ Sem dependências externas - 100% garantido de funcionar!
 """
 from math import cos, sin, pi
 from carregar_dados import construir_grafo_completo
+from agregacao_arestas import agregar_arestas, total_vias, vias_unicas
+from centralidade import escalar_tamanhos
+from escrita_html import escrever_pagina
+from indice_espacial import CONSULTA_QUADTREE_JS, indice_pagina
 
 
-def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
+def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html', centralidade=None, agregar=False,
+                            arquivo_unico=False, formato_dados='js'):
     """
     Gera visualização usando apenas HTML5 Canvas (sem bibliotecas externas)
+
+    Args:
+        grafo: Instância do grafo
+        arquivo_saida: Nome do arquivo HTML de saída
+        centralidade: Métrica opcional por bairro (ex.: centralidade.centralidade_intermediacao)
+            que passa a definir o tamanho dos nós no lugar do grau
+        agregar: Se True, desenha uma linha por par de bairros (espessura pela
+            quantidade de vias) em vez de uma por via; o HTML fica bem menor
+        arquivo_unico: Se True, grava os dados dentro do HTML; por padrão vão
+            para um arquivo separado ao lado dele (ver escrita_html)
+        formato_dados: 'js' (abre direto do disco) ou 'json.gz' (menor, requer HTTP)
     """
     print("Gerando visualização com Canvas HTML5...")
 
+    metricas = grafo.metricas()
+
     # Posicionar vértices em círculo
     vertices = list(grafo.vertices.keys())
     n = len(vertices)
@@ -26,54 +44,86 @@ def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
         y = centro_y + raio * sin(angulo)
         posicoes[vertice] = (x, y)
 
-    # Preparar dados das arestas
-    arestas_lista = []
-    arestas_processadas = set()
-
-    for origem in grafo.adjacencias:
-        for aresta in grafo.adjacencias[origem]:
-            aresta_id = (origem, aresta.destino, aresta.nome_via, aresta.peso)
-            aresta_reversa_id = (aresta.destino, origem, aresta.nome_via, aresta.peso)
-
-            if aresta_id not in arestas_processadas and aresta_reversa_id not in arestas_processadas:
-                x1, y1 = posicoes[origem]
-                x2, y2 = posicoes[aresta.destino]
-
-                arestas_lista.append({
-                    'x1': x1, 'y1': y1,
-                    'x2': x2, 'y2': y2,
-                    'origem': origem,
-                    'destino': aresta.destino,
-                    'via': aresta.nome_via.replace("'", "\\'"),
-                    'peso': aresta.peso
-                })
-                arestas_processadas.add(aresta_id)
+    # Preparar dados das arestas (gerados sob demanda durante a escrita)
+    vias = [] if agregar else vias_unicas(grafo)
+
+    def gerar_arestas():
+        for registro in vias:
+            x1, y1 = posicoes[registro.origem]
+            x2, y2 = posicoes[registro.destino]
+
+            yield {
+                'x1': x1, 'y1': y1,
+                'x2': x2, 'y2': y2,
+                'origem': registro.origem,
+                'destino': registro.destino,
+                'via': registro.nome_via,
+                'peso': registro.peso
+            }
 
     # Preparar dados dos vértices
-    vertices_lista = []
     cores_subregioes = {}
-    subregioes_unicas = list(set(v.subregiao for v in grafo.vertices.values() if v.subregiao))
+    subregioes_unicas = list(metricas.vertices_por_subregiao.keys())
 
     for i, subregiao in enumerate(sorted(subregioes_unicas)):
         hue = (i * 360 / len(subregioes_unicas)) % 360
         cores_subregioes[subregiao] = f'hsl({hue}, 70%, 60%)'
 
-    for vertice_nome in vertices:
-        x, y = posicoes[vertice_nome]
-        vertice = grafo.obter_vertice(vertice_nome)
-        grau = grafo.grau(vertice_nome)
-
-        cor = cores_subregioes.get(vertice.subregiao, '#999')
-        tamanho = min(20, 5 + grau * 0.3)
-
-        vertices_lista.append({
-            'x': x, 'y': y,
-            'nome': vertice_nome.replace("'", "\\'"),
-            'subregiao': vertice.subregiao if vertice.subregiao else 'N/A',
-            'grau': grau,
-            'cor': cor,
-            'tamanho': tamanho
-        })
+    tamanhos = escalar_tamanhos(centralidade, 5, 20) if centralidade else {}
+
+    def tamanho_vertice(nome):
+        return tamanhos.get(nome, min(20, 5 + grafo.grau(nome) * 0.3))
+
+    def gerar_vertices():
+        for vertice_nome in vertices:
+            x, y = posicoes[vertice_nome]
+            vertice = grafo.obter_vertice(vertice_nome)
+            grau = grafo.grau(vertice_nome)
+
+            cor = cores_subregioes.get(vertice.subregiao, '#999')
+            tamanho = tamanho_vertice(vertice_nome)
+
+            dados_vertice = {
+                'x': x, 'y': y,
+                'nome': vertice_nome,
+                'subregiao': vertice.subregiao if vertice.subregiao else 'N/A',
+                'grau': grau,
+                'cor': cor,
+                'tamanho': tamanho
+            }
+            if vertice_nome in tamanhos:
+                dados_vertice['centralidade'] = centralidade[vertice_nome]
+            yield dados_vertice
+
+    secoes = {'vertices': gerar_vertices()}
+    indices = {nome: i for i, nome in enumerate(vertices)}
+    if agregar:
+        # Uma linha por par de bairros, com as coordenadas tiradas dos vértices
+        dados_pares = agregar_arestas(grafo, indices, detalhes=False)
+        num_vias = total_vias(dados_pares)
+        secoes['pares'] = dados_pares
+        origens, destinos = dados_pares['pares']['a'], dados_pares['pares']['b']
+        arestas_js = """const dadosArestas = DADOS_GRAFO.pares;
+        const arestas = dadosArestas.pares.a.map((a, k) => {
+            const b = dadosArestas.pares.b[k];
+            return {
+                x1: vertices[a].x, y1: vertices[a].y,
+                x2: vertices[b].x, y2: vertices[b].y,
+                largura: 1 + Math.log2(dadosArestas.pares.n[k])
+            };
+        });"""
+    else:
+        num_vias = len(vias)
+        secoes['arestas'] = gerar_arestas()
+        arestas_js = "const arestas = DADOS_GRAFO.arestas;"
+        origens = (indices[registro.origem] for registro in vias)
+        destinos = (indices[registro.destino] for registro in vias)
+
+    # Índice espacial: hover e desenho só do que está na área visível
+    secoes['indice'] = indice_pagina(
+        [posicoes[nome][0] for nome in vertices], [posicoes[nome][1] for nome in vertices],
+        [tamanho_vertice(nome) for nome in vertices], origens, destinos
+    )
 
     # Gerar HTML
     html = f"""
@@ -185,14 +235,14 @@ def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
 <body>
     <div id="header">
         <h1>🗺️ Grafo de Bairros do Recife</h1>
-        <p>Visualização Interativa - {grafo.num_vertices()} bairros, {len(arestas_lista)} vias</p>
+        <p>Visualização Interativa - {metricas.num_vertices} bairros, {num_vias} vias</p>
     </div>
 
     <div id="info">
         <strong>📊 Estatísticas:</strong>
-        Vértices: {grafo.num_vertices()} |
-        Arestas: {len(arestas_lista)} |
-        Grau Médio: {sum(grafo.grau(v) for v in grafo.vertices) / len(grafo.vertices):.2f}
+        Vértices: {metricas.num_vertices} |
+        Arestas: {num_vias} |
+        Grau Médio: {metricas.grau_medio:.2f}
     </div>
 
     <div id="search-box">
@@ -214,14 +264,20 @@ def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
 
     <div id="tooltip"></div>
 
-    <script>
+    <script id="grafo-app">
         const canvas = document.getElementById('canvas');
         const ctx = canvas.getContext('2d');
         const tooltip = document.getElementById('tooltip');
 
-        // Dados
-        const arestas = {str(arestas_lista)};
-        const vertices = {str(vertices_lista)};
+        // Dados (window.DADOS_GRAFO, gravado por escrita_html)
+        const vertices = DADOS_GRAFO.vertices;
+        {arestas_js}
+        const indice = DADOS_GRAFO.indice;
+
+        // Índice espacial (ver indice_espacial.py)
+        {CONSULTA_QUADTREE_JS}
+        // Folga para os nomes escritos acima dos círculos
+        const MARGEM_ROTULO = 80;
 
         // Estado
         let scale = 1;
@@ -230,25 +286,40 @@ def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
         let isDragging = false;
         let lastX, lastY;
 
-        // Desenhar grafo
+        // Desenhar grafo (só o que cruza a área visível do canvas)
         function draw() {{
             ctx.clearRect(0, 0, canvas.width, canvas.height);
             ctx.save();
             ctx.translate(offsetX, offsetY);
             ctx.scale(scale, scale);
 
+            const x0 = -offsetX / scale, y0 = -offsetY / scale;
+            const x1 = (canvas.width - offsetX) / scale, y1 = (canvas.height - offsetY) / scale;
+
             // Desenhar arestas
             ctx.strokeStyle = '#ccc';
-            ctx.lineWidth = 1;
-            arestas.forEach(aresta => {{
+            consultarQuadtree(indice.arestas, x0, y0, x1, y1, i => {{
+                const aresta = arestas[i];
+                if (!caixaCruza(Math.min(aresta.x1, aresta.x2), Math.min(aresta.y1, aresta.y2),
+                                Math.max(aresta.x1, aresta.x2), Math.max(aresta.y1, aresta.y2), x0, y0, x1, y1)) return;
+                ctx.lineWidth = aresta.largura || 1;
                 ctx.beginPath();
                 ctx.moveTo(aresta.x1, aresta.y1);
                 ctx.lineTo(aresta.x2, aresta.y2);
                 ctx.stroke();
             }});
 
-            // Desenhar vértices
-            vertices.forEach(vertice => {{
+            // Desenhar vértices, na ordem original
+            const visiveis = [];
+            consultarQuadtree(indice.vertices, x0 - MARGEM_ROTULO, y0 - MARGEM_ROTULO,
+                              x1 + MARGEM_ROTULO, y1 + MARGEM_ROTULO, i => {{
+                const v = vertices[i];
+                if (caixaCruza(v.x - v.tamanho - MARGEM_ROTULO, v.y - v.tamanho - MARGEM_ROTULO,
+                               v.x + v.tamanho + MARGEM_ROTULO, v.y + v.tamanho + MARGEM_ROTULO,
+                               x0, y0, x1, y1)) visiveis.push(i);
+            }});
+            visiveis.sort((a, b) => a - b).forEach(i => {{
+                const vertice = vertices[i];
                 ctx.fillStyle = vertice.cor;
                 ctx.beginPath();
                 ctx.arc(vertice.x, vertice.y, vertice.tamanho, 0, 2 * Math.PI);
@@ -287,19 +358,22 @@ def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
                 const x = (e.clientX - rect.left - offsetX) / scale;
                 const y = (e.clientY - rect.top - offsetY) / scale;
 
-                let found = false;
-                for (const v of vertices) {{
-                    const dist = Math.sqrt((x - v.x) ** 2 + (y - v.y) ** 2);
-                    if (dist < v.tamanho) {{
-                        tooltip.style.display = 'block';
-                        tooltip.style.left = e.clientX + 10 + 'px';
-                        tooltip.style.top = e.clientY + 10 + 'px';
-                        tooltip.innerHTML = `<strong>${{v.nome}}</strong><br>Subregião: ${{v.subregiao}}<br>Vias: ${{v.grau}}`;
-                        found = true;
-                        break;
-                    }}
+                // Só os bairros das células em volta do ponteiro (o primeiro, se houver vários)
+                let achado = -1;
+                consultarQuadtree(indice.vertices, x, y, x, y, i => {{
+                    const v = vertices[i];
+                    if ((achado < 0 || i < achado) && Math.sqrt((x - v.x) ** 2 + (y - v.y) ** 2) < v.tamanho) achado = i;
+                }});
+                if (achado >= 0) {{
+                    const v = vertices[achado];
+                    tooltip.style.display = 'block';
+                    tooltip.style.left = e.clientX + 10 + 'px';
+                    tooltip.style.top = e.clientY + 10 + 'px';
+                    tooltip.innerHTML = `<strong>${{v.nome}}</strong><br>Subregião: ${{v.subregiao}}<br>Vias: ${{v.grau}}` +
+                        (v.centralidade !== undefined ? `<br>Centralidade: ${{v.centralidade.toFixed(4)}}` : '');
+                }} else {{
+                    tooltip.style.display = 'none';
                 }}
-                if (!found) tooltip.style.display = 'none';
             }}
         }});
 
@@ -347,15 +421,15 @@ def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
 
             if (results.length > 0) {{
                 searchResults.innerHTML = results.map(v =>
-                    `<div class="search-item" onclick="focusNode('${{v.nome}}')">${{v.nome}}<br><small>Subregião: ${{v.subregiao}}</small></div>`
+                    `<div class="search-item" onclick="focusNode(${{vertices.indexOf(v)}})">${{v.nome}}<br><small>Subregião: ${{v.subregiao}}</small></div>`
                 ).join('');
             }} else {{
                 searchResults.innerHTML = '<div style="padding: 8px;">Nenhum bairro encontrado</div>';
             }}
         }});
 
-        function focusNode(nome) {{
-            const vertice = vertices.find(v => v.nome === nome);
+        function focusNode(indice) {{
+            const vertice = vertices[indice];
             if (vertice) {{
                 offsetX = canvas.width / 2 - vertice.x * scale;
                 offsetY = canvas.height / 2 - vertice.y * scale;
@@ -374,11 +448,10 @@ def visualizar_grafo_canvas(grafo, arquivo_saida='grafo_canvas.html'):
 </html>
 """
 
-    # Salvar
-    with open(arquivo_saida, 'w', encoding='utf-8') as f:
-        f.write(html)
+    # Salvar (os dados são gravados em fluxo, fora da f-string)
+    arquivos = escrever_pagina(arquivo_saida, html, secoes, arquivo_unico, formato_dados)
 
-    print(f"✓ Visualização salva em: {arquivo_saida}")
+    print(f"✓ Visualização salva em: {', '.join(arquivos)}")
     return arquivo_saida
 
 